@@ -2,8 +2,20 @@ from __future__ import annotations
 
 from django.urls import path
 
-from api.views import DocumentProcessView
+from api.views import (
+    DocumentProcessView,
+    EntityDocumentsView,
+    EntityFacetsView,
+    SearchView,
+    SimilarDocumentsView,
+    StorageStatsView,
+)
 
 urlpatterns = [
     path('process-document/', DocumentProcessView.as_view(), name='process_document'),
+    path('find-similar/', SimilarDocumentsView.as_view(), name='find_similar'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('entities/', EntityDocumentsView.as_view(), name='entity_documents'),
+    path('entities/facets/', EntityFacetsView.as_view(), name='entity_facets'),
+    path('storage-stats/', StorageStatsView.as_view(), name='storage_stats'),
 ]
@@ -1,20 +1,46 @@
 from __future__ import annotations
 
+import hashlib
 import logging
-import uuid
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
 
+from django.core.files.uploadedfile import UploadedFile
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from documents.chroma_client import store_document_in_chromadb
+from documents.chroma_client import (
+    content_ids_enabled,
+    embed_texts,
+    get_document,
+    new_document_id,
+    store_document_in_chromadb,
+    unflatten_metadata,
+)
 from documents.classifier import predict_document_type
+from documents.entity_index import (
+    MAX_ENTITY_RESULTS,
+    entity_facets,
+    entity_index_enabled,
+    find_documents,
+)
 from documents.extractor import extract_entities
-from documents.ocr import extract_text_from_image
+from documents.knn_classifier import get_classifier_backend, predict_document_type_knn
+from documents.ocr import OCRResult, extract_ocr_result
+from documents.search import (
+    MAX_TOP_K,
+    nearest_documents,
+    search_documents,
+    searchable_fields,
+)
+from documents.spool import SpoolFullError, get_vector_spool
 
 # 🛠️ Logger Setup
 logger = logging.getLogger(__name__)
@@ -22,7 +48,6 @@ logger = logging.getLogger(__name__)
 
 def clean_text_preview(text: str, max_length: int = 200) -> str:
     """Generate a readable preview from OCR text, skipping garbage."""
-    print(text)
     import re
 
     words = text.split()
@@ -49,6 +74,113 @@ def clean_text_preview(text: str, max_length: int = 200) -> str:
     return preview
 
 
+def save_upload(file: UploadedFile[bytes]) -> str:
+    """
+    💾 Write an upload to a private temp directory, named by its SHA-256.
+
+    The OCR cache is keyed by file name, so re-uploads of the same bytes hit
+    it, and two different files that share a name never do.
+    """
+    directory = tempfile.mkdtemp(prefix="upload-")
+    partial = os.path.join(directory, "partial")
+    digest = hashlib.sha256()
+    with open(partial, 'wb') as destination:
+        for chunk in file.chunks():
+            digest.update(chunk)
+            destination.write(chunk)
+    extension = os.path.splitext(file.name or "")[1].lower()
+    path = os.path.join(directory, digest.hexdigest() + extension)
+    os.replace(partial, path)
+    return path
+
+
+def discard_upload(path: str) -> None:
+    """
+    🧹 Remove a file written by ``save_upload`` (the OCR cache keeps its text).
+    """
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def classify_document(ocr: OCRResult, embedding: Optional[List[float]] = None) -> str:
+    """
+    🏷️ kNN vote over stored neighbours when that backend is selected and an
+    embedding is available, TF-IDF classifier otherwise (or when kNN abstains).
+    """
+    doc_type: Optional[str] = None
+    if embedding is not None and get_classifier_backend() == "knn":
+        doc_type = predict_document_type_knn(embedding)
+    if doc_type is None:
+        doc_type = predict_document_type(ocr.text)
+    return doc_type
+
+
+def existing_document(doc_id: str) -> Optional[Dict[str, Any]]:
+    """
+    ♻️ Response payload for an already stored document, or None (also when the
+    lookup fails).
+    """
+    try:
+        stored = get_document(doc_id)
+    except Exception as e:
+        logger.warning(
+            f"Lookup of existing document {doc_id} failed, processing anyway: {e}"
+        )
+        return None
+    if stored is None:
+        return None
+    doc_type, entities = unflatten_metadata(stored["metadata"])
+    return {"document_id": doc_id, "document_type": doc_type, "entities": entities,
+            "duplicate": True}
+
+
+def store_document(ocr: OCRResult, doc_type: str,
+                   embedding: Optional[List[float]] = None,
+                   doc_id: Optional[str] = None) -> Tuple[str, Dict[str, List[str]]]:
+    """
+    📥 Extract entities and store the document (through the write-behind spool
+    when configured).
+
+    Returns:
+        tuple: (document id, extracted entities).
+
+    Raises:
+        SpoolFullError: The spool is at capacity.
+    """
+    # Patterns need the original capitalization
+    entities = extract_entities(doc_type, ocr.raw_text)
+    logger.info(f"Extracted {len(entities)} entity fields.")
+
+    doc_id = doc_id or new_document_id(ocr.text)
+    record = {
+        "doc_id": doc_id,
+        "text": ocr.text,
+        "document_type": doc_type,
+        "entities": entities,
+        "embedding": embedding
+    }
+    spool = get_vector_spool()
+    if spool is not None:
+        spool.enqueue(record)
+        logger.info(f"Queued document {doc_id} for storage.")
+    else:
+        store_document_in_chromadb(doc_id=doc_id, text=ocr.text,
+                                   document_type=doc_type, entities=entities,
+                                   embedding=embedding)
+        logger.info(f"Stored document {doc_id} in storage.")
+    return doc_id, entities
+
+
+def _flag(value: Any) -> bool:
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _form(request: Request) -> Dict[str, Any]:
+    """
+    📝 The request's form fields (or JSON object); empty for any other body.
+    """
+    return request.data if isinstance(request.data, dict) else {}
+
+
 class DocumentProcessView(APIView):
     """
     API endpoint to upload a document, extract its type + entities, and store in ChromaDB.
@@ -66,6 +198,14 @@ class DocumentProcessView(APIView):
                 description="Image file to process",
                 type=openapi.TYPE_FILE,
                 required=True
+            ),
+            openapi.Parameter(
+                'reprocess',
+                openapi.IN_FORM,
+                description=("Re-run classification/extraction even if the same text "
+                             "is already stored"),
+                type=openapi.TYPE_BOOLEAN,
+                default=False
             )
         ],
         responses={
@@ -83,7 +223,8 @@ class DocumentProcessView(APIView):
                 }
             ),
             400: "No file uploaded",
-            500: "Internal server error"
+            500: "Internal server error",
+            503: "Storage spool full, retry later"
         }
     )
     def post(self, request: Request) -> Response:
@@ -93,40 +234,36 @@ class DocumentProcessView(APIView):
             logger.warning("API called without uploading a file.")
             return Response({'error': 'No file uploaded.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        temp_path = f"/tmp/{file.name}"
-
+        temp_path: Optional[str] = None
         try:
             logger.info(f"Received document upload: {file.name}")
-
-            # Save uploaded file temporarily
-            with open(temp_path, 'wb+') as destination:
-                for chunk in file.chunks():
-                    destination.write(chunk)
-
+            temp_path = save_upload(file)
             logger.info(f"Saved uploaded file to: {temp_path}")
 
-            # 1️⃣ Extract text using OCR
-            text = extract_text_from_image(temp_path)
+            # 1️⃣ Extract text using OCR (one Tesseract pass: raw-case + normalized)
+            ocr = extract_ocr_result(temp_path)
             logger.info("OCR completed successfully.")
 
+            # ♻️ Content-hash ids: an already stored text is answered from storage
+            doc_id = new_document_id(ocr.text)
+            if content_ids_enabled() and not _flag(_form(request).get('reprocess', '')):
+                existing = existing_document(doc_id)
+                if existing is not None:
+                    logger.info(f"Document {doc_id} already stored; returning it.")
+                    return Response(existing, status=status.HTTP_200_OK)
+
             # 2️⃣ Classify document type
-            doc_type = predict_document_type(text)
+            # kNN backend: embed once, vote over stored neighbours, reuse the vector
+            # for storage
+            embedding: Optional[List[float]] = None
+            if get_classifier_backend() == "knn":
+                embedding = embed_texts([ocr.text])[0]
+            doc_type = classify_document(ocr, embedding)
             logger.info(f"Predicted document type: {doc_type}")
 
-            # 3️⃣ Extract entities
-            entities = extract_entities(doc_type, text)
-            logger.info(f"Extracted {len(entities)} entity fields.")
-
-            # 4️⃣ Store in ChromaDB
-            doc_id = str(uuid.uuid4())
-            store_document_in_chromadb(
-                doc_id=doc_id,
-                text=text,
-                document_type=doc_type,
-                entities=entities
-            )
-
-            logger.info(f"Stored document {doc_id} in storage.")
+            # 3️⃣ Extract entities and 4️⃣ store (via the write-behind spool when
+            # configured)
+            doc_id, entities = store_document(ocr, doc_type, embedding, doc_id=doc_id)
 
             result = {
                 "document_id": doc_id,
@@ -136,9 +273,374 @@ class DocumentProcessView(APIView):
 
             return Response(result, status=status.HTTP_200_OK)
 
+        except SpoolFullError as e:
+            logger.warning(f"Rejecting upload, storage is backed up: {e}")
+            return Response(
+                {'error': 'Storage is busy, please retry later.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '30'}
+            )
         except Exception as e:
             logger.error(f"Error processing uploaded document: {e}", exc_info=True)
             return Response(
                 {'error': 'Internal server error while processing document.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        finally:
+            if temp_path:
+                discard_upload(temp_path)
+
+
+class SimilarDocumentsView(APIView):
+    """
+    API endpoint to find stored documents similar to an uploaded scan, without
+    storing it (unless ``store`` is set).
+    """
+    parser_classes = (MultiPartParser, FormParser)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Find similar documents: OCR (cached by content hash), embed once and "
+            "query the collection. Classification and storage are skipped unless "
+            "requested."
+        ),
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM,
+                              description="Image file to compare",
+                              type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter('top_k', openapi.IN_FORM,
+                              type=openapi.TYPE_INTEGER, default=5),
+            openapi.Parameter('classify', openapi.IN_FORM,
+                              type=openapi.TYPE_BOOLEAN, default=False),
+            openapi.Parameter('store', openapi.IN_FORM,
+                              type=openapi.TYPE_BOOLEAN, default=False,
+                              description=("Also classify, extract entities and "
+                                           "store the upload")),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Nearest stored documents",
+                examples={
+                    "application/json": {
+                        "neighbors": [{
+                            "document_id": "2f1c...",
+                            "document_type": "invoice",
+                            "distance": 0.18,
+                            "entities": {"vendor": "Acme Inc"},
+                            "preview": "INVOICE Acme Inc ..."
+                        }],
+                        "cached": False,
+                        "document_type": "invoice"
+                    }
+                }
+            ),
+            400: "No file uploaded or invalid top_k",
+            500: "Internal server error",
+            503: "Storage spool full, retry later"
+        }
+    )
+    def post(self, request: Request) -> Response:
+        file = request.FILES.get('file')
+        if not file:
+            return Response({'error': 'No file uploaded.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            top_k = int(_form(request).get('top_k', 5))
+        except (TypeError, ValueError):
+            top_k = 0
+        if not 1 <= top_k <= MAX_TOP_K:
+            return Response({'error': f'top_k must be between 1 and {MAX_TOP_K}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        store = _flag(_form(request).get('store', ''))
+        classify = store or _flag(_form(request).get('classify', ''))
+
+        temp_path: Optional[str] = None
+        try:
+            temp_path = save_upload(file)
+            ocr = extract_ocr_result(temp_path)
+            embedding = embed_texts([ocr.text])[0]
+            hits, cached = nearest_documents(embedding, top_k)
+
+            result: Dict[str, Any] = {
+                "neighbors": [
+                    {**{k: v for k, v in hit.items() if k != 'text'},
+                     "preview": clean_text_preview(hit['text'])}
+                    for hit in hits
+                ],
+                "cached": cached
+            }
+            if classify:
+                result["document_type"] = classify_document(ocr, embedding)
+            if store:
+                result["document_id"], result["entities"] = store_document(
+                    ocr, result["document_type"], embedding
+                )
+            return Response(result, status=status.HTTP_200_OK)
+
+        except SpoolFullError as e:
+            logger.warning(f"Rejecting upload, storage is backed up: {e}")
+            return Response(
+                {'error': 'Storage is busy, please retry later.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '30'}
+            )
+        except Exception as e:
+            logger.error(f"Error finding similar documents: {e}", exc_info=True)
+            return Response(
+                {'error': 'Internal server error while finding similar documents.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        finally:
+            if temp_path:
+                discard_upload(temp_path)
+
+
+class StorageStatsView(APIView):
+    """
+    API endpoint reporting write-behind storage metrics (spool depth, flush latency).
+    """
+
+    @swagger_auto_schema(
+        operation_description="Write-behind vector storage metrics",
+        responses={
+            200: openapi.Response(
+                description="Spool metrics",
+                examples={
+                    "application/json": {
+                        "write_behind": True,
+                        "spool": {"depth": 3, "dead": 0, "oldest_age_s": 0.8,
+                                  "last_flush_ms": 41.2}
+                    }
+                }
+            )
+        }
+    )
+    def get(self, request: Request) -> Response:
+        spool = get_vector_spool()
+        if spool is None:
+            return Response({"write_behind": False}, status=status.HTTP_200_OK)
+        return Response({"write_behind": True, "spool": spool.stats()},
+                        status=status.HTTP_200_OK)
+
+
+class SearchView(APIView):
+    """
+    API endpoint for similarity search over stored documents, optionally
+    filtered by document type and entity fields, and fused with BM25 ranking
+    when the lexical index is enabled.
+    """
+    parser_classes = (JSONParser,)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Similarity search. Query params: q, top_k (default 10), page (default "
+            "1), mode (hybrid | vector | lexical); any other param is an exact-match "
+            "filter on document_type or an entity field (repeat it to match any of "
+            "several values)."
+        ),
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY,
+                              type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('top_k', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('mode', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=['hybrid', 'vector', 'lexical']),
+            openapi.Parameter('document_type', openapi.IN_QUERY,
+                              type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Page of similar documents",
+                examples={
+                    "application/json": {
+                        "results": [{
+                            "document_id": "2f1c...",
+                            "document_type": "invoice",
+                            "distance": 0.21,
+                            "entities": {"vendor": "Acme Inc"},
+                            "preview": "INVOICE Acme Inc ..."
+                        }],
+                        "page": 1,
+                        "top_k": 10,
+                        "has_more": False,
+                        "cached": False,
+                        "mode": "vector"
+                    }
+                }
+            ),
+            400: "Invalid query, filter or paging arguments"
+        }
+    )
+    def get(self, request: Request) -> Response:
+        try:
+            filters = _entity_filters(request, ('q', 'top_k', 'page', 'mode'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._search(request.query_params.get('q', ''), filters,
+                            request.query_params.get('top_k', 10),
+                            request.query_params.get('page', 1),
+                            request.query_params.get('mode'))
+
+    @swagger_auto_schema(
+        operation_description="Similarity search with a JSON body.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['query'],
+            properties={
+                'query': openapi.Schema(type=openapi.TYPE_STRING),
+                'where': openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    description=('{field: value | [values]} on document_type or '
+                                 'entity fields')
+                ),
+                'top_k': openapi.Schema(type=openapi.TYPE_INTEGER, default=10),
+                'page': openapi.Schema(type=openapi.TYPE_INTEGER, default=1),
+                'mode': openapi.Schema(type=openapi.TYPE_STRING,
+                                       enum=['hybrid', 'vector', 'lexical']),
+            }
+        ),
+        responses={200: "Page of similar documents (same shape as GET)",
+                   400: "Invalid request"}
+    )
+    def post(self, request: Request) -> Response:
+        body = request.data if isinstance(request.data, dict) else {}
+        where = body.get('where')
+        where = {} if where is None else where
+        if not isinstance(where, dict):
+            return Response({'error': '"where" must be an object.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return self._search(str(body.get('query', '')), where, body.get('top_k', 10),
+                            body.get('page', 1), body.get('mode'))
+
+    def _search(self, query: str, filters: Dict[str, Any], top_k: Any, page: Any,
+                mode: Any = None) -> Response:
+        try:
+            result = search_documents(query, filters, top_k=int(top_k), page=int(page),
+                                      mode=str(mode) if mode else None)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error searching documents: {e}", exc_info=True)
+            return Response(
+                {'error': 'Internal server error while searching documents.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        for hit in result['results']:
+            hit['preview'] = clean_text_preview(hit.pop('text'))
+        return Response(result, status=status.HTTP_200_OK)
+
+
+def _entity_filters(request: Request, reserved: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    🧱 ``{field: value | [values]}`` from the query params other than ``reserved``.
+
+    Raises:
+        ValueError: A param that is not ``document_type`` or an entity field.
+    """
+    fields = searchable_fields()
+    filters: Dict[str, Any] = {}
+    for key in request.query_params:
+        if key in reserved:
+            continue
+        if key not in fields:
+            raise ValueError(f'Unknown filter field: {key}')
+        values = request.query_params.getlist(key)
+        filters[key] = values if len(values) > 1 else values[0]
+    return filters
+
+
+class EntityDocumentsView(APIView):
+    """
+    API endpoint listing the documents whose entities equal the given values
+    (relational entity index, $ENTITY_INDEX).
+    """
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Documents by entity value. Every param other than limit/offset is a "
+            "filter on document_type or an entity field, matched case-insensitively "
+            "(repeat it to match any of several values)."
+        ),
+        manual_parameters=[
+            openapi.Parameter('document_type', openapi.IN_QUERY,
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('limit', openapi.IN_QUERY,
+                              type=openapi.TYPE_INTEGER, default=100),
+            openapi.Parameter('offset', openapi.IN_QUERY,
+                              type=openapi.TYPE_INTEGER, default=0),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Matching document ids",
+                examples={"application/json": {"document_ids": ["2f1c..."], "total": 1}}
+            ),
+            400: "Missing or invalid filters"
+        }
+    )
+    def get(self, request: Request) -> Response:
+        if not entity_index_enabled():
+            return Response({'error': 'Entity index is disabled (set ENTITY_INDEX=1).'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 100))
+            offset = int(request.query_params.get('offset', 0))
+            if not 1 <= limit <= MAX_ENTITY_RESULTS or offset < 0:
+                raise ValueError(
+                    f'limit must be between 1 and {MAX_ENTITY_RESULTS}, offset >= 0.'
+                )
+            result = find_documents(_entity_filters(request, ('limit', 'offset')),
+                                    limit=limit, offset=offset)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class EntityFacetsView(APIView):
+    """
+    API endpoint counting the values of one entity field (or document_type),
+    optionally among documents matching entity filters.
+    """
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Facet counts: the most frequent values of `field`. Other params "
+            "(except limit) filter the documents counted, as on /api/entities/."
+        ),
+        manual_parameters=[
+            openapi.Parameter('field', openapi.IN_QUERY,
+                              type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY,
+                              type=openapi.TYPE_INTEGER, default=10),
+            openapi.Parameter('document_type', openapi.IN_QUERY,
+                              type=openapi.TYPE_STRING),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Value counts",
+                examples={
+                    "application/json": {
+                        "field": "vendor",
+                        "values": [{"value": "Acme Inc", "count": 42},
+                                   {"value": "Globex", "count": 7}]
+                    }
+                }
+            ),
+            400: "Missing or invalid field / filters"
+        }
+    )
+    def get(self, request: Request) -> Response:
+        if not entity_index_enabled():
+            return Response({'error': 'Entity index is disabled (set ENTITY_INDEX=1).'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        field = request.query_params.get('field', '')
+        if field not in searchable_fields():
+            return Response({'error': f'Unknown facet field: {field}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 10))
+            values = entity_facets(field, _entity_filters(request, ('field', 'limit')),
+                                   limit=limit)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'field': field, 'values': values}, status=status.HTTP_200_OK)
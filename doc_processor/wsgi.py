@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "doc_processor.settings")
 
 application = get_wsgi_application()
+
+# 🔥 Open ChromaDB and load the embedding model before the first request
+# (management commands import the same modules but stay lazy).
+if os.environ.get("CHROMA_WARMUP", "1") != "0":
+    from documents.chroma_client import warmup
+
+    warmup()
@@ -0,0 +1,85 @@
+# 🗃️ Small In-Process Caching Helpers
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+def text_hash(text: str) -> str:
+    """
+    🔑 Stable content hash (SHA-256 hex) used as a cache key for texts.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache(Generic[V]):
+    """
+    🗃️ Thread-safe, bounded least-recently-used cache with hit/miss counters.
+
+    Args:
+        max_size (int): Maximum number of entries (0 disables caching).
+        ttl (float|None): Seconds an entry stays valid (None = until evicted).
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None) -> None:
+        self.max_size = max(0, max_size)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            if key in self._expires and self._expires[key] <= time.monotonic():
+                del self._data[key]
+                del self._expires[key]
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return self._data[key]
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, value: V) -> None:
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.max_size:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        📊 Return hits, misses, evictions, current size and capacity.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._data),
+                "max_size": self.max_size,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
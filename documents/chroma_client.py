@@ -2,35 +2,511 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from typing import Any, Dict, List
+import os
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-import chromadb
-from chromadb.utils import embedding_functions
+from documents.cache import text_hash
+from documents.chunking import (
+    PASSAGE_OVERFETCH,
+    aggregate_hits,
+    passage_aggregation,
+    passage_id,
+    passage_max_words,
+    passage_overlap,
+    split_passages,
+)
+from documents.embedding_cache import get_embedding_cache
+from documents.inference import RemoteFirstEmbeddingFunction
+from documents.lexical_index import get_lexical_index
+from documents.vector_store import VECTOR_STORE_ENV, open_vector_store
 
 # 🛠️ Logger Setup (for ChromaDB interactions)
 logger = logging.getLogger(__name__)
 
+# ⚙️ Storage settings
+CHROMA_PATH = "./chroma_db"
+NUMPY_STORE_PATH = "./vector_db"  # VECTOR_STORE=numpy
+COLLECTION_NAME = "documents"
 
-# 💾 Persistent ChromaDB Client
-client = chromadb.PersistentClient(path="./chroma_db")
+# 🗂️ Partitioned layout (optional)
+# With CHROMA_PARTITION_KEY set (e.g. "document_type"), each value of that
+# metadata key gets its own collection "documents__<value>", so every HNSW
+# index stays small. Writes are routed by the record's value; queries
+# filtered on the key only touch matching partitions, others fan out to all
+# partitions and merge by distance.
+CHROMA_PARTITION_KEY_ENV = "CHROMA_PARTITION_KEY"
+PARTITION_SEPARATOR = "__"
+UNROUTED_PARTITION = "other"
 
+# 🔑 Document ids: "content" (default) derives the id from the text, so the
+# same document is stored once (writes are upserts); "uuid" = random ids.
+DOCUMENT_ID_MODE_ENV = "DOCUMENT_ID_MODE"
 
-# 🧠 Embedding Function (using SentenceTransformers)
-embedding_func = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="all-MiniLM-L6-v2"
-)
+# 📦 Bulk ingestion: records per embed/upsert call
+DEFAULT_STORE_BATCH_SIZE = 256
+# (id, text, metadata, embedding)
+StoreItem = Tuple[str, str, Dict[str, Any], Optional[List[float]]]
 
+# 🧠 Embedding model (SentenceTransformers)
+# Served by the shared inference server when INFERENCE_SOCKET is set;
+# the in-process model is only loaded if the server can't answer.
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# 🔀 Active collection pointer
+# reembed_collection builds a copy of the collection embedded by another
+# model, then points the app at it by atomically replacing this JSON file in
+# the store directory ({"collection": ..., "embedding_model": ...}). Without
+# the file, COLLECTION_NAME and EMBEDDING_MODEL_NAME are active. Running
+# processes pick up a switch within ACTIVE_CHECK_INTERVAL seconds.
+ACTIVE_COLLECTION_FILE = "active_collection.json"
+ACTIVE_CHECK_INTERVAL = 1.0
+
+
+# 💤 Lazily created singletons
+# Importing this module is cheap: the client, embedding function and
+# collection are built on first use (or by warmup()), once per process.
+_client: Any = None
+_embedding_func: Any = None
+_collection: Any = None
+_partitions: Dict[str, Any] = {}
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_active: Optional[Dict[str, str]] = None
+_active_signature: Any = None
+_active_checked_at = 0.0
+_init_lock = threading.RLock()
+
+
+def store_path() -> str:
+    """
+    📁 Directory of the configured vector store backend.
+    """
+    backend = os.environ.get(VECTOR_STORE_ENV, "chroma").lower()
+    return NUMPY_STORE_PATH if backend == "numpy" else CHROMA_PATH
+
+
+def active_collection() -> Dict[str, str]:
+    """
+    🔀 The active ``{"collection", "embedding_model"}``: the pointer file's, or the
+    defaults.
+
+    Re-read at most every ``ACTIVE_CHECK_INTERVAL`` seconds; when it changed,
+    the cached collections and embedding function are dropped so the next
+    use opens the new ones.
+    """
+    global _active, _active_signature, _active_checked_at
+    global _collection, _partitions, _embedding_func
+    now = time.monotonic()
+    if _active is not None and now - _active_checked_at < ACTIVE_CHECK_INTERVAL:
+        return _active
+
+    path = os.path.join(store_path(), ACTIVE_COLLECTION_FILE)
+    try:
+        stat = os.stat(path)
+        signature: Any = (path, stat.st_ino, stat.st_mtime_ns)
+    except FileNotFoundError:
+        signature = None
+    with _init_lock:
+        if _active is None or signature != _active_signature:
+            active = {"collection": COLLECTION_NAME,
+                      "embedding_model": EMBEDDING_MODEL_NAME}
+            if signature is not None:
+                with open(path, encoding="utf-8") as f:
+                    active.update({key: str(value)
+                                   for key, value in json.load(f).items()
+                                   if key in active})
+            if _active is not None and active != _active:
+                logger.info(f"🔀 Active collection is now {active['collection']} "
+                            f"({active['embedding_model']})")
+                _collection, _partitions, _embedding_func = None, {}, None
+            _active, _active_signature = active, signature
+        _active_checked_at = now
+    return _active
+
+
+def activate_collection(name: str, embedding_model: str) -> None:
+    """
+    🔀 Point every process at collection ``name`` (and its partitions), embedded
+    by ``embedding_model``.
+
+    The pointer file is replaced atomically, so readers see either the old
+    or the new pointer.
+    """
+    global _active_checked_at
+    path = os.path.join(store_path(), ACTIVE_COLLECTION_FILE)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        activated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        json.dump({"collection": name, "embedding_model": embedding_model,
+                   "activated_at": activated_at}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _active_checked_at = 0.0  # this process switches now
+    active_collection()
+
+
+def get_client() -> Any:
+    """
+    💾 Vector store client (opened on first use): ChromaDB at ``CHROMA_PATH``, or
+    the NumPy engine at ``NUMPY_STORE_PATH`` when $VECTOR_STORE is "numpy".
+    """
+    global _client
+    if _client is None:
+        with _init_lock:
+            if _client is None:
+                backend = os.environ.get(VECTOR_STORE_ENV, "chroma").lower()
+                path = store_path()
+                logger.info(f"💾 Opening {backend} vector store at {path}")
+                _client = open_vector_store(backend, path)
+    return _client
+
+
+def build_embedding_function(model_name: str) -> Any:
+    """
+    🧠 Embedding function for SentenceTransformer ``model_name`` (the model itself
+    loads on first embed).
+    """
+    from chromadb.utils import embedding_functions
+
+    return RemoteFirstEmbeddingFunction(
+        lambda: embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=model_name
+        ),
+        name="sentence_transformer",
+        config={"model_name": model_name},
+        cache=get_embedding_cache(model_name)
+    )
+
+
+def embedding_model_name() -> str:
+    """
+    🧠 Name of the active collection's embedding model.
+    """
+    return active_collection()["embedding_model"]
+
+
+def get_embedding_function() -> Any:
+    """
+    🧠 Collection embedding function, for the active collection's model.
+
+    Stores, text queries and ``embed_texts`` all go through it, so with
+    $EMBEDDING_CACHE_DIR set a text is embedded once across all of them.
+    """
+    global _embedding_func
+    model_name = embedding_model_name()
+    if _embedding_func is None:
+        with _init_lock:
+            if _embedding_func is None:
+                _embedding_func = build_embedding_function(model_name)
+    return _embedding_func
+
+
+def get_collection() -> Any:
+    """
+    📚 The active collection, ``documents`` by default (created if missing).
+    """
+    global _collection
+    name = active_collection()["collection"]
+    if _collection is None:
+        with _init_lock:
+            if _collection is None:
+                _collection = get_client().get_or_create_collection(
+                    name=name,
+                    embedding_function=get_embedding_function()
+                )
+    return _collection
+
+
+def get_partition_key() -> Optional[str]:
+    """
+    🗂️ Metadata key collections are partitioned by ($CHROMA_PARTITION_KEY), or None.
+    """
+    return os.environ.get(CHROMA_PARTITION_KEY_ENV) or None
+
+
+def partition_collection_name(value: Any) -> str:
+    """
+    🏷️ Collection name for one partition value (sanitized to Chroma's name rules).
+
+    Missing/empty values go to ``documents__other`` (with the active collection's name).
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(value or "")).strip("._-")
+    slug = slug or UNROUTED_PARTITION
+    return f"{active_collection()['collection']}{PARTITION_SEPARATOR}{slug}"[:512]
+
+
+def get_partition(name: str) -> Any:
+    """
+    📚 Partition collection ``name`` (created if missing).
+    """
+    active_collection()
+    collection = _partitions.get(name)
+    if collection is None:
+        with _init_lock:
+            collection = _partitions.get(name)
+            if collection is None:
+                collection = get_client().get_or_create_collection(
+                    name=name,
+                    embedding_function=get_embedding_function()
+                )
+                _partitions[name] = collection
+    return collection
+
+
+def list_partitions() -> List[str]:
+    """
+    🗂️ Names of the existing partition collections (including ones created by
+    other processes).
+    """
+    prefix = active_collection()["collection"] + PARTITION_SEPARATOR
+    names = set(get_client().list_collections())
+    return sorted(str(name) for name in names if str(name).startswith(prefix))
+
+
+def _partition_values(where: Optional[Dict[str, Any]], key: str) -> Optional[List[Any]]:
+    """
+    🧭 Values of ``key`` a ``where`` filter restricts to (None = unrestricted).
+
+    Understands ``{key: v}``, ``{key: {"$eq": v}}``, ``{key: {"$in": [...]}}``
+    and those clauses inside a top-level ``$and``.
+    """
+    if not where:
+        return None
+    clauses = where["$and"] if "$and" in where else [where]
+    for clause in clauses:
+        if key not in clause:
+            continue
+        condition = clause[key]
+        if not isinstance(condition, dict):
+            return [condition]
+        if "$eq" in condition:
+            return [condition["$eq"]]
+        if "$in" in condition:
+            return list(condition["$in"])
+    return None
 
-# 📚 Documents Collection Setup (created if missing)
-collection = client.get_or_create_collection(
-    name="documents",
-    embedding_function=embedding_func
-)
+
+def _target_collections(where: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """
+    🎯 Collections a read has to visit: the single collection, or the existing
+    partitions matching the filter (all of them when it doesn't restrict the key).
+    """
+    key = get_partition_key()
+    if key is None:
+        return [get_collection()]
+    names = list_partitions()
+    values = _partition_values(where, key)
+    if values is not None:
+        wanted = {partition_collection_name(value) for value in values}
+        names = [name for name in names if name in wanted]
+    return [get_partition(name) for name in names]
+
+
+def all_collections() -> List[Any]:
+    """
+    📚 Every collection holding documents (the single collection, or all partitions).
+    """
+    return _target_collections()
+
+
+def _write_collection(metadata: Dict[str, Any]) -> Any:
+    key = get_partition_key()
+    if key is None:
+        return get_collection()
+    return get_partition(partition_collection_name(metadata.get(key)))
+
+
+def _fanout(collections: Sequence[Any], call: Any) -> List[Any]:
+    """
+    🌐 Run ``call(collection)`` on every collection, in parallel when there are several.
+    """
+    global _fanout_pool
+    if len(collections) <= 1:
+        return [call(collection) for collection in collections]
+    if _fanout_pool is None:
+        with _init_lock:
+            if _fanout_pool is None:
+                _fanout_pool = ThreadPoolExecutor(max_workers=8,
+                                                  thread_name_prefix="chroma-fanout")
+    return list(_fanout_pool.map(call, collections))
+
+
+def _merge_query_results(results: List[Dict[str, Any]],
+                         n_results: int) -> Dict[str, Any]:
+    """
+    🔀 Merge single-query results from several partitions into the ``n_results`` closest.
+    """
+    fields = [f for f in ("ids", "documents", "metadatas", "distances")
+              if any(r.get(f) is not None for r in results)]
+    rows = []
+    for result in results:
+        ids = (result.get("ids") or [[]])[0]
+        for i in range(len(ids)):
+            rows.append({f: (result.get(f) or [[None] * len(ids)])[0][i]
+                         for f in fields})
+    rows.sort(key=lambda row: float("inf") if row.get("distances") is None
+              else float(row["distances"]))
+    rows = rows[:n_results]
+    return {f: [[row[f] for row in rows]] for f in fields} if fields else {"ids": [[]]}
+
+
+def _aggregate_passages(results: Dict[str, Any], n_results: int) -> Dict[str, Any]:
+    """
+    🧮 Turn a passage-level query result into the ``n_results`` best documents.
+
+    Each document is represented by its best passage (text and distance);
+    ids are the parent document ids.
+    """
+    ids = (results.get("ids") or [[]])[0]
+    metadatas = [m or {} for m in (results.get("metadatas") or [[{}] * len(ids)])[0]]
+    distances = (results.get("distances") or [[0.0] * len(ids)])[0]
+    order = aggregate_hits(ids, metadatas, distances, passage_aggregation())[:n_results]
+
+    aggregated: Dict[str, Any] = {
+        field: [[results[field][0][i] for i in order]]
+        for field in ("documents", "distances") if results.get(field) is not None
+    }
+    aggregated["ids"] = [[str(metadatas[i].get("parent_id") or ids[i]) for i in order]]
+    aggregated["metadatas"] = [[
+        {k: v for k, v in metadatas[i].items() if k not in ("parent_id", "passage")}
+        for i in order
+    ]]
+    return aggregated
+
+
+def _query(n_results: int, where: Optional[Dict[str, Any]] = None,
+           **kwargs: Any) -> Dict[str, Any]:
+    """
+    🔎 One embedding query routed to (or fanned out over) the relevant collections.
+
+    With passage chunking on, more passages are fetched and folded back into
+    ``n_results`` documents.
+    """
+    chunked = passage_max_words() is not None
+    fetch = n_results * PASSAGE_OVERFETCH if chunked else n_results
+    kwargs["n_results"] = fetch
+    if where:
+        kwargs["where"] = where
+    if chunked or get_partition_key() is not None:
+        include = kwargs.setdefault("include", ["documents", "metadatas", "distances"])
+        kwargs["include"] = [
+            *include, *(f for f in ("metadatas", "distances") if f not in include)
+        ]
+
+    collections = _target_collections(where)
+    if get_partition_key() is None:
+        results: Dict[str, Any] = collections[0].query(**kwargs)
+    else:
+        results = _merge_query_results(
+            _fanout(collections, lambda c: c.query(**kwargs)), fetch
+        )
+    return _aggregate_passages(results, n_results) if chunked else results
+
+
+def warmup() -> None:
+    """
+    🔥 Build everything up front (client, collection, embedding model) so a
+    server's first request doesn't pay for it.
+    """
+    if get_partition_key() is None:
+        get_collection()
+    else:
+        for name in list_partitions():
+            get_partition(name)
+    get_embedding_function()(["warmup"])
+    logger.info("🔥 ChromaDB client and embedding model ready.")
+
+
+# 🧠 Embed Texts
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """
+    🧠 Embed texts with the collection's embedding function.
+
+    Lets callers compute an embedding once and reuse it for both querying
+    and storage (see ``embedding`` on ``store_document_in_chromadb``).
+
+    Args:
+        texts (list): Texts to embed.
+
+    Returns:
+        list: One embedding (list of floats) per text.
+    """
+    return [[float(x) for x in vector] for vector in get_embedding_function()(texts)]
+
+
+# 🔑 Document Ids
+def content_document_id(text: str) -> str:
+    """
+    🔑 Deterministic id for a document text (its SHA-256, in UUID format).
+    """
+    return str(uuid.UUID(hex=text_hash(text)[:32]))
+
+
+def content_ids_enabled() -> bool:
+    """
+    🔑 Whether new documents get content-hash ids ($DOCUMENT_ID_MODE != "uuid").
+    """
+    return os.environ.get(DOCUMENT_ID_MODE_ENV, "content").lower() != "uuid"
+
+
+def new_document_id(text: str) -> str:
+    """
+    🔑 Id for a new document: ``content_document_id(text)``, or a random UUID
+    when $DOCUMENT_ID_MODE is "uuid".
+    """
+    return content_document_id(text) if content_ids_enabled() else str(uuid.uuid4())
+
+
+# 🛠️ Flatten Metadata
+def flatten_metadata(document_type: str, entities: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    🛠️ Build Chroma metadata: ``document_type`` plus entity fields, with list
+    values joined into comma-separated strings (metadata must be flat primitives).
+    """
+    flat_entities: Dict[str, Any] = {
+        key: ", ".join(value) if isinstance(value, list) else str(value)
+        for key, value in entities.items()
+    }
+    return {"document_type": document_type, **flat_entities}
+
+
+def entity_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    🧹 ``metadata`` without the passage links, for display.
+    """
+    return {
+        key: value for key, value in metadata.items()
+        if key not in ("parent_id", "passage")
+    }
+
+
+def unflatten_metadata(metadata: Dict[str, Any]) -> Tuple[str, Dict[str, List[str]]]:
+    """
+    🛠️ Inverse of ``flatten_metadata``: (document_type, entities as lists).
+
+    Values are split on ", ", so an entity that itself contains ", " comes
+    back as several.
+    """
+    entities = {
+        key: str(value).split(", ")
+        for key, value in metadata.items()
+        if key != "document_type" and value is not None
+    }
+    return str(metadata.get("document_type", "")), entities
 
 
 # 📥 Store Document in ChromaDB
-def store_document_in_chromadb(doc_id: str, text: str, document_type: str, entities: Dict[str, List[str]]) -> None:
+def store_document_in_chromadb(doc_id: str, text: str, document_type: str,
+                               entities: Dict[str, List[str]],
+                               embedding: Optional[List[float]] = None) -> None:
     """
     📝 Store document embedding and metadata in ChromaDB.
 
@@ -39,35 +515,203 @@ def store_document_in_chromadb(doc_id: str, text: str, document_type: str, entit
         text (str): Full document text.
         document_type (str): Type/category of document (e.g., invoice, email).
         entities (dict): Extracted entities to store as metadata.
+        embedding (list|None): Precomputed embedding; skips re-embedding the text.
 
     Notes:
         - Metadata must consist of flat primitive values.
         - Lists in entities are converted to comma-separated strings.
+        - Upserts: storing an existing id replaces that document.
+        - With $PASSAGE_MAX_WORDS set, long texts are stored as passages.
+        - With $LEXICAL_INDEX_PATH set, the text is also added to the BM25 index.
+        - With $ENTITY_INDEX set, entities are also written to the entity tables.
     """
     try:
-        # 🛠️ Flatten entity values (convert lists to strings)
-        flat_entities = {
-            key: ", ".join(value) if isinstance(value, list) else str(value)
-            for key, value in entities.items()
-        }
-
-        metadata = {
-            "document_type": document_type,
-            **flat_entities
-        }
+        metadata = flatten_metadata(document_type, entities)
 
         logger.info(f"📥 Storing document {doc_id} in ChromaDB (type: {document_type})")
-        collection.add(
-            ids=[doc_id],
-            documents=[text],
-            metadatas=[metadata]
-        )
+        if passage_max_words() is not None:
+            _upsert_batch([(doc_id, text, metadata, embedding)])
+        else:
+            record: Dict[str, Any] = {
+                "ids": [doc_id],
+                "documents": [text],
+                "metadatas": [metadata],
+            }
+            if embedding is not None:
+                record["embeddings"] = [embedding]
+            _write_collection(metadata).upsert(**record)
+            _index_lexical([(doc_id, text, metadata, None)])
+        _mirror_entities([(doc_id, document_type, entities)])
         logger.info(f"✅ Document {doc_id} stored successfully.")
 
     except Exception as e:
         logger.error(f"❌ Failed to store document {doc_id} in ChromaDB: {e}", exc_info=True)
 
 
+# 📦 Store Many Documents in ChromaDB
+def store_documents_in_chromadb(
+    records: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_STORE_BATCH_SIZE
+) -> List[Tuple[str, str]]:
+    """
+    📦 Store documents in bulk: texts are embedded and inserted ``batch_size`` at a time.
+
+    Args:
+        records (iterable): Dicts with the arguments of
+            ``store_document_in_chromadb`` (``doc_id``, ``text``,
+            ``document_type``, ``entities`` and optional ``embedding``).
+        batch_size (int): Records per embedding call and ``collection.upsert``.
+
+    Returns:
+        list: ``(doc_id, error)`` for every record that could not be stored
+        (empty when everything was stored).
+
+    Notes:
+        - When a whole batch is rejected, its records are retried one by one
+          so a single bad record doesn't fail its neighbours.
+    """
+    failures: List[Tuple[str, str]] = []
+    batch: List[StoreItem] = []
+    batch_entities: List[Tuple[str, str, Dict[str, Any]]] = []
+
+    def flush() -> None:
+        failed = _store_batch(batch)
+        failures.extend(failed)
+        failed_ids = {doc_id for doc_id, _ in failed}
+        _mirror_entities([record for record in batch_entities
+                          if record[0] not in failed_ids])
+
+    for record in records:
+        doc_id = str(record.get("doc_id", ""))
+        try:
+            metadata = flatten_metadata(record["document_type"],
+                                        record.get("entities") or {})
+            batch.append((doc_id, record["text"], metadata, record.get("embedding")))
+            batch_entities.append((doc_id, record["document_type"],
+                                   record.get("entities") or {}))
+        except Exception as e:
+            failures.append((doc_id, f"invalid record: {e}"))
+            continue
+        if len(batch) >= max(1, batch_size):
+            flush()
+            batch, batch_entities = [], []
+
+    if batch:
+        flush()
+
+    for doc_id, error in failures:
+        logger.error(f"❌ Failed to store document {doc_id} in ChromaDB: {error}")
+    return failures
+
+
+def _store_batch(batch: List[StoreItem]) -> List[Tuple[str, str]]:
+    """
+    📥 Embed the batch's texts in one call and write it with one ``upsert``.
+    """
+    try:
+        _upsert_batch(batch)
+        logger.info(f"✅ Stored {len(batch)} documents.")
+        return []
+    except Exception as e:
+        if len(batch) == 1:
+            return [(batch[0][0], str(e))]
+        logger.warning(
+            f"⚠️ Batch of {len(batch)} documents rejected ({e}); retrying one by one."
+        )
+
+    failures: List[Tuple[str, str]] = []
+    for item in batch:
+        try:
+            _upsert_batch([item])
+        except Exception as e:
+            failures.append((item[0], str(e)))
+    return failures
+
+
+def _with_passages(batch: List[StoreItem]) -> List[StoreItem]:
+    """
+    ✂️ Replace long documents by their passages (ids ``<doc>``, ``<doc>#1``, ...;
+    metadata copied plus ``parent_id`` and ``passage``). Off unless
+    $PASSAGE_MAX_WORDS is set.
+    """
+    max_words = passage_max_words()
+    if max_words is None:
+        return batch
+    expanded: List[StoreItem] = []
+    for doc_id, text, metadata, embedding in batch:
+        passages = split_passages(text, max_words, passage_overlap())
+        if len(passages) == 1:
+            expanded.append((doc_id, text, metadata, embedding))
+            continue
+        for i, passage in enumerate(passages):
+            expanded.append((passage_id(doc_id, i), passage,
+                             {**metadata, "parent_id": doc_id, "passage": i}, None))
+    return expanded
+
+
+def _upsert_batch(batch: List[StoreItem]) -> None:
+    # Chroma rejects repeated ids within one call; the last record wins, as it
+    # would across calls
+    documents = list({item[0]: item for item in batch}.values())
+    # Passages of all documents are embedded together below
+    batch = _with_passages(documents)
+    missing = [i for i, item in enumerate(batch) if item[3] is None]
+    embeddings = [item[3] for item in batch]
+    if missing:
+        computed = embed_texts([batch[i][1] for i in missing])
+        for i, vector in zip(missing, computed):
+            embeddings[i] = vector
+
+    # One upsert per target collection (a single one unless partitioned)
+    groups: Dict[Any, List[int]] = defaultdict(list)
+    collections: Dict[Any, Any] = {}
+    for i, item in enumerate(batch):
+        collection = _write_collection(item[2])
+        collections[id(collection)] = collection
+        groups[id(collection)].append(i)
+
+    for key, indices in groups.items():
+        collections[key].upsert(
+            ids=[batch[i][0] for i in indices],
+            documents=[batch[i][1] for i in indices],
+            metadatas=[batch[i][2] for i in indices],
+            embeddings=[embeddings[i] for i in indices]
+        )
+    # Whole documents, not passages: BM25 normalizes for length itself
+    _index_lexical(documents)
+
+
+def _index_lexical(batch: List[StoreItem]) -> None:
+    """
+    🔤 Add stored documents to the BM25 index (when $LEXICAL_INDEX_PATH is set).
+
+    The vector store is the source of truth: a failure here is logged, not
+    raised (``rebuild_lexical_index`` brings the index back in sync).
+    """
+    index = get_lexical_index()
+    if index is None:
+        return
+    try:
+        index.add([item[0] for item in batch], [item[1] for item in batch],
+                  [item[2] for item in batch])
+    except Exception as e:
+        logger.warning(
+            f"⚠️ Failed to update the lexical index for {len(batch)} documents: {e}"
+        )
+
+
+def _mirror_entities(records: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+    """
+    🏷️ Write stored documents' entities to the relational entity index (when
+    $ENTITY_INDEX is set).
+    """
+    if not records:
+        return
+    # Imported here: the models need Django's app registry, this module doesn't
+    from documents.entity_index import mirror_entities
+
+    mirror_entities(records)
+
+
 # 🔍 Query Similar Documents
 def query_similar_documents(query_text: str, top_k: int = 5) -> Dict[str, Any]:
     """
@@ -82,10 +726,299 @@ def query_similar_documents(query_text: str, top_k: int = 5) -> Dict[str, Any]:
     """
     try:
         logger.info(f"🔍 Querying ChromaDB for top {top_k} similar documents.")
-        results = collection.query(query_texts=[query_text], n_results=top_k)
+        if get_partition_key() is None and passage_max_words() is None:
+            results: Dict[str, Any] = get_collection().query(
+                query_texts=[query_text], n_results=top_k
+            )
+        else:
+            # Embed once instead of once per partition
+            results = _query(top_k, query_embeddings=embed_texts([query_text]))
         logger.info("✅ Query completed successfully.")
         return results
 
     except Exception as e:
         logger.error(f"❌ Error querying ChromaDB: {e}", exc_info=True)
         return {}
+
+
+# 🧭 Query by Precomputed Embedding
+def query_by_embedding(embedding: List[float], top_k: int = 5) -> Dict[str, Any]:
+    """
+    🧭 Search for nearest documents using an already-computed embedding.
+
+    Args:
+        embedding (list): Query embedding.
+        top_k (int): Number of neighbours to retrieve.
+
+    Returns:
+        dict: Query results (ids, distances, metadatas), or {} on error.
+    """
+    try:
+        return _query(top_k, query_embeddings=[embedding],
+                      include=["metadatas", "distances"])
+
+    except Exception as e:
+        logger.error(f"❌ Error querying ChromaDB by embedding: {e}", exc_info=True)
+        return {}
+
+
+# 🔎 Filtered Search by Embedding
+def search_by_embedding(embedding: List[float], top_k: int = 10,
+                        where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    🔎 Nearest documents to ``embedding``, optionally restricted by a metadata filter.
+
+    Unlike ``query_by_embedding`` errors are raised, so callers can tell
+    "no matches" from "Chroma unavailable".
+
+    Args:
+        embedding (list): Query embedding.
+        top_k (int): Number of results.
+        where (dict|None): Chroma ``where`` filter on metadata.
+
+    Returns:
+        dict: Query result with ids, documents, metadatas and distances.
+    """
+    return _query(top_k, where=where, query_embeddings=[embedding],
+                  include=["documents", "metadatas", "distances"])
+
+
+# 📄 Fetch One Stored Document
+def get_document(doc_id: str) -> Optional[Dict[str, Any]]:
+    """
+    📄 Stored text and metadata of ``doc_id``, or None if it isn't stored.
+
+    Returns:
+        dict|None: ``{"document_id", "text", "metadata"}``.
+    """
+    for collection in _target_collections():
+        found = collection.get(ids=[doc_id], include=["documents", "metadatas"])
+        if found.get("ids"):
+            return {
+                "document_id": doc_id,
+                "text": (found.get("documents") or [""])[0],
+                "metadata": (found.get("metadatas") or [{}])[0] or {},
+            }
+    return None
+
+
+# 📄 Fetch Stored Documents by Id
+def get_documents(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    📄 Stored text and metadata of each of ``ids`` that is stored (one ``get``
+    per collection, stopping once all are found).
+
+    Returns:
+        dict: id -> ``{"text", "metadata"}``.
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    for collection in _target_collections():
+        pending = [doc_id for doc_id in ids if doc_id not in found]
+        if not pending:
+            break
+        page = collection.get(ids=pending, include=["documents", "metadatas"])
+        documents = page.get("documents") or [""] * len(page.get("ids") or [])
+        metadatas = page.get("metadatas") or [{}] * len(page.get("ids") or [])
+        for doc_id, text, metadata in zip(page.get("ids") or [], documents, metadatas):
+            found[doc_id] = {"text": text or "", "metadata": metadata or {}}
+    return found
+
+
+# 📄 Fetch the Passages of Stored Documents
+def get_passages(
+    parent_ids: List[str]
+) -> Dict[str, List[Tuple[str, str, Dict[str, Any]]]]:
+    """
+    ✂️ Every stored passage of each of ``parent_ids`` (documents stored whole
+    have none).
+
+    Returns:
+        dict: parent id -> ``(id, text, metadata)`` per passage, in passage order.
+    """
+    found: Dict[str, List[Tuple[str, str, Dict[str, Any]]]] = {}
+    if not parent_ids:
+        return found
+    for collection in _target_collections():
+        page = collection.get(
+            where={"parent_id": {"$in": list(parent_ids)}},
+            include=["documents", "metadatas"],
+        )
+        documents = page.get("documents") or [""] * len(page.get("ids") or [])
+        metadatas = page.get("metadatas") or [{}] * len(page.get("ids") or [])
+        for row_id, text, metadata in zip(page.get("ids") or [], documents, metadatas):
+            metadata = metadata or {}
+            found.setdefault(str(metadata["parent_id"]), []).append(
+                (row_id, text or "", metadata)
+            )
+    for passages in found.values():
+        passages.sort(key=lambda row: int(row[2].get("passage") or 0))
+    return found
+
+
+# 📄 Page Through Stored Documents
+def get_documents_page(offset: int, limit: int) -> Dict[str, Any]:
+    """
+    📄 Fetch one page of stored documents (ids, texts, metadatas), no embeddings.
+
+    Args:
+        offset (int): Documents to skip.
+        limit (int): Page size.
+
+    Returns:
+        dict: Chroma ``get`` result; an empty ``ids`` list past the end.
+    """
+    if get_partition_key() is None:
+        page: Dict[str, Any] = get_collection().get(
+            offset=offset,
+            limit=limit,
+            include=["documents", "metadatas"]
+        )
+        return page
+
+    # Partitioned: one logical sequence over the partitions in name order
+    merged: Dict[str, Any] = {"ids": [], "documents": [], "metadatas": []}
+    for collection in _target_collections():
+        count = collection.count()
+        if offset >= count:
+            offset -= count
+            continue
+        part = collection.get(offset=offset, limit=limit - len(merged["ids"]),
+                              include=["documents", "metadatas"])
+        for field in merged:
+            merged[field].extend(part.get(field) or [])
+        offset = 0
+        if len(merged["ids"]) >= limit:
+            break
+    return merged
+
+
+# ✏️ Update Stored Metadata
+def update_document_metadata(ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+    """
+    ✏️ Overwrite metadata fields of stored documents in one ``update`` call.
+
+    Chroma merges the given keys into the existing metadata; a ``None``
+    value removes that key. When partitioned, each id is updated in the
+    partition holding it; changing the partition key's value does not move
+    a document (run ``repartition_collection`` for that).
+    """
+    if not ids:
+        return
+    index = get_lexical_index()
+    if index is not None:
+        index.update_metadata(ids, metadatas)
+    if get_partition_key() is None:
+        get_collection().update(ids=ids, metadatas=metadatas)
+        return
+
+    pending = dict(zip(ids, metadatas))
+    for collection in _target_collections():
+        found = [doc_id
+                 for doc_id in collection.get(ids=list(pending), include=[])["ids"]
+                 if doc_id in pending]
+        if found:
+            collection.update(ids=found,
+                              metadatas=[pending.pop(doc_id) for doc_id in found])
+        if not pending:
+            break
+
+
+# 🗂️ Move Documents Into Their Partitions
+def repartition_documents(batch_size: int = DEFAULT_STORE_BATCH_SIZE) -> int:
+    """
+    🗂️ Move every document into the partition its metadata routes to.
+
+    Covers switching an existing single ``documents`` collection to the
+    partitioned layout, and documents whose partition key value changed.
+    Each page is upserted into its target before being deleted from the
+    source, so an interrupted run can simply be repeated.
+
+    Args:
+        batch_size (int): Documents read (and moved) per call.
+
+    Returns:
+        int: Number of documents moved.
+
+    Raises:
+        ValueError: $CHROMA_PARTITION_KEY is not set.
+    """
+    key = get_partition_key()
+    if key is None:
+        raise ValueError(f"${CHROMA_PARTITION_KEY_ENV} is not set.")
+
+    base = active_collection()["collection"]
+    sources = list_partitions()
+    if base in get_client().list_collections():
+        sources.insert(0, base)
+
+    moved = 0
+    for name in sources:
+        source = get_collection() if name == base else get_partition(name)
+        offset = 0
+        while True:
+            page = source.get(offset=offset, limit=batch_size,
+                              include=["documents", "metadatas", "embeddings"])
+            ids = page.get("ids") or []
+            if not ids:
+                break
+
+            targets: Dict[str, List[int]] = defaultdict(list)
+            for i, metadata in enumerate(page["metadatas"]):
+                target = partition_collection_name((metadata or {}).get(key))
+                if target != name:
+                    targets[target].append(i)
+            for target, indices in targets.items():
+                get_partition(target).upsert(
+                    ids=[ids[i] for i in indices],
+                    documents=[page["documents"][i] for i in indices],
+                    metadatas=[page["metadatas"][i] for i in indices],
+                    embeddings=[page["embeddings"][i] for i in indices]
+                )
+
+            moved_ids = [ids[i] for indices in targets.values() for i in indices]
+            if moved_ids:
+                source.delete(ids=moved_ids)
+                logger.info(f"🗂️ Moved {len(moved_ids)} documents out of {name}")
+            offset += len(ids) - len(moved_ids)
+            moved += len(moved_ids)
+    return moved
+
+
+# 📥 Bulk-Add Embedded Records
+def add_embedded_records(ids: List[str], documents: List[str],
+                         metadatas: List[Dict[str, Any]], embeddings: Sequence[Any],
+                         replace: bool = False) -> int:
+    """
+    📥 Write records that already carry their embeddings (e.g. from a snapshot)
+    as stored rows, passages included, without embedding anything.
+
+    Rows are routed to the collection their metadata belongs to in this
+    node's layout (partitioned or not), one call per target collection.
+
+    Args:
+        ids (list): Row ids.
+        documents (list): Row texts.
+        metadatas (list): Row metadata (as stored: flattened, with
+            ``parent_id``/``passage`` on passages).
+        embeddings (sequence): One vector per row.
+        replace (bool): Upsert (overwrite existing ids) instead of add (keep them).
+
+    Returns:
+        int: Number of rows written.
+    """
+    groups: Dict[Any, List[int]] = defaultdict(list)
+    collections: Dict[Any, Any] = {}
+    for i, metadata in enumerate(metadatas):
+        collection = _write_collection(metadata or {})
+        collections[id(collection)] = collection
+        groups[id(collection)].append(i)
+
+    for key, indices in groups.items():
+        write = collections[key].upsert if replace else collections[key].add
+        write(
+            ids=[ids[i] for i in indices],
+            documents=[documents[i] for i in indices],
+            metadatas=[metadatas[i] for i in indices],
+            embeddings=[embeddings[i] for i in indices]
+        )
+    return len(ids)
@@ -0,0 +1,148 @@
+# ✂️ Passage Chunking for Long Documents
+# MiniLM only reads the first ~256 word pieces of its input, so long
+# documents are stored as overlapping passages (linked to their parent
+# document) and query hits are folded back into one score per document.
+# Disabled unless PASSAGE_MAX_WORDS is set.
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+PASSAGE_MAX_WORDS_ENV = "PASSAGE_MAX_WORDS"
+PASSAGE_OVERLAP_WORDS_ENV = "PASSAGE_OVERLAP_WORDS"
+PASSAGE_AGGREGATION_ENV = "PASSAGE_AGGREGATION"
+DEFAULT_OVERLAP_WORDS = 32
+AGGREGATIONS = ("max", "sum")
+
+# Passages fetched per requested document when aggregating query hits
+PASSAGE_OVERFETCH = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def passage_max_words() -> Optional[int]:
+    """
+    ✂️ Words per passage ($PASSAGE_MAX_WORDS), or None when chunking is off.
+    """
+    value = int(os.environ.get(PASSAGE_MAX_WORDS_ENV) or 0)
+    return value if value > 0 else None
+
+
+def passage_overlap() -> int:
+    """
+    ✂️ Words repeated between consecutive passages ($PASSAGE_OVERLAP_WORDS).
+    """
+    return int(os.environ.get(PASSAGE_OVERLAP_WORDS_ENV) or DEFAULT_OVERLAP_WORDS)
+
+
+def passage_aggregation() -> str:
+    """
+    🧮 How passage hits score their document ($PASSAGE_AGGREGATION): "max" or "sum".
+    """
+    mode = os.environ.get(PASSAGE_AGGREGATION_ENV, "max").lower()
+    return mode if mode in AGGREGATIONS else "max"
+
+
+def split_passages(text: str, max_words: int,
+                   overlap: int = DEFAULT_OVERLAP_WORDS) -> List[str]:
+    """
+    ✂️ Split text into passages of at most ``max_words`` words.
+
+    Whole sentences are packed into a passage while they fit; a sentence
+    longer than a passage is cut into word windows. Each passage after the
+    first starts with the last ``overlap`` words (or fewer, at sentence
+    boundaries) of the previous one.
+
+    Args:
+        text (str): Document text.
+        max_words (int): Passage size in words.
+        overlap (int): Words repeated between consecutive passages.
+
+    Returns:
+        list: Passages (one, the whole text, when it already fits).
+    """
+    words = text.split()
+    if len(words) <= max_words:
+        return [text]
+    overlap = max(0, min(overlap, max_words // 2))
+
+    # Sentences, with over-long ones cut to passage size
+    sentences: List[List[str]] = []
+    for sentence in _SENTENCE_END.split(text):
+        tokens = sentence.split()
+        for start in range(0, len(tokens), max_words):
+            sentences.append(tokens[start:start + max_words])
+
+    passages: List[str] = []
+    current: List[str] = []
+    for sentence in sentences:
+        if current and len(current) + len(sentence) > max_words:
+            passages.append(" ".join(current))
+            tail = current[-overlap:] if overlap else []
+            current = tail if len(tail) + len(sentence) <= max_words else []
+        current = current + sentence
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def join_passages(passages: List[str], overlap: int = DEFAULT_OVERLAP_WORDS) -> str:
+    """
+    🧵 Rejoin a document's passages (in passage order) into one text, dropping
+    the words each passage repeats from the end of the previous one.
+
+    Args:
+        passages (list): Passage texts, as produced by ``split_passages``.
+        overlap (int): Most words repeated between consecutive passages.
+
+    Returns:
+        str: The document's words, whitespace-normalized.
+    """
+    words: List[str] = []
+    for passage in passages:
+        tokens = passage.split()
+        for size in range(min(overlap, len(words), len(tokens)), 0, -1):
+            if words[-size:] == tokens[:size]:
+                tokens = tokens[size:]
+                break
+        words.extend(tokens)
+    return " ".join(words)
+
+
+def passage_id(doc_id: str, index: int) -> str:
+    """
+    🔑 Id of passage ``index``: the first passage keeps the document id, so
+    lookups by document id still find it.
+    """
+    return doc_id if index == 0 else f"{doc_id}#{index}"
+
+
+def aggregate_hits(ids: List[str], metadatas: List[Dict[str, Any]],
+                   distances: List[float], mode: str = "max") -> List[int]:
+    """
+    🧮 Fold passage hits into documents: indices of each document's best passage,
+    best document first.
+
+    ``max`` ranks documents by their closest passage; ``sum`` by the sum of
+    ``1 / (1 + distance)`` over their passages (rewarding documents with
+    several matching passages).
+    """
+    best: Dict[str, int] = {}
+    scores: Dict[str, float] = {}
+    for i, (doc_id, metadata, distance) in enumerate(zip(ids, metadatas, distances)):
+        parent = str((metadata or {}).get("parent_id") or doc_id)
+        if parent not in best or distance < distances[best[parent]]:
+            best[parent] = i
+        similarity = 1.0 / (1.0 + float(distance))
+        if mode == "sum":
+            scores[parent] = scores.get(parent, 0.0) + similarity
+        else:
+            scores[parent] = max(scores.get(parent, 0.0), similarity)
+    return [best[parent] for parent in sorted(best, key=lambda p: -scores[p])]
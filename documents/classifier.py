@@ -2,22 +2,43 @@
 
 from __future__ import annotations
 
+import io
 import logging
 import os
-from typing import List, Tuple
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 import joblib
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import (
+    GridSearchCV,
+    ParameterGrid,
+    StratifiedKFold,
+    train_test_split,
+)
 from sklearn.pipeline import Pipeline
 
+from documents.cache import LRUCache, text_hash
+from documents.inference import request_inference
 from documents.ocr import extract_text_from_image
+from documents.preprocessing import clean_text
 
 # 🛠️ Logger Setup
 logger = logging.getLogger(__name__)
 
+# 📦 Default model location (also the model hosted by the inference server)
+DEFAULT_MODEL_PATH = "model.joblib"
+
+# ⚡ Cascade defaults: stage-1 sees only the text prefix and a small vocabulary
+CASCADE_PREFIX_CHARS = 400
+CASCADE_VOCAB_SIZE = 300
+CASCADE_MARGIN = 0.2
+
 
 # 📂 Load Documents from Folder Structure
 def load_documents_from_folders(base_path: str = "docs-sm") -> Tuple[List[str], List[str]]:
@@ -66,13 +87,109 @@ def load_documents_from_folders(base_path: str = "docs-sm") -> Tuple[List[str],
     return texts, labels
 
 
+# ⚡ Two-Stage Cascade Classifier
+class CascadeClassifier:
+    """
+    ⚡ Cheap keyword model first, full model only when uncertain.
+
+    Stage 1 classifies the first ``prefix_chars`` characters with a small
+    vocabulary. When the gap between its top two class probabilities is at
+    least ``margin`` its answer is used; otherwise the full pipeline runs on
+    the whole text.
+
+    Exposes ``predict`` like a scikit-learn pipeline, so it can be saved to
+    ``model.joblib`` and used by ``predict_document_type`` unchanged.
+    """
+
+    def __init__(self, fast_model: Any, full_model: Any,
+                 prefix_chars: int = CASCADE_PREFIX_CHARS,
+                 margin: float = CASCADE_MARGIN) -> None:
+        self.fast_model = fast_model
+        self.full_model = full_model
+        self.prefix_chars = prefix_chars
+        self.margin = margin
+
+    def predict_with_stages(self, texts: Sequence[str]) -> Tuple[List[str], List[bool]]:
+        """
+        🔮 Predict labels and report which ones were settled by stage 1.
+
+        Returns:
+            labels (list): Predicted labels in input order.
+            fast (list): True where the fast model was confident enough.
+        """
+        if not texts:
+            return [], []
+
+        proba = np.asarray(self.fast_model.predict_proba([t[:self.prefix_chars]
+                                                          for t in texts]))
+        classes = np.asarray(self.fast_model.classes_)
+
+        if proba.shape[1] > 1:
+            top2 = np.partition(proba, -2, axis=1)[:, -2:]
+            confident = (top2[:, 1] - top2[:, 0]) >= self.margin
+        else:
+            confident = np.ones(len(texts), dtype=bool)
+
+        labels = [str(label) for label in classes[np.argmax(proba, axis=1)]]
+
+        uncertain = [i for i, ok in enumerate(confident) if not ok]
+        if uncertain:
+            full_labels = self.full_model.predict([texts[i] for i in uncertain])
+            for i, label in zip(uncertain, full_labels):
+                labels[i] = str(label)
+
+        return labels, [bool(ok) for ok in confident]
+
+    def predict(self, texts: Sequence[str]) -> List[str]:
+        labels, _ = self.predict_with_stages(texts)
+        return labels
+
+
+def _build_pipeline(max_features: int = 5000, memory: Optional[str] = None) -> Any:
+    """
+    📊 ML Pipeline: TF-IDF + Logistic Regression
+    """
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=max_features)),
+        ('clf', LogisticRegression(max_iter=1000)),
+    ], memory=memory)
+
+
+def build_cascade(texts: Sequence[str], labels: Sequence[str], full_model: Any,
+                  prefix_chars: int = CASCADE_PREFIX_CHARS,
+                  margin: float = CASCADE_MARGIN) -> CascadeClassifier:
+    """
+    ⚡ Fit the stage-1 prefix model and wrap it with an already-fitted full model.
+
+    Args:
+        texts (list): Training texts.
+        labels (list): Training labels.
+        full_model: Fitted full pipeline used for uncertain documents.
+        prefix_chars (int): Characters of each text seen by stage 1.
+        margin (float): Minimum top-2 probability gap to trust stage 1.
+
+    Returns:
+        CascadeClassifier: The two-stage model.
+    """
+    fast_model = _build_pipeline(max_features=CASCADE_VOCAB_SIZE)
+    fast_model.fit([t[:prefix_chars] for t in texts], list(labels))
+    return CascadeClassifier(fast_model, full_model, prefix_chars=prefix_chars,
+                             margin=margin)
+
+
 # 🤖 Train Classifier & Save Model
-def train_and_save_model(output_path: str = "model.joblib") -> None:
+def train_and_save_model(output_path: str = DEFAULT_MODEL_PATH, cascade: bool = False,
+                         prefix_chars: int = CASCADE_PREFIX_CHARS,
+                         margin: float = CASCADE_MARGIN) -> None:
     """
     🏋️ Train a document classification model and save it to disk.
 
     Args:
         output_path (str): Destination file for saving the trained model.
+        cascade (bool): Save a two-stage ``CascadeClassifier`` instead of the
+            single pipeline.
+        prefix_chars (int): Cascade stage-1 prefix length.
+        margin (float): Cascade stage-1 confidence margin.
     """
     texts, labels = load_documents_from_folders()
 
@@ -83,30 +200,279 @@ def train_and_save_model(output_path: str = "model.joblib") -> None:
     logger.info("✂️ Splitting data for training/testing...")
     X_train, X_test, y_train, y_test = train_test_split(texts, labels, test_size=0.2, random_state=42)
 
-    # 📊 ML Pipeline: TF-IDF + Logistic Regression
-    pipeline = Pipeline([
-        ('tfidf', TfidfVectorizer(max_features=5000)),
-        ('clf', LogisticRegression(max_iter=1000)),
-    ])
+    pipeline = _build_pipeline()
 
     logger.info("🤖 Training document classifier...")
     pipeline.fit(X_train, y_train)
 
+    model: Any = pipeline
+    if cascade:
+        logger.info("⚡ Training cascade stage-1 (prefix) model...")
+        model = build_cascade(X_train, y_train, pipeline, prefix_chars=prefix_chars,
+                              margin=margin)
+
     logger.info("📊 Evaluating model...")
-    predictions = pipeline.predict(X_test)
+    predictions = model.predict(X_test)
     report = classification_report(y_test, predictions)
     logger.info(f"\n📋 Classification Report: \n{report}")
 
-    joblib.dump(pipeline, output_path)
+    if cascade:
+        _, fast = model.predict_with_stages(X_test)
+        logger.info(
+            f"⚡ Cascade stage-1 handled {sum(fast)}/{len(fast)} test documents."
+        )
+
+    joblib.dump(model, output_path)
     logger.info(f"💾 Model saved to: {output_path}")
     logger.info("✅ Model training complete.")
 
 
+# 🔎 Latency-Aware Model Selection
+SEARCH_PARAM_GRID: Dict[str, List[Any]] = {
+    'tfidf__max_features': [1000, 5000, 20000],
+    'tfidf__ngram_range': [(1, 1), (1, 2)],
+    'tfidf__sublinear_tf': [False, True],
+    'clf__C': [0.5, 2.0, 8.0],
+}
+
+
+def _measure_latency(model: Any, texts: Sequence[str], repeat: int = 3) -> float:
+    """
+    ⏱️ Best-of-``repeat`` seconds per document for one-at-a-time predictions
+    (the request path calls ``predict`` with a single text).
+    """
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for text in texts:
+            model.predict([text])
+        best = min(best, time.perf_counter() - start)
+    return best / max(1, len(texts))
+
+
+def _model_size(model: Any) -> int:
+    """
+    📦 Size in bytes of the model as written by ``joblib.dump``.
+    """
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return len(buffer.getvalue())
+
+
+def search_and_save_model(output_path: str = DEFAULT_MODEL_PATH, n_jobs: int = -1,
+                          cv: int = 5, tolerance: float = 0.01,
+                          param_grid: Optional[Dict[str, List[Any]]] = None,
+                          latency_docs: int = 200) -> List[Dict[str, Any]]:
+    """
+    🔎 Grid-search the TF-IDF + Logistic Regression pipeline and save the
+    fastest model whose accuracy is within ``tolerance`` of the best.
+
+    Cross-validation runs in parallel (``n_jobs``). The pipeline caches fitted
+    vectorizers on disk, so candidates that only differ in classifier settings
+    reuse the same features instead of re-vectorizing.
+
+    Args:
+        output_path (str): Destination file for the selected model.
+        n_jobs (int): Parallel workers for cross-validation (-1 = all cores).
+        cv (int): Number of stratified folds.
+        tolerance (float): Allowed drop in mean CV accuracy vs. the best candidate.
+        param_grid (dict|None): Override for ``SEARCH_PARAM_GRID``.
+        latency_docs (int): Held-out documents used for latency measurement.
+
+    Returns:
+        list: One dict per candidate (params, accuracy, latency_ms, size_bytes,
+        selected), sorted by accuracy.
+    """
+    texts, labels = load_documents_from_folders()
+
+    if not texts or not labels:
+        logger.error("❌ No data to train on. Check your '/docs-sm' directory and "
+                     "file formats.")
+        return []
+
+    logger.info("✂️ Splitting data for training/testing...")
+    X_train, X_test, y_train, y_test = train_test_split(texts, labels, test_size=0.2,
+                                                        random_state=42)
+
+    grid = param_grid or SEARCH_PARAM_GRID
+    min_class_count = min(y_train.count(label) for label in set(y_train))
+    folds = StratifiedKFold(n_splits=max(2, min(cv, min_class_count)), shuffle=True,
+                            random_state=42)
+
+    with tempfile.TemporaryDirectory(prefix="tfidf-cache-") as cache_dir:
+        logger.info(f"🔎 Cross-validating {len(ParameterGrid(grid))} candidates "
+                    f"({folds.n_splits} folds, n_jobs={n_jobs})...")
+        search = GridSearchCV(_build_pipeline(memory=cache_dir), grid, cv=folds,
+                              n_jobs=n_jobs, scoring='accuracy', refit=False)
+        search.fit(X_train, y_train)
+
+        latency_texts = X_test[:latency_docs]
+        candidates: List[Dict[str, Any]] = []
+        for params, accuracy in zip(search.cv_results_['params'],
+                                    search.cv_results_['mean_test_score']):
+            model = _build_pipeline(memory=cache_dir).set_params(**params)
+            model.fit(X_train, y_train)
+            model.set_params(memory=None)
+
+            candidates.append({
+                'params': params,
+                'accuracy': float(accuracy),
+                'latency_ms': _measure_latency(model, latency_texts) * 1000.0,
+                'size_bytes': _model_size(model),
+                'selected': False,
+                'model': model,
+            })
+
+    best_accuracy = max(c['accuracy'] for c in candidates)
+    eligible = [c for c in candidates if c['accuracy'] >= best_accuracy - tolerance]
+    chosen = min(eligible, key=lambda c: (c['latency_ms'], c['size_bytes']))
+    chosen['selected'] = True
+
+    logger.info(f"🏆 Selected {chosen['params']} "
+                f"(cv accuracy {chosen['accuracy']:.3f}, "
+                f"{chosen['latency_ms']:.2f} ms/doc, "
+                f"{chosen['size_bytes'] / 1024:.0f} KiB)")
+
+    predictions = chosen['model'].predict(X_test)
+    report = classification_report(y_test, predictions)
+    logger.info(f"\n📋 Classification Report: \n{report}")
+
+    joblib.dump(chosen['model'], output_path)
+    logger.info(f"💾 Model saved to: {output_path}")
+
+    for candidate in candidates:
+        del candidate['model']
+    return sorted(candidates, key=lambda c: c['accuracy'], reverse=True)
+
+
+# 🗃️ Classification Result Cache
+class ClassificationCache:
+    """
+    🗃️ Bounded LRU (plus optional on-disk layer) of predicted labels.
+
+    Keys combine a hash of the cleaned text with the model version, so a
+    retrained ``model.joblib`` never serves stale labels. On disk, entries
+    live under ``<disk_dir>/<model_version>/``; directories of other
+    versions are pruned the first time a new version is seen.
+
+    Args:
+        max_size (int): In-memory capacity (0 disables the memory layer).
+        disk_dir (str|None): Directory for the persistent layer (None disables it).
+    """
+
+    def __init__(self, max_size: int, disk_dir: Optional[str] = None) -> None:
+        self._memory: LRUCache[str] = LRUCache(max_size)
+        self.disk_dir = disk_dir
+        self._seen_versions: Set[str] = set()
+        self._disk_hits = 0
+        self._disk_writes = 0
+
+    def get(self, key: str, version: str) -> Optional[str]:
+        label = self._memory.get((version, key))
+        if label is not None or not self.disk_dir:
+            return label
+
+        path = self._disk_path(key, version)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                label = f.read()
+            self._disk_hits += 1
+            self._memory.put((version, key), label)
+        return label
+
+    def put(self, key: str, version: str, label: str) -> None:
+        self._memory.put((version, key), label)
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key, version)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(label)
+            os.replace(tmp_path, path)
+            self._disk_writes += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write classification cache entry: {e}")
+
+    def clear(self) -> None:
+        self._memory.clear()
+        self._disk_hits = self._disk_writes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        📊 Memory hits/misses/evictions/size plus disk hits and writes.
+        """
+        return {**self._memory.stats(), "disk_hits": self._disk_hits,
+                "disk_writes": self._disk_writes}
+
+    def _disk_path(self, key: str, version: str) -> str:
+        assert self.disk_dir is not None
+        if version not in self._seen_versions:
+            self._seen_versions.add(version)
+            self._prune_other_versions(version)
+        return os.path.join(self.disk_dir, version, key[:2], key)
+
+    def _prune_other_versions(self, version: str) -> None:
+        assert self.disk_dir is not None
+        if not os.path.isdir(self.disk_dir):
+            return
+        for name in os.listdir(self.disk_dir):
+            if name != version:
+                logger.info(
+                    f"🧹 Removing classification cache for old model version {name}"
+                )
+                shutil.rmtree(os.path.join(self.disk_dir, name), ignore_errors=True)
+
+
+_classification_cache = ClassificationCache(
+    max_size=int(os.environ.get("CLASSIFICATION_CACHE_SIZE", "4096")),
+    disk_dir=os.environ.get("CLASSIFICATION_CACHE_DIR") or None,
+)
+
+
+def model_version(model_path: str) -> Optional[str]:
+    """
+    🏷️ Identify the current contents of a model file by size and mtime.
+
+    Returns:
+        str|None: Version tag, or None if the file does not exist.
+    """
+    if not os.path.exists(model_path):
+        return None
+    try:
+        stat = os.stat(model_path)
+    except OSError:
+        return None
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def get_classification_cache_stats() -> Dict[str, int]:
+    """
+    📊 Hit/miss statistics of the classification result cache.
+    """
+    return _classification_cache.stats()
+
+
+def clear_classification_cache() -> None:
+    """
+    🧹 Drop all in-memory cached predictions and reset statistics.
+    """
+    _classification_cache.clear()
+
+
 # 🔮 Predict Document Type
-def predict_document_type(text: str, model_path: str = "model.joblib") -> str:
+def predict_document_type(text: str, model_path: str = DEFAULT_MODEL_PATH) -> str:
     """
     🔮 Predict the type of a document using the trained model.
 
+    Uses the shared inference server when ``INFERENCE_SOCKET`` is set and
+    the default model is requested (the server caches by its own model's
+    version), falling back to the model in-process, whose results are
+    cached by cleaned-text hash and model file version (see
+    ``ClassificationCache``).
+
     Args:
         text (str): Raw document text.
         model_path (str): Path to the saved model.
@@ -114,6 +480,42 @@ def predict_document_type(text: str, model_path: str = "model.joblib") -> str:
     Returns:
         str: Predicted document type (label).
     """
+    # Checked before the local cache: the server's model can differ from the local file
+    if model_path == DEFAULT_MODEL_PATH:
+        remote = request_inference("classify", [text])
+        if remote is not None:
+            return str(remote[0])
+
+    version = model_version(model_path)
+    key = text_hash(clean_text(text))
+    if version is not None:
+        cached = _classification_cache.get(key, version)
+        if cached is not None:
+            logger.debug(f"⚡ Classification cache hit for {key[:12]}")
+            return cached
+
+    label = _predict_uncached(text, model_path)
+    if version is not None:
+        _classification_cache.put(key, version, label)
+    return label
+
+
+def predict_cached(model: Any, texts: List[str], version: str) -> List[str]:
+    """
+    🔮 Labels for ``texts`` from an already loaded ``model`` (version
+    ``version``), predicting only the texts not cached yet, in one batch.
+    """
+    keys = [text_hash(clean_text(text)) for text in texts]
+    labels = [_classification_cache.get(key, version) for key in keys]
+    missing = [i for i, label in enumerate(labels) if label is None]
+    if missing:
+        for i, label in zip(missing, model.predict([texts[i] for i in missing])):
+            labels[i] = str(label)
+            _classification_cache.put(keys[i], version, str(label))
+    return [str(label) for label in labels]
+
+
+def _predict_uncached(text: str, model_path: str) -> str:
     if not os.path.exists(model_path):
         error_message = f"❌ Model not found at path: {model_path}. Please train it first."
         logger.error(error_message)
@@ -122,4 +524,4 @@ def predict_document_type(text: str, model_path: str = "model.joblib") -> str:
     model = joblib.load(model_path)
     logger.debug(f"📦 Loaded model from {model_path} for prediction.")
 
-    return model.predict([text])[0]
+    return str(model.predict([text])[0])
@@ -0,0 +1,182 @@
+# 🧊 Embedding Cache (content hash -> float32 vector, memory-mapped)
+# Identical texts are embedded once. Vectors live in an append-only float32
+# file read through a memory map; an append-only index maps text hashes to rows.
+# Disabled unless EMBEDDING_CACHE_DIR is set.
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from documents.cache import text_hash
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+EMBEDDING_CACHE_DIR_ENV = "EMBEDDING_CACHE_DIR"
+
+
+class EmbeddingCache:
+    """
+    🧊 Persistent embedding cache shared by all processes on the host.
+
+    Layout under ``<directory>/<namespace>/``:
+
+    - ``vectors.f32``: rows of ``dim`` float32 values, append-only.
+    - ``index.tsv``: ``<sha256>\\t<row>`` lines, appended after the row is written.
+    - ``meta.json``: ``{"dim": ...}``, fixed by the first vector stored.
+
+    Writers append under an exclusive ``flock``; readers pick up rows added
+    by other processes by reading the new tail of the index on a miss.
+
+    Args:
+        directory (str): Cache root.
+        namespace (str): Subfolder per embedding model, so switching models
+            never returns vectors from another one.
+    """
+
+    def __init__(self, directory: str, namespace: str = "default") -> None:
+        self.directory = os.path.join(directory,
+                                      re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace))
+        os.makedirs(self.directory, exist_ok=True)
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._index_path = os.path.join(self.directory, "index.tsv")
+        self._meta_path = os.path.join(self.directory, "meta.json")
+        self._lock_path = os.path.join(self.directory, ".lock")
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._index_offset = 0
+        self._dim: Optional[int] = None
+        self._array: Optional[np.ndarray] = None
+        self.hits = 0
+        self.misses = 0
+
+        with self._lock:
+            self._refresh_index()
+
+    # 📖 Reading
+
+    def _refresh_index(self) -> None:
+        """
+        Read index lines appended since the last refresh (by any process).
+        """
+        if self._dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._dim = int(json.load(f)["dim"])
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            tail = f.read()
+        # Only consume complete lines; a concurrent writer may be mid-line
+        complete = tail[:tail.rfind(b"\n") + 1]
+        for line in complete.decode("ascii").splitlines():
+            key, _, row = line.partition("\t")
+            if row:
+                self._index[key] = int(row)
+        self._index_offset += len(complete)
+
+    def _row(self, row: int) -> np.ndarray:
+        assert self._dim is not None
+        if self._array is None or row >= self._array.shape[0]:
+            rows = os.path.getsize(self._vectors_path) // (self._dim * 4)
+            self._array = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                    shape=(rows, self._dim))
+        return np.array(self._array[row])
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        🔎 Cached vectors for ``texts`` (None where not cached).
+        """
+        keys = [text_hash(text) for text in texts]
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                self._refresh_index()
+            results: List[Optional[np.ndarray]] = []
+            for key in keys:
+                row = self._index.get(key)
+                results.append(self._row(row) if row is not None else None)
+            found = sum(r is not None for r in results)
+            self.hits += found
+            self.misses += len(keys) - found
+        return results
+
+    # ✍️ Writing
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Any]) -> None:
+        """
+        💾 Store vectors for ``texts`` (texts already cached are skipped).
+        """
+        if not texts:
+            return
+        matrix = np.asarray([np.asarray(v, dtype=np.float32).ravel() for v in vectors],
+                            dtype=np.float32)
+        keys = [text_hash(text) for text in texts]
+
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh_index()
+                if self._dim is None:
+                    self._dim = int(matrix.shape[1])
+                    with open(self._meta_path, "w", encoding="utf-8") as f:
+                        json.dump({"dim": self._dim}, f)
+                if matrix.shape[1] != self._dim:
+                    logger.warning(f"⚠️ Embedding size {matrix.shape[1]} != cached "
+                                   f"{self._dim}; not caching.")
+                    return
+
+                new: Dict[str, np.ndarray] = {}
+                for key, vector in zip(keys, matrix):
+                    if key not in self._index and key not in new:
+                        new[key] = vector
+                if not new:
+                    return
+
+                size = 0
+                if os.path.exists(self._vectors_path):
+                    size = os.path.getsize(self._vectors_path)
+                first_row = size // (self._dim * 4)
+                with open(self._vectors_path, "ab") as f:
+                    # Drop a torn row left by a crashed writer
+                    f.truncate(first_row * self._dim * 4)
+                    f.write(np.stack(list(new.values())).astype(np.float32).tobytes())
+                lines = "".join(f"{key}\t{first_row + i}\n"
+                                for i, key in enumerate(new))
+                with open(self._index_path, "a", encoding="ascii") as f:
+                    f.write(lines)
+                self._refresh_index()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._index)}
+
+
+def get_embedding_cache(namespace: str) -> Optional[EmbeddingCache]:
+    """
+    🧊 Embedding cache for ``namespace`` under $EMBEDDING_CACHE_DIR, or None when unset
+    (or the directory can't be created).
+    """
+    directory = os.environ.get(EMBEDDING_CACHE_DIR_ENV)
+    if not directory:
+        return None
+    try:
+        cache = EmbeddingCache(directory, namespace=namespace)
+    except OSError as e:
+        logger.warning(f"⚠️ Embedding cache disabled, can't use {directory}: {e}")
+        return None
+    logger.info(
+        f"🧊 Embedding cache at {cache.directory} ({cache.stats()['size']} vectors)"
+    )
+    return cache
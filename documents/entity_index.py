@@ -0,0 +1,293 @@
+# 🏷️ Relational Entity Index
+# Mirrors each stored document's entities into the IndexedDocument /
+# EntityValue tables (bulk-written on store) so "all invoices from vendor X"
+# and per-field value counts are indexed queries instead of scans over
+# comma-joined Chroma metadata. Enabled with ENTITY_INDEX=1.
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, Exists, Min, OuterRef, QuerySet, Subquery, Sum
+
+from documents.models import EntityCount, EntityValue, IndexedDocument
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+ENTITY_INDEX_ENV = "ENTITY_INDEX"
+BULK_BATCH_SIZE = 500  # rows per INSERT (SQLite caps bound parameters per statement)
+MAX_VALUE_LENGTH = 255
+MAX_FACET_VALUES = 100
+MAX_ENTITY_RESULTS = 1000
+
+# (document id, document type, {field: value | [values]})
+EntityRecord = Tuple[str, str, Dict[str, Any]]
+
+
+def entity_index_enabled() -> bool:
+    """
+    🏷️ Whether stores are mirrored into the entity index ($ENTITY_INDEX).
+    """
+    value = os.environ.get(ENTITY_INDEX_ENV, "0").strip().lower()
+    return value in ("1", "true", "yes", "on")
+
+
+def normalize_entity(value: Any) -> str:
+    """
+    🔡 Matching form of an entity value: casefolded, whitespace collapsed,
+    trailing punctuation dropped, cut to the column size.
+    """
+    return " ".join(str(value).casefold().split()).strip(" .,;:")[:MAX_VALUE_LENGTH]
+
+
+def _values(value: Any) -> List[str]:
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return [str(v).strip() for v in values if v is not None and str(v).strip()]
+
+
+def _rows(doc_id: str, doc_type: str, entities: Dict[str, Any]) -> List[EntityValue]:
+    """
+    🏷️ Entity rows of one document (one per distinct normalized value, plus its type).
+    """
+    rows = []
+    seen = set()
+    for field, value in [("document_type", doc_type), *(entities or {}).items()]:
+        for raw in _values(value):
+            normalized = normalize_entity(raw)
+            if normalized and (field, normalized) not in seen:
+                seen.add((field, normalized))
+                rows.append(EntityValue(document_id=doc_id, field=field,
+                                        value=raw[:MAX_VALUE_LENGTH],
+                                        normalized=normalized))
+    return rows
+
+
+def _indexed_keys(ids: List[str]) -> List[Tuple[str, str, str, str]]:
+    """
+    🔑 ``(document type, field, normalized, value)`` of every row currently
+    indexed for ``ids``.
+    """
+    keys: List[Tuple[str, str, str, str]] = []
+    for start in range(0, len(ids), BULK_BATCH_SIZE):
+        batch = ids[start:start + BULK_BATCH_SIZE]
+        keys.extend(EntityValue.objects.filter(document_id__in=batch)
+                    .values_list("document__document_type", "field", "normalized",
+                                 "value"))
+    return keys
+
+
+def _apply_counts(removed: List[Tuple[str, str, str, str]],
+                  added: List[Tuple[str, str, str, str]]) -> None:
+    """
+    📊 Move the facet counts by -1 per removed and +1 per added key, for the
+    key's document type and for all types (``""``).
+
+    Increments happen in SQL (``count = count + excluded.count``), so
+    concurrent writers from several processes can't lose updates.
+    """
+    deltas: Dict[Tuple[str, str, str], int] = defaultdict(int)
+    values: Dict[Tuple[str, str, str], str] = {}
+    for sign, keys in ((-1, removed), (1, added)):
+        for doc_type, field, normalized, value in keys:
+            for key in ((doc_type or "", field, normalized), ("", field, normalized)):
+                deltas[key] += sign
+                values.setdefault(key, value)
+    params = [(*key, values[key], delta) for key, delta in deltas.items() if delta]
+    if not params:
+        return
+    table = connection.ops.quote_name(EntityCount._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} (document_type, field, normalized, value, count) "
+            "VALUES (%s, %s, %s, %s, %s) "
+            "ON CONFLICT (document_type, field, normalized) "
+            f"DO UPDATE SET count = {table}.count + excluded.count",
+            params
+        )
+
+
+def index_entities(records: Iterable[EntityRecord]) -> int:
+    """
+    📥 Replace the indexed entities of each document, in one transaction.
+
+    Documents are upserted in bulk, their old entity rows deleted and the
+    new ones inserted ``BULK_BATCH_SIZE`` per statement, and the facet
+    counts moved by the difference. A document id given twice keeps its
+    last record.
+
+    Args:
+        records (iterable): ``(document id, document type, entities)`` with
+            entities as extracted (``{field: [values]}``).
+
+    Returns:
+        int: Number of documents indexed.
+    """
+    latest = {doc_id: (doc_type or "", entities)
+              for doc_id, doc_type, entities in records}
+    if not latest:
+        return 0
+
+    ids = list(latest)
+    documents = [IndexedDocument(id=doc_id, document_type=doc_type)
+                 for doc_id, (doc_type, _) in latest.items()]
+    rows = [row for doc_id, (doc_type, entities) in latest.items()
+            for row in _rows(doc_id, doc_type, entities)]
+    added = [(latest[row.document_id][0], row.field, row.normalized, row.value)
+             for row in rows]
+
+    with transaction.atomic():
+        removed = _indexed_keys(ids)
+        IndexedDocument.objects.bulk_create(
+            documents, batch_size=BULK_BATCH_SIZE, update_conflicts=True,
+            unique_fields=["id"], update_fields=["document_type", "updated_at"]
+        )
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            EntityValue.objects.filter(
+                document_id__in=ids[start:start + BULK_BATCH_SIZE]
+            ).delete()
+        EntityValue.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+        _apply_counts(removed, added)
+    return len(documents)
+
+
+def remove_documents(ids: Sequence[str]) -> None:
+    """
+    🗑️ Drop documents (and, by cascade, their entities) from the index.
+    """
+    ids = list(ids)
+    with transaction.atomic():
+        removed = _indexed_keys(ids)
+        for start in range(0, len(ids), BULK_BATCH_SIZE):
+            IndexedDocument.objects.filter(
+                id__in=ids[start:start + BULK_BATCH_SIZE]
+            ).delete()
+        _apply_counts(removed, [])
+
+
+def _clauses(filters: Dict[str, Any]) -> List[Tuple[str, List[str]]]:
+    """
+    🧱 ``(field, normalized values)`` per filter, entity fields before
+    ``document_type`` (usually far less selective).
+
+    Raises:
+        ValueError: Empty filter value.
+    """
+    clauses = []
+    for field, value in (filters or {}).items():
+        values = sorted({normalize_entity(v) for v in _values(value)} - {""})
+        if not values:
+            raise ValueError(f"Empty filter value for: {field}")
+        clauses.append((field, values))
+    return sorted(
+        clauses,
+        key=lambda clause: (clause[0] == "document_type", len(clause[1]), clause[0])
+    )
+
+
+def _matching(filters: Dict[str, Any]) -> QuerySet[EntityValue, Dict[str, Any]]:
+    """
+    🔎 Entity rows, one per document matching every filter (a list matches
+    any of its values), as ``document_id`` values.
+
+    The first (most selective) filter is read from the (normalized, field,
+    document) index; every other one is an ``EXISTS`` probe of the
+    (document, field, normalized) unique index per candidate.
+    """
+    clauses = _clauses(filters)
+    field, values = clauses[0]
+    rows = EntityValue.objects.filter(field=field, normalized__in=values)
+    for other_field, other_values in clauses[1:]:
+        rows = rows.filter(Exists(EntityValue.objects.filter(
+            document_id=OuterRef("document_id"),
+            field=other_field, normalized__in=other_values
+        )))
+    ids = rows.values("document_id")
+    # A document can only match the driving filter once per value
+    return ids.distinct() if len(values) > 1 else ids
+
+
+def find_documents(filters: Dict[str, Any], limit: int = 100,
+                   offset: int = 0) -> Dict[str, Any]:
+    """
+    🔎 Ids of the documents matching all ``filters``, e.g.
+    ``{"document_type": "invoice", "vendor": "Acme Inc"}``.
+
+    Values match case- and whitespace-insensitively (see ``normalize_entity``).
+
+    Returns:
+        dict: ``document_ids`` (page in id order), ``total`` matches.
+
+    Raises:
+        ValueError: No filters, or an empty filter value.
+    """
+    if not filters:
+        raise ValueError("At least one filter is required.")
+    rows = _matching(filters)
+    ids = list(rows.order_by("document_id")
+               .values_list("document_id", flat=True)[offset:offset + limit])
+    return {"document_ids": ids, "total": rows.count()}
+
+
+def entity_facets(field: str, filters: Optional[Dict[str, Any]] = None,
+                  limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    📊 The most frequent values of ``field`` among documents matching ``filters``.
+
+    Without filters, or filtered on ``document_type`` alone, counts come
+    from the maintained ``EntityCount`` table. Other filters count the
+    entity rows of the matching documents. Values are grouped by their
+    normalized form and shown as the first spelling indexed;
+    ``document_type`` is a valid field.
+
+    Returns:
+        list: ``{"value", "count"}`` by descending count, at most ``limit``.
+
+    Raises:
+        ValueError: An empty filter value.
+    """
+    limit = max(1, min(limit, MAX_FACET_VALUES))
+    filters = filters or {}
+    if set(filters) <= {"document_type"}:
+        types = dict(_clauses(filters)).get("document_type", [""])
+        counts = EntityCount.objects.filter(document_type__in=types, field=field,
+                                            count__gt=0)
+        if len(types) == 1:
+            rows = (counts.order_by("-count", "normalized")
+                    .values("value", "count")[:limit])
+        else:
+            rows = (counts.values("normalized")
+                    .annotate(count_sum=Sum("count"), value=Min("value"))
+                    .order_by("-count_sum", "normalized")[:limit])
+        return [{"value": row["value"], "count": row.get("count_sum", row.get("count"))}
+                for row in rows]
+
+    spelling = EntityCount.objects.filter(document_type="", field=field,
+                                          normalized=OuterRef("normalized"))
+    rows = (EntityValue.objects.filter(field=field, document_id__in=_matching(filters))
+            .values("normalized")
+            .annotate(count=Count("id"), value=Subquery(spelling.values("value")[:1]))
+            .order_by("-count", "normalized")[:limit])
+    return [{"value": row["value"], "count": row["count"]} for row in rows]
+
+
+def mirror_entities(records: Iterable[EntityRecord]) -> None:
+    """
+    🪞 ``index_entities`` for the store path: a no-op unless $ENTITY_INDEX is
+    set, and failures are logged rather than raised (the vector store is the
+    source of truth; ``build_entity_index`` rebuilds the tables).
+    """
+    if not entity_index_enabled():
+        return
+    records = list(records)
+    try:
+        index_entities(records)
+    except Exception as e:
+        logger.warning(
+            f"⚠️ Failed to update the entity index for {len(records)} documents: {e}"
+        )
@@ -4,37 +4,82 @@
 from __future__ import annotations
 
 import logging
-import re
-from typing import Dict, List
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import regex
+
+from documents.gazetteer import get_gazetteer
+from documents.ner import get_ner_extractor
 
 # 🛠️ Logger Setup
 logger = logging.getLogger(__name__)
 
+# ⏱️ Time budget (seconds) for all regex scans of one extract_entities call
+EXTRACTOR_TIMEOUT_ENV = "EXTRACTOR_TIMEOUT"
+DEFAULT_EXTRACTOR_TIMEOUT = 0.5
+
 # 📦 Lightweight regex patterns for entity extraction
+# Compiled with the `regex` package. Word runs use possessive quantifiers and
+# multi-word shapes are capped, so no pattern can backtrack quadratically
+# on long OCR garbage. Patterns of one category are joined into a single
+# alternation, so list the longest shapes first.
+_ORG_SUFFIX = r'(?:Company|Corp|Inc|Ltd|LLC|Center|Institute|University|Association)'
+
 NAME_PATTERNS = [
-    r'\b[A-Z][a-z]+ [A-Z][a-z]+\b',  # First Last
-    r'\b[A-Z]\. [A-Z][a-z]+\b',      # F. Last
-    r'\b[A-Z][a-z]+ [A-Z]\. [A-Z][a-z]+\b'  # First M. Last
+    r'\b[A-Z][a-z]++ [A-Z]\. [A-Z][a-z]++\b',  # First M. Last
+    r'\b[A-Z][a-z]++ [A-Z][a-z]++\b',  # First Last
+    r'\b[A-Z]\. [A-Z][a-z]++\b'       # F. Last
 ]
 
 ORG_PATTERNS = [
-    r'\b[A-Z][a-zA-Z\s]*(?:Company|Corp|Inc|Ltd|LLC|Center|Institute|University|Association)\b',
-    r'\b(?:Company|Corp|Inc|Ltd|LLC) [A-Z][a-zA-Z\s]*\b'
+    # Up to 6 words + suffix
+    r'\b[A-Z][a-zA-Z]*+(?:\s++[a-zA-Z]++){0,5}\s++' + _ORG_SUFFIX + r'\b',
+    # Glued suffix (AcmeCorp)
+    r'\b[A-Z][a-zA-Z]*?' + _ORG_SUFFIX + r'\b',
+    # Suffix first
+    r'\b(?:Company|Corp|Inc|Ltd|LLC) [A-Z][a-zA-Z]*+(?:\s++[a-zA-Z]++){0,5}+'
 ]
 
 LOC_PATTERNS = [
-    r'\b[A-Z][a-z]+,\s*[A-Z][a-z]+\b',  # City, State
-    r'\b[A-Z][a-z]+,\s*[A-Z]{2}\b'      # City, ST
+    r'\b[A-Z][a-z]++,\s*+[A-Z][a-z]++\b',  # City, State
+    r'\b[A-Z][a-z]++,\s*+[A-Z]{2}\b'       # City, ST
 ]
 
 MISC_PATTERNS = [
-    r'\b\d{1,2}/\d{1,2}/\d{4}\b',       # Dates
-    r'\b[A-Z][a-z]+\s+\d{1,2},\s+\d{4}\b',  # Month DD, YYYY
-    r'\b\d{4,}\b',                      # Numbers
-    r'#\d{4}-\d{2}',                    # Project codes
-    r'\b\d+\s*%\b'                      # Percentages
+    r'\b\d{1,2}/\d{1,2}/\d{4}\b',          # Dates
+    r'\b[A-Z][a-z]++\s++\d{1,2},\s++\d{4}\b',  # Month DD, YYYY
+    r'#\d{4}-\d{2}',                       # Project codes
+    r'\b\d{4,}+\b',                        # Numbers
+    r'\b\d++\s*+%'                          # Percentages
 ]
 
+# 🏷️ Raw tag -> (patterns, case-insensitive?, max results)
+CATEGORY_PATTERNS = {
+    "PER": (NAME_PATTERNS, False, 5),
+    "ORG": (ORG_PATTERNS, True, 5),
+    "LOC": (LOC_PATTERNS, False, 5),
+    "MISC": (MISC_PATTERNS, False, 10),
+}
+
+
+def _compile_category(patterns: List[str], ignore_case: bool) -> regex.Pattern[str]:
+    """
+    🧩 Join a category's patterns into one precompiled alternation.
+    """
+    flags = regex.V0 | (regex.IGNORECASE if ignore_case else 0)
+    return regex.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+
+# ⚙️ Precompiled scanners (one pass over the text per category).
+# Categories overlap by design (a "City, ST" is also a capitalized pair), so
+# they are not merged into a single alternation that would consume each other's matches.
+_SCANNERS: Dict[str, Tuple[regex.Pattern[str], int]] = {
+    tag: (_compile_category(patterns, ignore_case), limit)
+    for tag, (patterns, ignore_case, limit) in CATEGORY_PATTERNS.items()
+}
+
 # 🗂️ Domain-specific Entity Mapping
 ENTITY_MAPPING = {
     "advertisement": {"ORG": "advertiser",      "PER": "contact_person",    "LOC": "target_location",    "MISC": "promotion_details"},
@@ -56,41 +101,105 @@ ENTITY_MAPPING = {
 }
 
 
-def extract_entities(document_type: str, content: str) -> Dict[str, List[str]]:
+def _categories_for(document_type: str) -> List[str]:
+    """
+    🎯 Raw tags worth scanning for a document type.
+
+    Only tags that ``ENTITY_MAPPING`` maps for the type are evaluated
+    (e.g. ``budget`` has no PER/LOC slot). Unknown types keep every tag.
+    """
+    mapping = ENTITY_MAPPING.get(document_type)
+    if not mapping:
+        return list(_SCANNERS)
+    return [tag for tag in _SCANNERS if tag in mapping]
+
+
+def _scan(scanner: regex.Pattern[str], content: str,
+          timeout: float) -> Tuple[List[str], bool]:
+    """
+    🔎 Collect matches until the scan finishes or ``timeout`` seconds elapse.
+
+    Returns:
+        matches (list): Matches found (partial if timed out).
+        timed_out (bool): Whether the time budget was exhausted.
+    """
+    matches: List[str] = []
+    if timeout <= 0:
+        return matches, True
+    try:
+        for match in scanner.finditer(content, timeout=timeout):
+            matches.append(match.group(0))
+    except TimeoutError:
+        return matches, True
+    return matches, False
+
+
+def extract_entities(document_type: str, content: str,
+                     timeout: Optional[float] = None) -> Dict[str, List[str]]:
     """
     🏷️ Extract entities using lightweight regex patterns.
+
+    Each relevant category is scanned once with its precompiled alternation;
+    matches are de-duplicated in order of first appearance. All scans share
+    one time budget (``timeout`` or $EXTRACTOR_TIMEOUT, default 0.5s); when it
+    runs out, the matches found so far are kept and a warning is logged.
+
+    When a compiled gazetteer is available, its hits (known people,
+    organizations, locations) are merged in ahead of the regex matches.
+    With $NER_BACKEND set, model predictions come first of all.
     """
+    return extract_entities_batch([(document_type, content)], timeout=timeout)[0]
+
+
+def extract_entities_batch(
+    documents: Sequence[Tuple[str, str]], timeout: Optional[float] = None
+) -> List[Dict[str, List[str]]]:
+    """
+    📦 Extract entities for many ``(document_type, content)`` pairs.
+
+    The NER backend (if configured) tags all documents in one batched pass;
+    regex and gazetteer matching then run per document with its own budget.
+    """
+    if timeout is None:
+        timeout = float(
+            os.environ.get(EXTRACTOR_TIMEOUT_ENV, DEFAULT_EXTRACTOR_TIMEOUT)
+        )
+
+    ner = get_ner_extractor()
+    predicted: List[Dict[str, List[str]]] = [{} for _ in documents]
+    if ner is not None and documents:
+        try:
+            predicted = ner.extract_batch([content for _, content in documents])
+        except Exception as e:
+            logger.error(f"❌ NER backend failed, using regex only: {e}", exc_info=True)
+
+    return [
+        _extract_one(document_type, content, timeout, ner_hits)
+        for (document_type, content), ner_hits in zip(documents, predicted)
+    ]
+
+
+def _extract_one(document_type: str, content: str, timeout: float,
+                 ner_hits: Dict[str, List[str]]) -> Dict[str, List[str]]:
     logger.info(f"Starting extraction for: {document_type}")
+    deadline = time.monotonic() + timeout
 
-    entities = {}
+    categories = _categories_for(document_type)
+    gazetteer = get_gazetteer()
+    known = gazetteer.find(content, tags=categories) if gazetteer is not None else {}
 
-    # Extract names
-    names = []
-    for pattern in NAME_PATTERNS:
-        names.extend(re.findall(pattern, content))
-    if names:
-        entities['PER'] = list(set(names))[:5]
-
-    # Extract organizations
-    orgs = []
-    for pattern in ORG_PATTERNS:
-        orgs.extend(re.findall(pattern, content, re.IGNORECASE))
-    if orgs:
-        entities['ORG'] = list(set(orgs))[:5]
-
-    # Extract locations
-    locs = []
-    for pattern in LOC_PATTERNS:
-        locs.extend(re.findall(pattern, content))
-    if locs:
-        entities['LOC'] = list(set(locs))[:5]
-
-    # Extract miscellaneous
-    misc = []
-    for pattern in MISC_PATTERNS:
-        misc.extend(re.findall(pattern, content))
-    if misc:
-        entities['MISC'] = list(set(misc))[:10]
+    entities = {}
+    for tag in categories:
+        scanner, limit = _SCANNERS[tag]
+        matches, timed_out = _scan(scanner, content, deadline - time.monotonic())
+        if timed_out:
+            logger.warning(f"⏱️ Entity scan for {tag} timed out on {len(content)} "
+                           "chars; keeping partial results.")
+        found = list(
+            dict.fromkeys(ner_hits.get(tag, []) + known.get(tag, []) + matches)
+        )
+        if found:
+            entities[tag] = found[:limit]
 
     return _apply_mapping(entities, document_type)
 
@@ -0,0 +1,242 @@
+# 📚 Gazetteer Matching (Aho-Corasick)
+# Compiles lists of known people, organizations and locations into one
+# automaton that finds every listed name in a single linear pass over the text.
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+GAZETTEER_PATH_ENV = "GAZETTEER_PATH"
+DEFAULT_GAZETTEER_PATH = "gazetteer.pkl"
+
+# 📂 Source list file name -> raw entity tag
+GAZETTEER_SOURCES = {
+    "persons.txt": "PER",
+    "organizations.txt": "ORG",
+    "locations.txt": "LOC",
+}
+
+
+def _fold(text: str) -> str:
+    """
+    🔡 Lowercase without changing string length (keeps match offsets aligned).
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _normalize_entry(entry: str) -> str:
+    return " ".join(_fold(entry).split())
+
+
+class GazetteerAutomaton:
+    """
+    🤖 Aho-Corasick automaton over gazetteer entries.
+
+    Matching walks the text once; the work per character does not depend on
+    how many entries were compiled. Matches must sit on word boundaries, are
+    case-insensitive and return the entry's canonical spelling.
+
+    Args:
+        entries (iterable): ``(name, tag)`` pairs, e.g. ``("Acme Corp", "ORG")``.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]  # entries ending exactly here
+        self._dict_link: List[int] = [-1]  # nearest fail-ancestor with an output
+        self.entries: List[Tuple[str, str, int]] = []  # (canonical, tag, length)
+
+        seen = set()
+        for name, tag in entries:
+            key = _normalize_entry(name)
+            if not key or (key, tag) in seen:
+                continue
+            seen.add((key, tag))
+            self._insert(key, (" ".join(name.split()), tag, len(key)))
+
+        self._build_links()
+        logger.info(f"📚 Compiled gazetteer with {len(self.entries)} entries "
+                    f"({len(self._goto)} states).")
+
+    def _insert(self, key: str, entry: Tuple[str, str, int]) -> None:
+        state = 0
+        for char in key:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._dict_link.append(-1)
+            state = nxt
+        # A name may be listed under several tags ("Washington": LOC and ORG)
+        self._output[state].append(len(self.entries))
+        self.entries.append(entry)
+
+    def _build_links(self) -> None:
+        queue: "deque[int]" = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                fail = self._fail[child]
+                self._dict_link[child] = (
+                    fail if self._output[fail] else self._dict_link[fail]
+                )
+
+    def find(self, text: str,
+             tags: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        🔎 Find gazetteer names in ``text``.
+
+        Overlapping hits are resolved leftmost-longest (``New York City``
+        wins over ``York``); a name listed under several tags is reported
+        under each of them.
+
+        Args:
+            text (str): Text to scan.
+            tags (iterable|None): Restrict results to these raw tags.
+
+        Returns:
+            dict: Raw tag -> canonical names in order of appearance.
+        """
+        wanted = set(tags) if tags is not None else None
+        folded = _fold(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        dict_link, entries = self._dict_link, self.entries
+
+        hits: List[Tuple[int, int, int]] = []  # (start, end, entry index)
+        state = 0
+        for end, char in enumerate(folded, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            match_state = state if output[state] else dict_link[state]
+            while match_state > 0:
+                for index in output[match_state]:
+                    _, tag, length = entries[index]
+                    start = end - length
+                    wanted_tag = wanted is None or tag in wanted
+                    if wanted_tag and _on_boundary(folded, start, end):
+                        hits.append((start, end, index))
+                match_state = dict_link[match_state]
+
+        found: Dict[str, List[str]] = {}
+        last_span = (-1, -1)
+        for start, end, index in sorted(hits, key=lambda h: (h[0], h[0] - h[1], h[2])):
+            if start < last_span[1] and (start, end) != last_span:
+                continue
+            last_span = (start, end)
+            canonical, tag, _ = entries[index]
+            values = found.setdefault(tag, [])
+            if canonical not in values:
+                values.append(canonical)
+        return found
+
+    def save(self, path: str) -> None:
+        """
+        💾 Persist the compiled automaton.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logger.info(f"💾 Gazetteer saved to: {path}")
+
+    @staticmethod
+    def load(path: str) -> "GazetteerAutomaton":
+        with open(path, "rb") as f:
+            automaton = pickle.load(f)
+        if not isinstance(automaton, GazetteerAutomaton):
+            raise ValueError(f"Not a gazetteer file: {path}")
+        return automaton
+
+
+def _on_boundary(text: str, start: int, end: int) -> bool:
+    return ((start == 0 or not text[start - 1].isalnum())
+            and (end == len(text) or not text[end].isalnum()))
+
+
+def read_gazetteer_sources(source_dir: str) -> List[Tuple[str, str]]:
+    """
+    📂 Read ``persons.txt`` / ``organizations.txt`` / ``locations.txt``
+    (one name per line, ``#`` comments) from ``source_dir``.
+
+    Returns:
+        list: ``(name, tag)`` pairs.
+    """
+    entries: List[Tuple[str, str]] = []
+    for filename, tag in GAZETTEER_SOURCES.items():
+        path = os.path.join(source_dir, filename)
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ Gazetteer source not found, skipping: {path}")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            names = [line.strip() for line in f
+                     if line.strip() and not line.lstrip().startswith("#")]
+        logger.info(f"📂 Loaded {len(names)} {tag} names from {path}")
+        entries.extend((name, tag) for name in names)
+    return entries
+
+
+# 🔁 Process-wide automaton (loaded once)
+_gazetteer: Optional[GazetteerAutomaton] = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Optional[GazetteerAutomaton]:
+    """
+    📚 Return the compiled gazetteer, loading it on first use.
+
+    Returns:
+        GazetteerAutomaton|None: None when no gazetteer file exists
+        ($GAZETTEER_PATH, default ``gazetteer.pkl``) or it can't be read.
+    """
+    global _gazetteer, _gazetteer_loaded
+    if _gazetteer_loaded:
+        return _gazetteer
+
+    with _gazetteer_lock:
+        if not _gazetteer_loaded:
+            path = os.environ.get(GAZETTEER_PATH_ENV, DEFAULT_GAZETTEER_PATH)
+            if os.path.exists(path):
+                try:
+                    _gazetteer = GazetteerAutomaton.load(path)
+                    logger.info(f"📚 Loaded gazetteer from {path} "
+                                f"({len(_gazetteer.entries)} entries)")
+                except Exception as e:
+                    logger.error(f"❌ Failed to load gazetteer {path}: {e}",
+                                 exc_info=True)
+            _gazetteer_loaded = True
+    return _gazetteer
+
+
+def reset_gazetteer() -> None:
+    """
+    🔄 Forget the loaded gazetteer (it is re-read on next use).
+    """
+    global _gazetteer, _gazetteer_loaded
+    with _gazetteer_lock:
+        _gazetteer = None
+        _gazetteer_loaded = False
@@ -0,0 +1,456 @@
+# 🛰️ Shared Inference Server & Client (Unix domain socket)
+# Hosts the classifier and embedding model out-of-process so workers don't
+# each hold their own copy. Concurrent requests are micro-batched.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from documents.embedding_cache import EmbeddingCache
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+INFERENCE_SOCKET_ENV = "INFERENCE_SOCKET"
+INFERENCE_TIMEOUT_ENV = "INFERENCE_TIMEOUT"
+INFERENCE_RETRY_INTERVAL = 5.0  # seconds a client skips an unreachable server
+DRAIN_TIMEOUT = 30.0  # seconds shutdown waits for in-flight requests
+
+BatchHandler = Callable[[List[str]], List[Any]]
+
+
+def get_inference_socket() -> Optional[str]:
+    """
+    🔌 Return the configured inference socket path, or None when disabled.
+    """
+    return os.environ.get(INFERENCE_SOCKET_ENV) or None
+
+
+# 📦 Micro-batching
+class MicroBatcher:
+    """
+    🧺 Collect items submitted from many threads and run them through
+    ``handler`` as a single batch.
+
+    A batch is flushed as soon as it holds ``max_batch_size`` items or the
+    first item has waited ``max_wait_ms`` milliseconds.
+    """
+
+    def __init__(self, handler: BatchHandler, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0) -> None:
+        self._handler = handler
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[str, Future[Any]]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List[str]) -> List[Any]:
+        """
+        📨 Enqueue ``items`` and block until all of their results are ready.
+        """
+        futures: List[Future[Any]] = []
+        for item in items:
+            future: Future[Any] = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """
+        🛑 Stop the batching thread after pending items are processed.
+        """
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self._max_wait
+            stop = False
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List[Tuple[str, "Future[Any]"]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            results = list(self._handler(texts))
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Handler returned {len(results)} results for {len(batch)} inputs"
+                )
+        except Exception as e:
+            logger.error(f"❌ Inference batch of {len(batch)} failed: {e}",
+                         exc_info=True)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        logger.debug(f"🧺 Processed inference batch of {len(batch)} items.")
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+# 🖥️ Server
+class _InferenceRequestHandler(socketserver.StreamRequestHandler):
+    """
+    📡 Handle newline-delimited JSON requests on one connection.
+
+    Request:  {"op": "classify" | "embed", "texts": [...],
+               "model": "..." (optional, embed only)}
+    Response: {"ok": true, "results": [...]} or {"ok": false, "error": "..."}
+    """
+
+    server: "_UnixInferenceServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            if not self.server.begin_request():
+                return  # shutting down: the client falls back to its in-process model
+            try:
+                self._respond(line)
+            finally:
+                self.server.end_request()
+
+    def _respond(self, line: bytes) -> None:
+        try:
+            payload = json.loads(line)
+            batcher = self.server.batchers.get(payload.get("op"))
+            if batcher is None:
+                raise ValueError(f"Unknown operation: {payload.get('op')!r}")
+            model = payload.get("model")
+            served = self.server.embedding_model
+            if payload.get("op") == "embed" and model and served not in (None, model):
+                raise ValueError(
+                    f"Server embeds with {self.server.embedding_model}, not {model}"
+                )
+            results = batcher.submit([str(text) for text in payload.get("texts", [])])
+            response: Dict[str, Any] = {"ok": True,
+                                        "results": [_to_jsonable(r) for r in results]}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _UnixInferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    batchers: Dict[str, MicroBatcher]
+    embedding_model: Optional[str] = None
+
+    def server_activate(self) -> None:
+        self._in_flight = 0
+        self._draining = False
+        self._idle = threading.Condition()
+        super().server_activate()
+
+    def begin_request(self) -> bool:
+        """Count a request in, unless the server is draining."""
+        with self._idle:
+            if self._draining:
+                return False
+            self._in_flight += 1
+            return True
+
+    def end_request(self) -> None:
+        with self._idle:
+            self._in_flight -= 1
+            self._idle.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        """Refuse new requests and wait for in-flight ones; False on timeout."""
+        with self._idle:
+            self._draining = True
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout=timeout)
+
+
+class InferenceServer:
+    """
+    🛰️ Serve ``classify``/``embed`` requests over a Unix domain socket.
+
+    Args:
+        socket_path (str): Filesystem path of the Unix socket.
+        handlers (dict): Operation name -> batch function (list of texts -> list
+            of results).
+        max_batch_size (int): Largest micro-batch passed to a handler.
+        max_wait_ms (float): Longest time a request waits for batch-mates.
+        embedding_model (str|None): Model behind ``embed``; requests naming
+            another model get an error (and embed in-process).
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        handlers: Dict[str, BatchHandler],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        embedding_model: Optional[str] = None,
+    ) -> None:
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        self._server = _UnixInferenceServer(socket_path, _InferenceRequestHandler)
+        self._server.batchers = {
+            op: MicroBatcher(handler, max_batch_size=max_batch_size,
+                             max_wait_ms=max_wait_ms)
+            for op, handler in handlers.items()
+        }
+        self._server.embedding_model = embedding_model
+
+    def serve_forever(self) -> None:
+        logger.info(f"🛰️ Inference server listening on {self.socket_path}")
+        self._server.serve_forever()
+
+    def stop_serving(self) -> None:
+        """
+        ✋ Make ``serve_forever`` return (no new connections are accepted).
+
+        Blocks until it has returned, so call it from another thread.
+        """
+        self._server.shutdown()
+
+    def shutdown(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """
+        🛑 Stop serving, let in-flight requests finish and remove the socket file.
+        """
+        self.stop_serving()
+        self.close(timeout)
+
+    def close(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """
+        🧹 Wait (up to ``timeout`` seconds) for requests being answered, then
+        stop the batchers and remove the socket. Requests arriving meanwhile
+        are refused, so their clients fall back to in-process models.
+        """
+        if not self._server.drain(timeout):
+            logger.warning(f"⚠️ Inference requests still running after {timeout:.0f}s; "
+                           "closing anyway.")
+        for batcher in self._server.batchers.values():
+            batcher.close()
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        logger.info("🛑 Inference server stopped.")
+
+
+def build_default_handlers(model_path: str,
+                           embedding_model_name: str) -> Dict[str, BatchHandler]:
+    """
+    🧠 Load the classifier and embedding model once and expose them as batch handlers.
+
+    Args:
+        model_path (str): Path to the trained classifier (joblib).
+        embedding_model_name (str): SentenceTransformer model name.
+
+    Returns:
+        dict: ``{"classify": ..., "embed": ...}``
+    """
+    import joblib
+    from chromadb.utils import embedding_functions
+
+    from documents.classifier import model_version, predict_cached
+
+    logger.info(f"📦 Loading classifier from {model_path}")
+    version = model_version(model_path) or "unknown"
+    model = joblib.load(model_path)
+
+    logger.info(f"🧠 Loading embedding model {embedding_model_name}")
+    embed = embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=embedding_model_name
+    )
+
+    def classify(texts: List[str]) -> List[Any]:
+        # Cached under the version of the file loaded at startup, which this
+        # process keeps serving
+        return list(predict_cached(model, texts, version))
+
+    def embed_texts(texts: List[str]) -> List[Any]:
+        return list(embed(texts))
+
+    return {"classify": classify, "embed": embed_texts}
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Convert numpy scalars/arrays into plain JSON types."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+# 📞 Client
+# Socket path -> monotonic time until which the server is skipped. Failures
+# are logged when a server goes down, not on every call while it stays down.
+_unavailable_until: Dict[str, float] = {}
+_warned: Dict[Tuple[str, str], bool] = {}
+
+
+def _warn_once(socket_path: str, kind: str, message: str) -> None:
+    if not _warned.get((socket_path, kind)):
+        _warned[(socket_path, kind)] = True
+        logger.warning(message)
+    else:
+        logger.debug(message)
+
+
+def request_inference(op: str, texts: List[str], socket_path: Optional[str] = None,
+                      model: Optional[str] = None) -> Optional[List[Any]]:
+    """
+    📞 Send a batch to the inference server.
+
+    Args:
+        op (str): ``"classify"`` or ``"embed"``.
+        texts (list): Input texts.
+        socket_path (str|None): Override for the configured socket.
+        model (str|None): Model the results must come from (the server refuses others).
+
+    Returns:
+        list|None: Results in input order, or None when no server is configured
+        or it could not answer (callers fall back to in-process models). An
+        unreachable server is not contacted again for
+        ``INFERENCE_RETRY_INTERVAL`` seconds.
+    """
+    socket_path = socket_path or get_inference_socket()
+    if not socket_path or time.monotonic() < _unavailable_until.get(socket_path, 0.0):
+        return None
+
+    timeout = float(os.environ.get(INFERENCE_TIMEOUT_ENV, "30"))
+    payload: Dict[str, Any] = {"op": op, "texts": texts}
+    if model:
+        payload["model"] = model
+    request = json.dumps(payload).encode("utf-8") + b"\n"
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(request)
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        response = json.loads(line)
+    except (OSError, ValueError) as e:
+        _unavailable_until[socket_path] = time.monotonic() + INFERENCE_RETRY_INTERVAL
+        _warn_once(socket_path, "unavailable",
+                   f"⚠️ Inference server unavailable at {socket_path}, "
+                   f"using in-process model: {e}")
+        return None
+
+    _unavailable_until.pop(socket_path, None)
+    if _warned.pop((socket_path, "unavailable"), None):
+        logger.info(f"🛰️ Inference server at {socket_path} is back.")
+    if response.get("ok"):
+        _warned.pop((socket_path, f"error:{op}"), None)
+    else:
+        _warn_once(socket_path, f"error:{op}",
+                   f"⚠️ Inference server error for '{op}', using in-process model: "
+                   f"{response.get('error')}")
+        return None
+
+    results: List[Any] = response["results"]
+    return results
+
+
+class RemoteFirstEmbeddingFunction:
+    """
+    🧠 Embedding function that asks the inference server first and only
+    builds the in-process model (via ``fallback_factory``) when needed.
+
+    Also answers the descriptive half of Chroma's embedding function
+    protocol (``name``, ``get_config``, ...), so Chroma can check it against
+    the function persisted with a collection without building the model.
+
+    Args:
+        fallback_factory (callable): Builds the in-process embedding function.
+        name (str): Name reported to Chroma (e.g. ``"sentence_transformer"``).
+        config (dict|None): Config reported to Chroma (e.g. ``{"model_name": ...}``).
+        cache (EmbeddingCache|None): Consulted before the server or model;
+            only texts it misses are embedded.
+    """
+
+    def __init__(self, fallback_factory: Callable[[], Callable[[List[str]], Any]],
+                 name: str = "default", config: Optional[Dict[str, Any]] = None,
+                 cache: Optional["EmbeddingCache"] = None) -> None:
+        self._fallback_factory = fallback_factory
+        self._fallback: Optional[Callable[[List[str]], Any]] = None
+        self._lock = threading.Lock()
+        self._name = name
+        self._config = dict(config or {})
+        self.cache = cache
+
+    def name(self) -> str:
+        return self._name
+
+    def get_config(self) -> Dict[str, Any]:
+        return dict(self._config)
+
+    def is_legacy(self) -> bool:
+        # Not rebuildable from config by Chroma; it keeps using this instance
+        return True
+
+    def default_space(self) -> str:
+        return "l2"
+
+    def supported_spaces(self) -> List[str]:
+        return ["cosine", "l2", "ip"]
+
+    def embed_query(self, input: List[str]) -> List[Any]:
+        return self(input)
+
+    def __call__(self, input: List[str]) -> List[Any]:
+        texts = list(input)
+        if self.cache is None:
+            return self._embed(texts)
+
+        results: List[Any] = self.cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, results)
+                                     if vector is None))
+        if missing:
+            computed = dict(zip(missing, self._embed(missing)))
+            self.cache.put_many(missing, list(computed.values()))
+            results = [computed[text] if vector is None else vector
+                       for text, vector in zip(texts, results)]
+        return results
+
+    def _embed(self, input: List[str]) -> List[Any]:
+        remote = request_inference("embed", list(input),
+                                   model=self._config.get("model_name"))
+        if remote is not None:
+            return remote
+
+        if self._fallback is None:
+            with self._lock:
+                if self._fallback is None:
+                    self._fallback = self._fallback_factory()
+        return list(self._fallback(input))
@@ -0,0 +1,65 @@
+# 🧭 kNN Document Classification (reusing Chroma embeddings)
+# Predicts the document type by a distance-weighted vote over the nearest
+# labeled documents already stored in the `documents` collection.
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from documents.chroma_client import query_by_embedding
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+CLASSIFIER_BACKEND_ENV = "CLASSIFIER_BACKEND"
+KNN_TOP_K_ENV = "KNN_TOP_K"
+DEFAULT_KNN_TOP_K = 10
+
+
+def get_classifier_backend() -> str:
+    """
+    ⚙️ Return the configured classifier backend: ``"tfidf"`` (default) or ``"knn"``.
+    """
+    return os.environ.get(CLASSIFIER_BACKEND_ENV, "tfidf").strip().lower()
+
+
+def predict_document_type_knn(embedding: List[float],
+                              top_k: Optional[int] = None) -> Optional[str]:
+    """
+    🧭 Predict the document type from the nearest stored documents.
+
+    Each neighbour votes for its stored ``document_type`` with weight
+    ``1 / (distance + eps)``.
+
+    Args:
+        embedding (list): Embedding of the document to classify.
+        top_k (int|None): Neighbours to consider (defaults to $KNN_TOP_K or 10).
+
+    Returns:
+        str|None: Winning document type, or None when no labeled neighbours
+        exist (callers should fall back to the TF-IDF classifier).
+    """
+    if top_k is None:
+        top_k = int(os.environ.get(KNN_TOP_K_ENV, DEFAULT_KNN_TOP_K))
+
+    results = query_by_embedding(embedding, top_k=top_k)
+    metadatas = (results.get("metadatas") or [[]])[0] or []
+    distances = (results.get("distances") or [[]])[0] or []
+
+    votes: Dict[str, float] = defaultdict(float)
+    for metadata, distance in zip(metadatas, distances):
+        label = (metadata or {}).get("document_type")
+        if label:
+            votes[str(label)] += 1.0 / (float(distance) + 1e-6)
+
+    if not votes:
+        logger.info("🧭 No labeled neighbours found for kNN classification.")
+        return None
+
+    label = max(votes, key=lambda key: votes[key])
+    logger.debug(f"🧭 kNN votes: {dict(votes)} -> {label}")
+    return label
@@ -0,0 +1,445 @@
+# 🔤 BM25 Lexical Index
+# Embeddings blur exact strings: an invoice number or a project code like
+# "#1234-56" is close to every other code. This inverted index is kept next
+# to the vector store (updated on every store) so /api/search/ can rank by
+# BM25 and fuse it with the vector ranking, and answer identifier lookups
+# without embedding the query. Disabled unless LEXICAL_INDEX_PATH is set.
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from documents.vector_store import matches_where
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+LEXICAL_INDEX_PATH_ENV = "LEXICAL_INDEX_PATH"
+
+# 🧮 BM25 parameters (Okapi defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_TERM_FREQUENCY = 0xFFFF  # stored as uint16
+
+# 🔀 Reciprocal-rank fusion constant (Cormack et al.)
+RRF_K = 60
+
+_WORD = re.compile(r"\w+")
+# Identifiers: whitespace-delimited strings with a digit and punctuation, the
+# shapes MISC_PATTERNS extracts (project codes "#1234-56", dates "12/05/2024",
+# "15%") plus other codes ("INV-2024-001"). Matched with plain ``re`` on
+# digit-bearing chunks only, so tokenizing stays cheap on long OCR texts.
+_DIGIT_CHUNK = re.compile(r"(?<!\S)[^\s\d]*\d\S*")
+_EDGE_PUNCTUATION = ".,;:!?()[]{}<>\"'"
+
+
+def _identifiers(text: str) -> List[str]:
+    identifiers = []
+    for chunk in _DIGIT_CHUNK.findall(text):
+        core = chunk.strip(_EDGE_PUNCTUATION).lower()
+        if core and not _WORD.fullmatch(core):
+            identifiers.append(core)
+    return identifiers
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    🔤 Index terms of ``text``: lowercase words, plus every identifier as one
+    whole term (``"#1234-56"`` gives ``1234``, ``56`` and ``#1234-56``), so
+    exact codes outrank documents that merely share their digits.
+    """
+    return _WORD.findall(text.lower()) + _identifiers(text)
+
+
+def is_identifier_query(query: str) -> bool:
+    """
+    🆔 Whether every word of ``query`` is an identifier or number (``#1234-56``,
+    ``INV-2024-001``, ``100045``), which lexical search answers on its own.
+    """
+    chunks = query.split()
+    return bool(chunks) and all(_DIGIT_CHUNK.fullmatch(chunk) for chunk in chunks)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]],
+                           k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    🔀 Fuse ranked id lists: each id scores ``sum(1 / (k + rank))`` over the
+    lists it appears in (rank starts at 1).
+
+    Returns:
+        list: ``(id, score)`` by descending score; ties keep first-seen order.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class LexicalIndex:
+    """
+    🔤 Incrementally updated BM25 inverted index.
+
+    Each document occupies a slot; each term has a postings list of two
+    compact arrays (slot numbers as uint32, term frequencies as uint16).
+    Re-indexing a document gives it a new slot and retires the old one, so
+    postings are only ever appended to.
+
+    Layout under ``<directory>/``:
+
+    - ``snapshot.npz``: live documents as of the last ``compact`` (postings
+      concatenated into flat arrays with per-term offsets), loaded on open.
+    - ``log.jsonl``: append-only operations since then (``put`` a document's
+      term counts and metadata, ``meta`` update, ``del``), replayed on open.
+
+    Writers append under an exclusive ``flock``; every call first reads log
+    lines other processes appended. ``compact`` writes a new snapshot and
+    empties the log; other processes notice the new log file and reload.
+
+    Args:
+        directory (str): Index directory (created if missing).
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._log_path = os.path.join(directory, "log.jsonl")
+        self._snapshot_path = os.path.join(directory, "snapshot.npz")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._lock = threading.RLock()
+        self._reset_state()
+        with self._lock:
+            self._refresh()
+
+    # 📖 State
+
+    def _reset_state(self) -> None:
+        self._ids: List[str] = []  # slot -> document id
+        self._slots: Dict[str, int] = {}  # live id -> slot
+        self._lengths = array("I")  # slot -> document length in terms
+        self._live = bytearray()  # slot -> 1 while current
+        self._metadatas: List[Dict[str, Any]] = []
+        # term -> (slots uint32, tfs uint16)
+        self._postings: Dict[str, Tuple[array[int], array[int]]] = {}
+        self._total_length = 0
+        self._norm: Optional[np.ndarray] = None  # BM25 length normalization per slot
+        self._log_offset = 0
+        self._log_inode: Optional[int] = None
+        self._loaded = False
+
+    def _load_snapshot(self) -> None:
+        if not os.path.exists(self._snapshot_path):
+            return
+        with np.load(self._snapshot_path) as snapshot:
+            header = json.loads(snapshot["header"].tobytes().decode("utf-8"))
+            lengths, offsets = snapshot["lengths"], snapshot["offsets"]
+            slots, tfs = snapshot["slots"], snapshot["tfs"]
+        self._ids = header["ids"]
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+        self._metadatas = header["metadatas"]
+        self._lengths = array("I", lengths.astype(np.uint32).tobytes())
+        self._live = bytearray(b"\x01" * len(self._ids))
+        self._total_length = int(lengths.sum())
+        for i, term in enumerate(header["terms"]):
+            start, end = offsets[i], offsets[i + 1]
+            self._postings[term] = (array("I", slots[start:end].tobytes()),
+                                    array("H", tfs[start:end].tobytes()))
+
+    def _refresh(self) -> None:
+        """
+        Replay log lines appended since the last refresh (by any process);
+        reload from the snapshot when ``compact`` replaced the log.
+        """
+        try:
+            stat = os.stat(self._log_path)
+        except FileNotFoundError:
+            stat = None
+        inode = stat.st_ino if stat else None
+        if not self._loaded or inode != self._log_inode:
+            self._reset_state()
+            self._load_snapshot()
+            self._loaded = True
+            self._log_inode = inode
+        if stat is None or stat.st_size == self._log_offset:
+            return
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            tail = f.read()
+        # Only consume complete lines; a concurrent writer may be mid-line
+        complete = tail[:tail.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            self._apply(json.loads(line))
+        self._log_offset += len(complete)
+        self._norm = None
+
+    def _length_norm(self) -> np.ndarray:
+        if self._norm is None:
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+            average = self._total_length / max(1, len(self._slots)) or 1.0
+            self._norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / average)
+        return self._norm
+
+    def _retire(self, doc_id: str) -> None:
+        slot = self._slots.pop(doc_id, None)
+        if slot is not None:
+            self._live[slot] = 0
+            self._total_length -= self._lengths[slot]
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        op, doc_id = entry["op"], entry["id"]
+        if op == "put":
+            self._retire(doc_id)
+            slot = len(self._ids)
+            terms: Dict[str, int] = entry["terms"]
+            length = sum(terms.values())
+            self._ids.append(doc_id)
+            self._slots[doc_id] = slot
+            self._lengths.append(length)
+            self._live.append(1)
+            self._metadatas.append(entry.get("metadata") or {})
+            self._total_length += length
+            for term, tf in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array("I"), array("H"))
+                postings[0].append(slot)
+                postings[1].append(min(tf, MAX_TERM_FREQUENCY))
+        elif op == "meta" and doc_id in self._slots:
+            self._metadatas[self._slots[doc_id]] = entry["metadata"]
+        elif op == "del":
+            self._retire(doc_id)
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append and apply ``entries`` (inside ``_write``, so nothing else was
+        appended meanwhile).
+        """
+        if not entries:
+            return
+        data = "".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8")
+        with open(self._log_path, "ab") as f:
+            f.write(data)
+        if self._log_inode is None:
+            self._log_inode = os.stat(self._log_path).st_ino
+        for entry in entries:
+            self._apply(entry)
+        self._log_offset += len(data)
+        self._norm = None
+
+    # ✍️ Writing
+
+    def add(self, ids: List[str], texts: List[str],
+            metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        ✍️ Index documents, replacing ids already indexed.
+        """
+        metadatas = metadatas or [{} for _ in ids]
+        entries = [
+            {"op": "put", "id": doc_id, "terms": dict(Counter(tokenize(text or ""))),
+             "metadata": metadata or {}}
+            for doc_id, text, metadata in zip(ids, texts, metadatas)
+        ]
+        with self._write():
+            self._append_log(entries)
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        ✏️ Merge metadata into indexed documents (``None`` removes a key), as
+        Chroma's ``update`` does.
+        """
+        with self._write():
+            entries = []
+            for doc_id, changes in zip(ids, metadatas):
+                if doc_id not in self._slots:
+                    continue
+                merged = dict(self._metadatas[self._slots[doc_id]])
+                for key, value in (changes or {}).items():
+                    if value is None:
+                        merged.pop(key, None)
+                    else:
+                        merged[key] = value
+                entries.append({"op": "meta", "id": doc_id, "metadata": merged})
+            self._append_log(entries)
+
+    def delete(self, ids: Iterable[str]) -> None:
+        """
+        🗑️ Drop documents from the index (unknown ids are ignored).
+        """
+        with self._write():
+            self._append_log([{"op": "del", "id": doc_id} for doc_id in ids
+                              if doc_id in self._slots])
+
+    def clear(self) -> None:
+        """
+        🧹 Remove every document.
+        """
+        with self._write():
+            for doc_id in list(self._slots):
+                self._retire(doc_id)
+            self._write_snapshot()
+
+    def compact(self) -> None:
+        """
+        🗜️ Write live documents to a new snapshot and start an empty log.
+        """
+        with self._write():
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """
+        Snapshot the live documents and replace the log (inside ``_write``).
+        """
+        live = np.fromiter(sorted(self._slots.values()), dtype=np.int64,
+                           count=len(self._slots))
+        renumber = np.full(len(self._ids), -1, dtype=np.int64)
+        renumber[live] = np.arange(len(live))
+        is_live = np.frombuffer(bytes(self._live), dtype=bool)
+
+        terms, offsets, all_slots, all_tfs = [], [0], [], []
+        for term, (slots, tfs) in self._postings.items():
+            slot_view = np.frombuffer(slots.tobytes(), dtype=np.uint32)
+            keep = is_live[slot_view]
+            if not keep.any():
+                continue
+            terms.append(term)
+            all_slots.append(renumber[slot_view[keep]].astype(np.uint32))
+            all_tfs.append(np.frombuffer(tfs.tobytes(), dtype=np.uint16)[keep])
+            offsets.append(offsets[-1] + int(keep.sum()))
+
+        header = {
+            "ids": [self._ids[slot] for slot in live],
+            "metadatas": [self._metadatas[slot] for slot in live],
+            "terms": terms,
+        }
+        temporary = self._snapshot_path + ".tmp.npz"
+        np.savez(
+            temporary,
+            header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+            lengths=np.frombuffer(self._lengths.tobytes(), dtype=np.uint32)[live],
+            offsets=np.asarray(offsets, dtype=np.int64),
+            slots=(np.concatenate(all_slots) if all_slots
+                   else np.zeros(0, dtype=np.uint32)),
+            tfs=np.concatenate(all_tfs) if all_tfs else np.zeros(0, dtype=np.uint16),
+        )
+        os.replace(temporary, self._snapshot_path)
+        # A new (empty) log file: other processes see its inode change and reload
+        temporary = self._log_path + ".tmp"
+        open(temporary, "wb").close()
+        os.replace(temporary, self._log_path)
+        self._loaded = False
+        self._refresh()
+
+    # 🔎 Reading
+
+    def count(self) -> int:
+        """
+        🔢 Number of indexed documents.
+        """
+        with self._lock:
+            self._refresh()
+            return len(self._slots)
+
+    def search(self, query: str, top_k: int = 10,
+               where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        🔎 The ``top_k`` documents with the highest BM25 score for ``query``.
+
+        Only postings of the query's terms are read: scores accumulate into
+        one float per slot, retired slots and ``where`` mismatches are
+        dropped, and the top scores are picked with ``argpartition``.
+
+        Args:
+            query (str): Query text (tokenized like documents).
+            top_k (int): Number of results.
+            where (dict|None): Chroma-style filter on the indexed metadata.
+
+        Returns:
+            list: ``(document id, score)``, best first; documents matching no
+            query term are not returned.
+        """
+        with self._lock:
+            self._refresh()
+            n_docs = len(self._slots)
+            if not n_docs or top_k < 1:
+                return []
+            # Zero-copy views; writers only append under self._lock, after these
+            # are dropped
+            live = np.frombuffer(self._live, dtype=bool)
+            norm = self._length_norm()
+
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+            for term, weight in Counter(tokenize(query)).items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                slots = np.frombuffer(postings[0], dtype=np.uint32)
+                tfs = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+                current = live[slots]
+                slots, tfs = slots[current], tfs[current]
+                if not len(slots):
+                    continue
+                idf = math.log(1.0 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+                scores[slots] += (weight * idf * tfs * (BM25_K1 + 1.0)
+                                  / (tfs + norm[slots]))
+
+            del live  # release the buffer export so writers can append again
+            candidates = np.flatnonzero(scores > 0)
+            if where:
+                candidates = candidates[[matches_where(self._metadatas[slot], where)
+                                         for slot in candidates]]
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates],
+                                                        top_k - 1)[:top_k]]
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._ids[slot], float(scores[slot])) for slot in ranked]
+
+
+# 💤 Lazily opened singleton (one per process)
+_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+
+def lexical_index_enabled() -> bool:
+    """
+    🔤 Whether $LEXICAL_INDEX_PATH is set.
+    """
+    return bool(os.environ.get(LEXICAL_INDEX_PATH_ENV))
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """
+    🔤 The index at $LEXICAL_INDEX_PATH (opened on first use), or None when unset.
+    """
+    global _index
+    path = os.environ.get(LEXICAL_INDEX_PATH_ENV)
+    if not path:
+        return None
+    if _index is None or _index.directory != path:
+        with _index_lock:
+            if _index is None or _index.directory != path:
+                logger.info(f"🔤 Opening lexical index at {path}")
+                _index = LexicalIndex(path)
+    return _index
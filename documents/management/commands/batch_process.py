@@ -1,11 +1,10 @@
 import logging
 import os
-import uuid
 
 from django.core.management.base import BaseCommand
 
 from documents.card_parser import extract_card_fields
-from documents.chroma_client import store_document_in_chromadb
+from documents.chroma_client import new_document_id, store_document_in_chromadb
 from documents.classifier import predict_document_type
 from documents.extractor import extract_entities
 
@@ -77,7 +76,7 @@ class Command(BaseCommand):
                     logger.info(f"📦 Extracted {len(entities)} entity fields.")
 
                     # 5️⃣ Store in ChromaDB
-                    doc_id = str(uuid.uuid4())
+                    doc_id = new_document_id(comment_text)
                     metadata = {
                         'division': fields.get('division'),
                         'week_ending': fields.get('week_ending'),
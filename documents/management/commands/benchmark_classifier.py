@@ -0,0 +1,91 @@
+# ⏱️ Django Management Command: Benchmark Cascade vs Single Classifier
+
+import logging
+import time
+from typing import Any, Callable
+
+from django.core.management.base import BaseCommand
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from documents.classifier import (
+    CASCADE_MARGIN,
+    CASCADE_PREFIX_CHARS,
+    _build_pipeline,
+    build_cascade,
+    load_documents_from_folders,
+)
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    ⏱️ Custom Django Command:
+    Train the single TF-IDF model and the two-stage cascade on the same split
+    of the dataset, then report accuracy and throughput for both.
+    """
+
+    help = 'Benchmark the cascade classifier against the single model on docs-sm.'
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('--dataset', type=str, default='docs-sm',
+                            help='Labeled dataset folder')
+        parser.add_argument('--prefix-chars', type=int, default=CASCADE_PREFIX_CHARS,
+                            help='Cascade stage-1 prefix length')
+        parser.add_argument('--margin', type=float, default=CASCADE_MARGIN,
+                            help='Cascade stage-1 confidence margin')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timing repetitions (best run is reported)')
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Load texts (OCR cache), fit both models and time predictions.
+        """
+        texts, labels = load_documents_from_folders(options['dataset'])
+        if not texts:
+            self.stdout.write(self.style.ERROR("❌ No documents loaded."))
+            return
+
+        X_train, X_test, y_train, y_test = train_test_split(texts, labels,
+                                                            test_size=0.2,
+                                                            random_state=42)
+
+        single = _build_pipeline()
+        single.fit(X_train, y_train)
+        cascade = build_cascade(X_train, y_train, single,
+                                prefix_chars=options['prefix_chars'],
+                                margin=options['margin'])
+
+        self.stdout.write(f"📊 {len(X_train)} train / {len(X_test)} test documents\n")
+        self.stdout.write(f"{'model':<10}{'accuracy':>10}"
+                          f"{'docs/s (1-by-1)':>18}{'docs/s (batch)':>16}")
+
+        for name, model in (("single", single), ("cascade", cascade)):
+            accuracy = accuracy_score(y_test, model.predict(X_test))
+            one_by_one = self._throughput(lambda: [model.predict([t]) for t in X_test],
+                                          len(X_test), options['repeat'])
+            batched = self._throughput(lambda: model.predict(X_test), len(X_test),
+                                       options['repeat'])
+            self.stdout.write(
+                f"{name:<10}{accuracy:>10.3f}{one_by_one:>18.1f}{batched:>16.1f}"
+            )
+
+        _, fast = cascade.predict_with_stages(X_test)
+        self.stdout.write(self.style.SUCCESS(
+            f"\n⚡ Stage-1 handled {sum(fast)}/{len(fast)} documents "
+            f"(prefix={options['prefix_chars']}, margin={options['margin']})"
+        ))
+
+    @staticmethod
+    def _throughput(run: Callable[[], Any], count: int, repeat: int) -> float:
+        best = float('inf')
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        return count / best if best > 0 else float('inf')
@@ -0,0 +1,132 @@
+# ⏱️ Django Management Command: Benchmark Vector Store Backends
+
+import logging
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from documents.vector_store import BACKENDS, open_vector_store
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+DOCUMENT_TYPES = 16
+
+
+def _vectors(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    normalized: np.ndarray = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return normalized
+
+
+class Command(BaseCommand):
+    """
+    ⏱️ Custom Django Command:
+    Insert ``N`` random unit vectors into each backend (in a temporary
+    directory) and time bulk inserts and top-k queries, unfiltered and
+    filtered on ``document_type``. When the NumPy engine (exact) runs first,
+    other backends also report recall@k against it.
+    """
+
+    help = 'Compare insert and query latency of the vector store backends.'
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[10_000, 100_000, 1_000_000],
+                            help='Collection sizes to test')
+        parser.add_argument('--backends', nargs='+', choices=BACKENDS,
+                            default=['numpy', 'chroma'])
+        parser.add_argument('--dim', type=int, default=384,
+                            help='Vector dimension (MiniLM: 384)')
+        parser.add_argument('--queries', type=int, default=100,
+                            help='Queries timed per size')
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Vectors per upsert call')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Run every backend at every size and print one line per run.
+        """
+        dim, top_k = options['dim'], options['top_k']
+        self.stdout.write(
+            f"{'backend':<8} {'vectors':>9} {'insert s':>9} {'vec/s':>9} "
+            f"{'q p50 ms':>9} {'q p95 ms':>9} {'filt p50':>9} {'recall':>7}"
+        )
+        for size in options['sizes']:
+            queries = _vectors(np.random.default_rng(options['seed'] + 1),
+                               options['queries'], dim)
+            exact = None
+            for backend in options['backends']:
+                row = self._run(backend, size, queries, dim, top_k,
+                                options['batch_size'], options['seed'], exact)
+                if backend == 'numpy':
+                    exact = row['ids']
+                recall = '' if row['recall'] is None else format(row['recall'], '.3f')
+                self.stdout.write(
+                    f"{backend:<8} {size:>9} {row['insert_s']:>9.2f} "
+                    f"{size / row['insert_s']:>9.0f} "
+                    f"{row['p50']:>9.2f} {row['p95']:>9.2f} "
+                    f"{row['filtered_p50']:>9.2f} {recall:>7}"
+                )
+
+    def _run(self, backend: str, size: int, queries: np.ndarray, dim: int, top_k: int,
+             batch_size: int, seed: int,
+             exact: Optional[List[List[str]]]) -> Dict[str, Any]:
+        directory = tempfile.mkdtemp(prefix=f"bench-{backend}-")
+        try:
+            store = open_vector_store(backend, directory)
+            collection = store.get_or_create_collection("bench")
+            rng = np.random.default_rng(seed)
+
+            start = time.perf_counter()
+            for offset in range(0, size, batch_size):
+                count = min(batch_size, size - offset)
+                collection.upsert(
+                    ids=[str(offset + i) for i in range(count)],
+                    embeddings=_vectors(rng, count, dim),
+                    metadatas=[{"document_type": f"type{(offset + i) % DOCUMENT_TYPES}"}
+                               for i in range(count)]
+                )
+            insert_s = time.perf_counter() - start
+
+            latencies: List[float] = []
+            ids: List[List[str]] = []
+            for query in queries:
+                start = time.perf_counter()
+                result = collection.query(query_embeddings=[query], n_results=top_k,
+                                          include=["distances"])
+                latencies.append((time.perf_counter() - start) * 1000)
+                ids.append(result["ids"][0])
+
+            filtered: List[float] = []
+            for query in queries:
+                start = time.perf_counter()
+                collection.query(query_embeddings=[query], n_results=top_k,
+                                 where={"document_type": "type3"},
+                                 include=["distances"])
+                filtered.append((time.perf_counter() - start) * 1000)
+
+            recall: Optional[float] = None
+            if exact is not None and backend != 'numpy':
+                recall = float(np.mean([len(set(a) & set(b)) / max(1, len(b))
+                                        for a, b in zip(ids, exact)]))
+
+            return {
+                "insert_s": insert_s,
+                "p50": float(np.percentile(latencies, 50)),
+                "p95": float(np.percentile(latencies, 95)),
+                "filtered_p50": float(np.percentile(filtered, 50)),
+                "recall": recall,
+                "ids": ids,
+            }
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,120 @@
+# 🧹 Django Management Command: Collapse Duplicate Documents
+
+import logging
+from typing import Dict
+
+from django.core.management.base import BaseCommand
+
+from documents.chroma_client import (
+    all_collections,
+    content_document_id,
+    content_ids_enabled,
+    unflatten_metadata,
+)
+from documents.entity_index import (
+    entity_index_enabled,
+    mirror_entities,
+    remove_documents,
+)
+from documents.lexical_index import get_lexical_index
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    🧹 Custom Django Command:
+    Keep one stored document per distinct text and delete the rest, page by
+    page. With content-hash ids enabled ($DOCUMENT_ID_MODE != "uuid"), the
+    survivors are also re-keyed to their content id, so later uploads of the
+    same text update them instead of adding a copy. The lexical and entity
+    indexes (when enabled) follow the same deletions and re-keys.
+    """
+
+    help = 'Collapse stored documents with identical text into one.'
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Documents read per page')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count duplicates, change nothing')
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Page through every collection, dropping texts already seen.
+        """
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
+        rekey = content_ids_enabled()
+        index = get_lexical_index()
+
+        kept: Dict[str, str] = {}  # content id -> id of the document kept for it
+        scanned = removed = rekeyed = 0
+        for collection in all_collections():
+            offset = 0
+            while True:
+                page = collection.get(offset=offset, limit=batch_size,
+                                      include=["documents", "metadatas", "embeddings"])
+                ids = page.get("ids") or []
+                if not ids:
+                    break
+
+                duplicates, moves = [], []
+                for i, doc_id in enumerate(ids):
+                    if (page["metadatas"][i] or {}).get("parent_id"):
+                        # Passages of a chunked document are stored under ids
+                        # derived from it
+                        continue
+                    content_id = content_document_id(page["documents"][i] or "")
+                    if kept.get(content_id) == doc_id:
+                        continue  # survivor (or a copy re-keyed earlier in this run)
+                    if content_id in kept:
+                        duplicates.append(i)
+                    elif rekey and doc_id != content_id:
+                        moves.append((i, content_id))
+                        kept[content_id] = content_id
+                    else:
+                        kept[content_id] = doc_id
+
+                scanned += len(ids)
+                removed += len(duplicates)
+                rekeyed += len(moves)
+                dropped = [ids[i] for i in duplicates] + [ids[i] for i, _ in moves]
+                if not dry_run:
+                    if moves:
+                        collection.upsert(
+                            ids=[content_id for _, content_id in moves],
+                            documents=[page["documents"][i] for i, _ in moves],
+                            metadatas=[page["metadatas"][i] for i, _ in moves],
+                            embeddings=[page["embeddings"][i] for i, _ in moves]
+                        )
+                    if dropped:
+                        collection.delete(ids=dropped)
+                    if index is not None:
+                        index.delete(dropped)
+                        index.add([content_id for _, content_id in moves],
+                                  [page["documents"][i] or "" for i, _ in moves],
+                                  [page["metadatas"][i] or {} for i, _ in moves])
+                    if entity_index_enabled():
+                        remove_documents(dropped)
+                        mirror_entities(
+                            (content_id,
+                             *unflatten_metadata(page["metadatas"][i] or {}))
+                            for i, content_id in moves
+                        )
+                    offset += len(ids) - len(dropped)
+                else:
+                    offset += len(ids)
+                self.stdout.write(
+                    f"📄 Scanned {scanned} documents, {removed} duplicates"
+                )
+
+        verb = "Would remove" if dry_run else "Removed"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {removed} duplicates of {scanned} documents "
+            f"({rekeyed} re-keyed to content ids)."
+        ))
@@ -0,0 +1,69 @@
+# 📮 Django Management Command: Flush the Write-Behind Vector Spool
+
+import logging
+import signal
+
+from django.core.management.base import BaseCommand
+
+from documents.spool import VECTOR_SPOOL_PATH_ENV, get_vector_spool
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    📮 Custom Django Command:
+    Push spooled documents into ChromaDB. By default drains what is due and
+    exits; with --follow it keeps flushing in the foreground, as a dedicated
+    flusher process next to the web workers.
+    """
+
+    help = 'Flush the write-behind vector spool ($VECTOR_SPOOL_PATH) into ChromaDB.'
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('--follow', action='store_true',
+                            help='Keep flushing until interrupted')
+        parser.add_argument('--timeout', type=float, default=None,
+                            help='Stop draining after this many seconds')
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Drain (or follow) the spool and print its metrics.
+        """
+        spool = get_vector_spool(start=False)
+        if spool is None:
+            self.stdout.write(self.style.ERROR(
+                f"❌ ${VECTOR_SPOOL_PATH_ENV} is not set; nothing to flush."
+            ))
+            return
+
+        if options['follow']:
+            stopped = []
+            signal.signal(signal.SIGTERM, lambda signum, frame: stopped.append(signum))
+            self.stdout.write(self.style.SUCCESS(
+                f"📮 Flushing {spool.path} until interrupted"
+            ))
+            spool.start()
+            try:
+                while not stopped:
+                    signal.pause()
+            except KeyboardInterrupt:
+                pass
+            spool.stop()
+        else:
+            remaining = spool.drain(timeout=options['timeout'])
+            if remaining:
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️ {remaining} documents still pending (waiting for retry)."
+                ))
+
+        stats = spool.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Flushed {stats['flushed']} documents "
+            f"(avg {stats['avg_flush_ms']:.0f} ms/batch); "
+            f"depth {stats['depth']}, dead {stats['dead']}"
+        ))
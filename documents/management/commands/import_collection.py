@@ -0,0 +1,86 @@
+# 📥 Django Management Command: Import a Snapshot Into the Vector Store
+
+import logging
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from documents.chroma_client import add_embedded_records, embedding_model_name
+from documents.entity_index import entity_index_enabled
+from documents.lexical_index import get_lexical_index
+from documents.snapshot import iter_snapshot, read_manifest
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    📥 Custom Django Command:
+    Bulk-add the records of an ``export_collection`` snapshot with their
+    stored embeddings (nothing is OCR'd or embedded again). Records are
+    routed to this node's collection layout; ids already stored are kept
+    unless ``--replace`` is given, so an interrupted import can be repeated.
+    The lexical and entity indexes, when enabled, are rebuilt afterwards.
+    """
+
+    help = ('Import a snapshot written by export_collection, without recomputing '
+            'embeddings.')
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('directory', type=str, help='Snapshot directory to read')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Records written per call')
+        parser.add_argument('--replace', action='store_true',
+                            help='Overwrite records whose id is already stored')
+        parser.add_argument(
+            '--allow-model-mismatch', action='store_true',
+            help='Import embeddings made by a different embedding model'
+        )
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Validate the manifest, then add the shards batch by batch.
+        """
+        expected_model = None
+        if not options['allow_model_mismatch']:
+            expected_model = embedding_model_name()
+        try:
+            manifest = read_manifest(options['directory'], expected_model)
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(f"❌ {e}"))
+            return
+
+        batch_size = max(1, options['batch_size'])
+        total = sum(collection["count"]
+                    for collection in manifest["collections"].values())
+        imported = 0
+        start = time.perf_counter()
+        for columns in iter_snapshot(options['directory'], manifest):
+            for offset in range(0, len(columns["ids"]), batch_size):
+                end = offset + batch_size
+                imported += add_embedded_records(
+                    columns["ids"][offset:end],
+                    columns["documents"][offset:end],
+                    columns["metadatas"][offset:end],
+                    columns["embeddings"][offset:end].tolist(),
+                    replace=options['replace']
+                )
+            self.stdout.write(f"📥 Imported {imported}/{total} records "
+                              f"({imported / (time.perf_counter() - start):.0f}/s)")
+
+        # Passages of one document can sit in different shards: index from the
+        # store once everything is in
+        if get_lexical_index() is not None:
+            call_command('rebuild_lexical_index', stdout=self.stdout)
+        if entity_index_enabled():
+            call_command('build_entity_index', stdout=self.stdout)
+
+        logger.info(f"📥 Imported {imported} records from {options['directory']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported {imported} records from {options['directory']}."
+        ))
@@ -2,14 +2,18 @@
 
 import logging
 import os
-import uuid
+from typing import Any, Dict, List, Tuple
 
 from django.core.management.base import BaseCommand
 
-from documents.chroma_client import store_document_in_chromadb
+from documents.chroma_client import (
+    DEFAULT_STORE_BATCH_SIZE,
+    new_document_id,
+    store_documents_in_chromadb,
+)
 from documents.classifier import predict_document_type
 from documents.extractor import extract_entities
-from documents.ocr import extract_text_from_image
+from documents.ocr import extract_ocr_result
 
 # 🛠️ Logger Setup
 logger = logging.getLogger(__name__)
@@ -22,7 +26,7 @@ class Command(BaseCommand):
     - OCR extraction
     - Document type classification
     - Entity extraction
-    - Store results in ChromaDB
+    - Store results in ChromaDB (embedded and inserted in batches)
     """
 
     help = 'Batch process an entire dataset folder and store results in ChromaDB.'
@@ -36,6 +40,12 @@ class Command(BaseCommand):
             type=str,
             help='Root folder of your document dataset'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_STORE_BATCH_SIZE,
+            help='Documents per embedding/insert batch'
+        )
 
     def handle(self, *args, **options):
         """
@@ -50,7 +60,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"❌ Folder not found: {folder_path}"))
             return
 
+        batch_size = max(1, options.get('batch_size') or DEFAULT_STORE_BATCH_SIZE)
+        pending = []
         total_processed = 0
+        total_failed = 0
 
         # 📂 Loop through dataset folders (each folder = label)
         for label_folder in os.listdir(folder_path):
@@ -70,35 +83,65 @@ class Command(BaseCommand):
 
                     try:
                         # 🖼️ Step 1: OCR
-                        text = extract_text_from_image(file_path)
+                        ocr = extract_ocr_result(file_path)
                         logger.info(f"✅ OCR completed for: {file_path}")
 
-                        # 📑 Step 2: Document Classification
-                        doc_type = predict_document_type(text)
+                        # 📑 Step 2: Document Classification (normalized text)
+                        doc_type = predict_document_type(ocr.text)
                         logger.info(f"📄 Predicted document type: {doc_type}")
 
-                        # 🏷️ Step 3: Entity Extraction
-                        entities = extract_entities(doc_type, text)
+                        # 🏷️ Step 3: Entity Extraction (raw-case text)
+                        entities = extract_entities(doc_type, ocr.raw_text)
                         logger.info(f"📦 Extracted {len(entities)} entity fields.")
 
-                        # 🗃️ Step 4: Store in ChromaDB
-                        doc_id = str(uuid.uuid4())
-                        store_document_in_chromadb(
-                            doc_id=doc_id,
-                            text=text,
-                            document_type=doc_type,
-                            entities=entities
-                        )
-                        logger.info(f"🗄️ Stored document {doc_id} in ChromaDB.")
-
-                        total_processed += 1
+                        # 🗃️ Step 4: Queue for batched storage (normalized text)
+                        pending.append({
+                            "doc_id": new_document_id(ocr.text),
+                            "text": ocr.text,
+                            "document_type": doc_type,
+                            "entities": entities,
+                            "source": file,
+                        })
 
                     except Exception as e:
                         logger.error(f"❌ Failed to process {file_path}: {e}", exc_info=True)
                         self.stdout.write(self.style.ERROR(f"❌ Failed to process {file}: {e}"))
+                        total_failed += 1
+
+                    if len(pending) >= batch_size:
+                        stored, failed = self._flush(pending, batch_size)
+                        total_processed += stored
+                        total_failed += failed
+                        pending = []
+
+        if pending:
+            stored, failed = self._flush(pending, batch_size)
+            total_processed += stored
+            total_failed += failed
 
         # ✅ Summary
         logger.info(f"🎉 Batch processing complete. Total documents processed: {total_processed}")
         self.stdout.write(self.style.SUCCESS(
             f"\n✅ Batch processing complete. Total documents processed: {total_processed}"
         ))
+        if total_failed:
+            self.stdout.write(
+                self.style.WARNING(f"⚠️ {total_failed} documents failed.")
+            )
+
+    def _flush(self, pending: List[Dict[str, Any]], batch_size: int) -> Tuple[int, int]:
+        """
+        🗃️ Store queued documents in bulk and report the ones Chroma rejected.
+
+        Returns:
+            tuple: (stored count, failed count)
+        """
+        failures = store_documents_in_chromadb(pending, batch_size=batch_size)
+        sources = {record["doc_id"]: record["source"] for record in pending}
+        for doc_id, error in failures:
+            self.stdout.write(self.style.ERROR(
+                f"❌ Failed to store {sources.get(doc_id, doc_id)}: {error}"
+            ))
+        logger.info(f"🗄️ Stored {len(pending) - len(failures)}/{len(pending)} "
+                    "documents in ChromaDB.")
+        return len(pending) - len(failures), len(failures)
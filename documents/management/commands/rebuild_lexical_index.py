@@ -0,0 +1,104 @@
+# 🔤 Django Management Command: Rebuild the BM25 Lexical Index
+
+import logging
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Tuple
+
+from django.core.management.base import BaseCommand
+
+from documents.chroma_client import all_collections
+from documents.lexical_index import LEXICAL_INDEX_PATH_ENV, get_lexical_index
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# passage number -> (text, metadata)
+PassageParts = Dict[int, Tuple[str, Dict[str, Any]]]
+
+
+class Command(BaseCommand):
+    """
+    🔤 Custom Django Command:
+    Re-index every stored document into the lexical index at
+    $LEXICAL_INDEX_PATH (for collections stored before it was enabled, or
+    after changes made behind its back), then compact it. Passages of
+    chunked documents are joined back into one entry per document.
+    """
+
+    help = 'Rebuild the BM25 lexical index from the stored documents.'
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Documents read per page')
+        parser.add_argument(
+            '--compact-only', action='store_true',
+            help='Only rewrite the index snapshot (drops replaced and deleted entries)'
+        )
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Clear the index and add every collection page by page.
+        """
+        index = get_lexical_index()
+        if index is None:
+            self.stdout.write(self.style.ERROR(
+                f"❌ ${LEXICAL_INDEX_PATH_ENV} is not set; nothing to do."
+            ))
+            return
+
+        if options['compact_only']:
+            index.compact()
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Compacted lexical index ({index.count()} documents)."
+            ))
+            return
+
+        batch_size = max(1, options['batch_size'])
+        index.clear()
+        passages: DefaultDict[str, PassageParts] = defaultdict(dict)  # by parent id
+        indexed = 0
+        for collection in all_collections():
+            offset = 0
+            while True:
+                page = collection.get(offset=offset, limit=batch_size,
+                                      include=["documents", "metadatas"])
+                ids = page.get("ids") or []
+                if not ids:
+                    break
+                offset += len(ids)
+
+                documents = []
+                for doc_id, text, metadata in zip(ids, page["documents"],
+                                                  page["metadatas"]):
+                    metadata = dict(metadata or {})
+                    parent = metadata.pop("parent_id", None)
+                    number = metadata.pop("passage", 0)
+                    if parent:
+                        passages[parent][int(number)] = (text or "", metadata)
+                    else:
+                        documents.append((doc_id, text or "", metadata))
+                if documents:
+                    index.add(*map(list, zip(*documents)))
+                    indexed += len(documents)
+                    self.stdout.write(f"🔤 Indexed {indexed} documents")
+
+        if passages:
+            parents = list(passages)
+            for start in range(0, len(parents), batch_size):
+                chunk = parents[start:start + batch_size]
+                index.add(
+                    chunk,
+                    [" ".join(passages[p][n][0] for n in sorted(passages[p]))
+                     for p in chunk],
+                    [passages[p][min(passages[p])][1] for p in chunk]
+                )
+            indexed += len(parents)
+
+        index.compact()
+        logger.info(f"🔤 Rebuilt lexical index with {indexed} documents")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Lexical index rebuilt: {indexed} documents."
+        ))
@@ -0,0 +1,89 @@
+# 🔁 Django Management Command: Re-Embed the Collection With Another Model
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.chroma_client import active_collection
+from documents.reembedding import (
+    DEFAULT_EMBED_BATCH_SIZE,
+    DEFAULT_WINDOW_SIZE,
+    reembed_collection,
+)
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    🔁 Custom Django Command:
+    Build a copy of the active collection (partitions included) embedded by
+    another SentenceTransformer model, from the stored texts, then switch
+    every process to it. Interrupted runs resume from their checkpoint;
+    with ``--no-switch`` the copy is built (and can be topped up by running
+    again) without going live.
+    """
+
+    help = ('Re-embed the stored documents with another embedding model and switch '
+            'to the new collection.')
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument(
+            'model', type=str,
+            help='SentenceTransformer model name, e.g. all-mpnet-base-v2'
+        )
+        parser.add_argument(
+            '--collection', type=str, default=None,
+            help='Name of the new collection (default: documents_<model>)'
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_EMBED_BATCH_SIZE,
+                            help='Texts per embedding call (grouped by length)')
+        parser.add_argument(
+            '--window', type=int, default=DEFAULT_WINDOW_SIZE,
+            help='Rows read, sorted by length and checkpointed together'
+        )
+        parser.add_argument(
+            '--no-switch', action='store_true',
+            help='Build the new collection but keep serving the current one'
+        )
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Run (or resume) the migration and report the result.
+        """
+        start = time.perf_counter()
+
+        def progress(name: str, done: int) -> None:
+            self.stdout.write(f"🔁 {name}: {done} rows re-embedded "
+                              f"({done / (time.perf_counter() - start):.0f}/s)")
+
+        try:
+            result = reembed_collection(
+                options['model'],
+                target=options['collection'],
+                batch_size=max(1, options['batch_size']),
+                window=max(1, options['window']),
+                switch=not options['no_switch'],
+                progress=progress
+            )
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(f"❌ {e}"))
+            return
+
+        summary = (f"{result['copied']} rows copied, {result['reconciled']} reconciled "
+                   f"into {result['target']} ({result['embedding_model']})")
+        logger.info(f"🔁 Re-embedding: {summary}")
+        if result['switched']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {summary}; active collection switched from {result['source']}."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {summary}; still serving {active_collection()['collection']} "
+                "(run again without --no-switch)."
+            ))
@@ -0,0 +1,205 @@
+# 🔁 Django Management Command: Re-extract Entities for Stored Documents
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Set, Tuple
+
+from django.core.management.base import BaseCommand
+
+from documents.chroma_client import (
+    flatten_metadata,
+    get_documents_page,
+    get_passages,
+    update_document_metadata,
+)
+from documents.chunking import join_passages, passage_overlap
+from documents.entity_index import mirror_entities
+from documents.extractor import (
+    CATEGORY_PATTERNS,
+    ENTITY_MAPPING,
+    extract_entities_batch,
+)
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+DEFAULT_CURSOR_FILE = ".reextract_cursor.json"
+# (doc_id, metadata, text, row_ids)
+GroupedDocument = Tuple[str, Dict[str, Any], str, List[str]]
+
+
+def _entity_fields() -> Set[str]:
+    """
+    🗂️ Every metadata key the extractor can produce (mapped fields and raw tags).
+    """
+    fields = set(CATEGORY_PATTERNS)
+    for mapping in ENTITY_MAPPING.values():
+        fields.update(mapping.values())
+    return fields
+
+
+def _extract_chunk(documents: List[Tuple[str, str]]) -> List[Dict[str, List[str]]]:
+    """
+    🏷️ Worker: extract entities for a list of ``(document_type, text)`` pairs.
+    """
+    logging.disable(logging.INFO)
+    return extract_entities_batch(documents)
+
+
+def _chunks(items: List[Tuple[str, str]], count: int) -> List[List[Tuple[str, str]]]:
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def group_passages(ids: List[str], metadatas: List[Dict[str, Any]],
+                   texts: List[str]) -> List[GroupedDocument]:
+    """
+    🧵 One ``(doc_id, metadata, text, row_ids)`` per document starting in a page.
+
+    A document stored as passages is rejoined from all of its passages (read
+    by ``parent_id``, so passages on the next page are included) and listed
+    once, at its first passage; its other passages are skipped wherever they
+    appear, and its ``row_ids`` are every passage id.
+    """
+    rows = list(zip(ids, metadatas, texts))
+    passages = get_passages([row_id for row_id, m, _ in rows
+                             if m.get("parent_id") and not m.get("passage")])
+    documents: List[GroupedDocument] = []
+    for row_id, metadata, text in rows:
+        parent = metadata.get("parent_id")
+        if not parent:
+            documents.append((row_id, metadata, text, [row_id]))
+        elif not metadata.get("passage"):
+            stored = passages.get(parent) or [(row_id, text, metadata)]
+            text = join_passages([passage_text for _, passage_text, _ in stored],
+                                 passage_overlap())
+            documents.append((parent, metadata, text,
+                              [passage_row for passage_row, _, _ in stored]))
+    return documents
+
+
+def build_metadata_update(old_metadata: Dict[str, Any], entities: Dict[str, List[str]],
+                          entity_fields: Set[str]) -> Dict[str, Any]:
+    """
+    ✏️ New metadata for one document: fresh entity fields, stale entity
+    fields cleared (``None``), other keys (e.g. card fields) left alone.
+    """
+    document_type = old_metadata.get("document_type", "")
+    metadata = flatten_metadata(document_type, entities)
+    for key in old_metadata:
+        if key in entity_fields and key not in metadata:
+            metadata[key] = None
+    return metadata
+
+
+class Command(BaseCommand):
+    """
+    🔁 Custom Django Command:
+    Re-run entity extraction on the text already stored in the ``documents``
+    collection and rewrite the flattened entity metadata, without OCR.
+
+    Pages are read with ``get(offset, limit)``, extracted in a process pool
+    and written back with one ``update`` per page. A document stored as
+    passages is extracted once from its rejoined text and every passage gets
+    the same metadata. The offset of the next page is saved to a cursor file
+    after each page, so an interrupted run resumes where it stopped.
+    """
+
+    help = ('Re-extract entities for all stored documents and update their metadata '
+            'in ChromaDB.')
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Documents per page/update call')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Extraction processes (1 = run in this process)')
+        parser.add_argument('--cursor-file', type=str, default=DEFAULT_CURSOR_FILE,
+                            help='Progress file used to resume an interrupted run')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore an existing cursor and start from 0')
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Page through the collection, re-extract, update.
+        """
+        batch_size = max(1, options['batch_size'])
+        workers = max(1, options['workers'])
+        cursor_file = options['cursor_file']
+
+        offset = 0 if options['restart'] else self._read_cursor(cursor_file)
+        if offset:
+            self.stdout.write(f"↪️ Resuming from document {offset}")
+
+        entity_fields = _entity_fields()
+        updated = 0
+        start = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while True:
+                page = get_documents_page(offset, batch_size)
+                ids = page.get("ids") or []
+                if not ids:
+                    break
+
+                metadatas = [m or {} for m in page.get("metadatas") or [{}] * len(ids)]
+                texts = [t or "" for t in page.get("documents") or [""] * len(ids)]
+                grouped = group_passages(ids, metadatas, texts)
+                documents = [(m.get("document_type", ""), t) for _, m, t, _ in grouped]
+
+                if pool is not None:
+                    chunks = pool.map(_extract_chunk, _chunks(documents, workers))
+                    entities = [e for chunk in chunks for e in chunk]
+                else:
+                    entities = extract_entities_batch(documents)
+
+                row_ids: List[str] = []
+                row_metadatas: List[Dict[str, Any]] = []
+                for (_, metadata, _, passage_ids), e in zip(grouped, entities):
+                    update = build_metadata_update(metadata, e, entity_fields)
+                    row_ids.extend(passage_ids)
+                    row_metadatas.extend(dict(update) for _ in passage_ids)
+                update_document_metadata(row_ids, row_metadatas)
+                # Indexed under the document id, never a passage id (as
+                # build_entity_index does)
+                mirror_entities((doc_id, doc_type, e) for (doc_id, *_), (doc_type, _), e
+                                in zip(grouped, documents, entities))
+
+                offset += len(ids)
+                updated += len(grouped)
+                self._write_cursor(cursor_file, offset)
+                rate = updated / (time.perf_counter() - start)
+                self.stdout.write(f"📄 Re-extracted {updated} documents "
+                                  f"({offset} rows read, {rate:.0f}/s)")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if os.path.exists(cursor_file):
+            os.remove(cursor_file)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Updated entity metadata for {updated} documents."
+        ))
+
+    @staticmethod
+    def _read_cursor(path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return int(json.load(f)["offset"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable cursor file {path}: {e}")
+            return 0
+
+    @staticmethod
+    def _write_cursor(path: str, offset: int) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"offset": offset}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,52 @@
+# 🗂️ Django Management Command: Move Documents Into Per-Type Collections
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from documents.chroma_client import (
+    CHROMA_PARTITION_KEY_ENV,
+    DEFAULT_STORE_BATCH_SIZE,
+    get_partition_key,
+    list_partitions,
+    repartition_documents,
+)
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    🗂️ Custom Django Command:
+    Move stored documents into the collection partition their
+    $CHROMA_PARTITION_KEY value routes to. Run it once after enabling the
+    partitioned layout on an existing ``documents`` collection (safe to repeat).
+    """
+
+    help = 'Move documents into per-partition collections ($CHROMA_PARTITION_KEY).'
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_STORE_BATCH_SIZE,
+                            help='Documents read and moved per call')
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Repartition and report the resulting partitions.
+        """
+        key = get_partition_key()
+        if key is None:
+            self.stdout.write(self.style.ERROR(
+                f"❌ ${CHROMA_PARTITION_KEY_ENV} is not set; nothing to do."
+            ))
+            return
+
+        moved = repartition_documents(batch_size=max(1, options['batch_size']))
+        partitions = list_partitions()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Moved {moved} documents; {len(partitions)} partitions by '{key}': "
+            f"{', '.join(partitions)}"
+        ))
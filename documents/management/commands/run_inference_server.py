@@ -0,0 +1,88 @@
+# 🛰️ Django Management Command: Run the Shared Inference Server
+
+import logging
+import signal
+import threading
+from types import FrameType
+from typing import Optional
+
+from django.core.management.base import BaseCommand
+
+from documents.chroma_client import embedding_model_name
+from documents.classifier import DEFAULT_MODEL_PATH
+from documents.inference import (
+    InferenceServer,
+    build_default_handlers,
+    get_inference_socket,
+)
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    🛰️ Custom Django Command:
+    Host the document classifier and the embedding model in one process and
+    serve micro-batched `classify` / `embed` requests over a Unix socket.
+
+    Point workers at it with the INFERENCE_SOCKET environment variable.
+    """
+
+    help = 'Run the shared classifier/embedding inference server on a Unix socket.'
+
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument(
+            '--socket',
+            type=str,
+            default=get_inference_socket() or '/tmp/doc_processor_inference.sock',
+            help='Unix socket path (defaults to $INFERENCE_SOCKET)'
+        )
+        parser.add_argument('--model-path', type=str, default=DEFAULT_MODEL_PATH,
+                            help='Classifier model file')
+        parser.add_argument(
+            '--embedding-model', type=str, default=None,
+            help='SentenceTransformer model (defaults to the active collection\'s)'
+        )
+        parser.add_argument('--max-batch-size', type=int, default=32,
+                            help='Largest micro-batch per model call')
+        parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                            help='Max time a request waits for batch-mates')
+
+    def handle(self, *args, **options):
+        """
+        ⚙️ Load models once, then serve until interrupted.
+        """
+        socket_path = options['socket']
+
+        logger.info("🚀 Starting inference server...")
+        embedding_model = options['embedding_model'] or embedding_model_name()
+        handlers = build_default_handlers(options['model_path'], embedding_model)
+        server = InferenceServer(
+            socket_path,
+            handlers,
+            max_batch_size=options['max_batch_size'],
+            max_wait_ms=options['max_wait_ms'],
+            embedding_model=embedding_model,
+        )
+
+        def _stop(signum: int, frame: Optional[FrameType]) -> None:
+            # stop_serving() blocks until serve_forever returns, so call it off-thread
+            threading.Thread(target=server.stop_serving, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, _stop)
+        self.stdout.write(self.style.SUCCESS(
+            f"🛰️ Inference server listening on {socket_path}"
+        ))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        # Answer the requests already accepted before the socket goes away
+        server.close()
+
+        self.stdout.write(self.style.SUCCESS("✅ Inference server stopped."))
@@ -1,10 +1,16 @@
 # 🤖 Django Management Command: Train Document Classifier
 
 import logging
+from typing import Any, Dict, List
 
 from django.core.management.base import BaseCommand
 
-from documents.classifier import train_and_save_model
+from documents.classifier import (
+    CASCADE_MARGIN,
+    CASCADE_PREFIX_CHARS,
+    search_and_save_model,
+    train_and_save_model,
+)
 
 # 🛠️ Logger Setup
 logger = logging.getLogger(__name__)
@@ -18,6 +24,31 @@ class Command(BaseCommand):
 
     help = "Train the document classifier using OCR-extracted text."
 
+    def add_arguments(self, parser):
+        """
+        ➕ Define CLI arguments for the command.
+        """
+        parser.add_argument(
+            '--cascade',
+            action='store_true',
+            help='Save a two-stage cascade (prefix keyword model + full model)'
+        )
+        parser.add_argument('--prefix-chars', type=int, default=CASCADE_PREFIX_CHARS,
+                            help='Cascade stage-1 prefix length')
+        parser.add_argument('--margin', type=float, default=CASCADE_MARGIN,
+                            help='Cascade stage-1 confidence margin')
+        parser.add_argument(
+            '--search',
+            action='store_true',
+            help=('Cross-validated grid search; keep the fastest model within '
+                  '--tolerance of the best accuracy')
+        )
+        parser.add_argument('--n-jobs', type=int, default=-1,
+                            help='Parallel cross-validation workers (-1 = all cores)')
+        parser.add_argument('--cv', type=int, default=5, help='Cross-validation folds')
+        parser.add_argument('--tolerance', type=float, default=0.01,
+                            help='Allowed accuracy drop for a faster model')
+
     def handle(self, *args, **kwargs):
         """
         ⚙️ Main command execution.
@@ -25,8 +56,23 @@ class Command(BaseCommand):
         logger.info("🚀 Starting document classifier training...")
 
         try:
+            if kwargs.get('search'):
+                # 🔎 Latency-aware model selection
+                candidates = search_and_save_model(n_jobs=kwargs['n_jobs'],
+                                                   cv=kwargs['cv'],
+                                                   tolerance=kwargs['tolerance'])
+                self._print_candidates(candidates)
+                self.stdout.write(
+                    self.style.SUCCESS("✅ Model search completed successfully.")
+                )
+                return
+
             # 🤖 Train Model
-            train_and_save_model()
+            train_and_save_model(
+                cascade=kwargs.get('cascade', False),
+                prefix_chars=kwargs.get('prefix_chars', CASCADE_PREFIX_CHARS),
+                margin=kwargs.get('margin', CASCADE_MARGIN),
+            )
 
             # ✅ Success
             logger.info("🎉 Document classifier training completed successfully.")
@@ -36,3 +82,15 @@ class Command(BaseCommand):
             # ❌ Failure
             logger.error(f"❌ Error during classifier training: {e}", exc_info=True)
             self.stdout.write(self.style.ERROR(f"❌ Training failed: {e}"))
+
+    def _print_candidates(self, candidates: List[Dict[str, Any]]) -> None:
+        """
+        📊 Print accuracy / latency / size for every searched candidate.
+        """
+        self.stdout.write(f"\n{'':2}{'cv acc':>8}{'ms/doc':>9}{'KiB':>9}  params")
+        for c in candidates:
+            marker = '🏆' if c['selected'] else '  '
+            self.stdout.write(
+                f"{marker}{c['accuracy']:>8.3f}{c['latency_ms']:>9.2f}"
+                f"{c['size_bytes'] / 1024:>9.0f}  {c['params']}"
+            )
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexedDocument',
+            fields=[
+                ('id', models.CharField(max_length=128, primary_key=True, serialize=False)),
+                ('document_type', models.CharField(db_index=True, max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EntityValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=64)),
+                ('value', models.CharField(max_length=255)),
+                ('normalized', models.CharField(max_length=255)),
+                ('document', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='entities', to='documents.indexeddocument')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EntityCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(max_length=64)),
+                ('field', models.CharField(max_length=64)),
+                ('normalized', models.CharField(max_length=255)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['document_type', 'field', '-count'], name='entity_count_top_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='entitycount',
+            constraint=models.UniqueConstraint(fields=('document_type', 'field', 'normalized'), name='entity_count_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='entityvalue',
+            index=models.Index(fields=['normalized', 'field', 'document'], name='entity_value_field_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='entityvalue',
+            constraint=models.UniqueConstraint(fields=('document', 'field', 'normalized'), name='entity_unique_value'),
+        ),
+    ]
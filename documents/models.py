@@ -0,0 +1,92 @@
+# 🗂️ Entity Index Models
+# Chroma keeps entities as comma-joined metadata strings, which can only be
+# matched whole. These tables hold one row per (document, field, value) plus
+# running counts per value, so entity lookups and facet counts are indexed
+# SQL queries (see entity_index.py).
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db import models
+
+
+class IndexedDocument(models.Model):
+    """
+    📄 A stored document known to the entity index (id as in the vector store).
+    """
+
+    id: models.CharField[str, str] = models.CharField(primary_key=True, max_length=128)
+    document_type: models.CharField[str, str] = models.CharField(
+        max_length=64, db_index=True
+    )
+    updated_at: models.DateTimeField[datetime, datetime] = models.DateTimeField(
+        auto_now=True
+    )
+
+    def __str__(self) -> str:
+        return f"{self.id} ({self.document_type})"
+
+
+class EntityValue(models.Model):
+    """
+    🏷️ One entity value of a document: ``value`` as extracted, ``normalized``
+    (casefolded, whitespace collapsed) for matching and grouping. The
+    document type is stored as one more field, ``document_type``, so every
+    filter is a lookup in the same index.
+    """
+
+    # Indexed by the unique constraint, whose first column it is
+    document: models.ForeignKey[IndexedDocument, IndexedDocument] = models.ForeignKey(
+        IndexedDocument, on_delete=models.CASCADE, related_name="entities",
+        db_index=False
+    )
+    document_id: str
+    field: models.CharField[str, str] = models.CharField(max_length=64)
+    value: models.CharField[str, str] = models.CharField(max_length=255)
+    normalized: models.CharField[str, str] = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            # Lookups: WHERE normalized IN (...) AND field = ?, in document order.
+            # Not led by field, so SQLite never prefers it to the (document, field)
+            # unique index when counting the entities of a filtered set of
+            # documents.
+            models.Index(fields=["normalized", "field", "document"],
+                         name="entity_value_field_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["document", "field", "normalized"],
+                                    name="entity_unique_value"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.document_id}: {self.field}={self.value}"
+
+
+class EntityCount(models.Model):
+    """
+    📊 Number of documents having ``field`` = ``normalized``, per document
+    type (``document_type=""`` counts all types). Kept up to date by the
+    entity index writes, so facet counts are index range scans.
+    """
+
+    document_type: models.CharField[str, str] = models.CharField(max_length=64)
+    field: models.CharField[str, str] = models.CharField(max_length=64)
+    normalized: models.CharField[str, str] = models.CharField(max_length=255)
+    # First extracted spelling
+    value: models.CharField[str, str] = models.CharField(max_length=255)
+    count: models.IntegerField[int, int] = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["document_type", "field", "-count"],
+                         name="entity_count_top_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["document_type", "field", "normalized"],
+                                    name="entity_count_unique"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.document_type or '*'}: {self.field}={self.value} ({self.count})"
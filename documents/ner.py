@@ -0,0 +1,268 @@
+# 🤗 Optional NER Backend (batched, lazily loaded)
+# Runs a token-classification model over word windows of many documents at
+# once and caches results by text hash. Disabled unless NER_BACKEND is set.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from documents.cache import LRUCache, text_hash
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+NER_BACKEND_ENV = "NER_BACKEND"            # "" (off) | "transformers" | "fake"
+NER_MODEL_ENV = "NER_MODEL"
+NER_RUNTIME_ENV = "NER_RUNTIME"            # "torch" | "int8" | "onnx"
+NER_FAKE_ENTITIES_ENV = "NER_FAKE_ENTITIES"  # JSON file {"Acme Corp": "ORG", ...}
+DEFAULT_NER_MODEL = "dslim/bert-base-NER"
+
+NERSpan = Tuple[str, str]  # (raw tag, text)
+
+_TAG_ALIASES = {"PER": "PER", "PERSON": "PER", "ORG": "ORG", "LOC": "LOC", "GPE": "LOC",
+                "MISC": "MISC"}
+
+
+class NERBackend(ABC):
+    """
+    🧩 Interface: tag a batch of text windows.
+    """
+
+    @abstractmethod
+    def predict_windows(self, windows: List[str]) -> List[List[NERSpan]]:
+        """
+        Returns:
+            list: For each window, ``(tag, text)`` spans with tags PER/ORG/LOC/MISC.
+        """
+        raise NotImplementedError
+
+
+class FakeNERBackend(NERBackend):
+    """
+    🧪 Offline stand-in: tags known phrases (case-insensitive) found in each window.
+
+    Args:
+        entities (dict): Phrase -> raw tag, e.g. ``{"Acme Corp": "ORG"}``.
+    """
+
+    def __init__(self, entities: Dict[str, str]) -> None:
+        self.entities = entities
+        self.calls: List[int] = []  # batch sizes, for tests
+
+    def predict_windows(self, windows: List[str]) -> List[List[NERSpan]]:
+        self.calls.append(len(windows))
+        results = []
+        for window in windows:
+            lowered = window.lower()
+            results.append([(tag, phrase) for phrase, tag in self.entities.items()
+                            if phrase.lower() in lowered])
+        return results
+
+
+class TransformersNERBackend(NERBackend):
+    """
+    🤗 HuggingFace token-classification model on CPU, loaded on first use.
+
+    Args:
+        model_name (str): Model id or local path.
+        runtime (str): ``"torch"``, ``"int8"`` (dynamic int8 quantization of
+            Linear layers) or ``"onnx"`` (ONNX Runtime via ``optimum``).
+        batch_size (int): Windows per forward pass.
+        min_score (float): Drop spans scored below this.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_NER_MODEL, runtime: str = "torch",
+                 batch_size: int = 16, min_score: float = 0.6) -> None:
+        self.model_name = model_name
+        self.runtime = runtime
+        self.batch_size = batch_size
+        self.min_score = min_score
+        self._pipeline: Any = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        from transformers import (
+            AutoModelForTokenClassification,
+            AutoTokenizer,
+            pipeline,
+        )
+
+        logger.info(f"🤗 Loading NER model {self.model_name} (runtime: {self.runtime})")
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+
+        if self.runtime == "onnx":
+            from optimum.onnxruntime import ORTModelForTokenClassification
+
+            model = ORTModelForTokenClassification.from_pretrained(
+                self.model_name, export=True
+            )
+        else:
+            model = AutoModelForTokenClassification.from_pretrained(self.model_name)
+            if self.runtime == "int8":
+                import torch
+
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+
+        return pipeline("token-classification", model=model, tokenizer=tokenizer,
+                        aggregation_strategy="simple", device=-1)
+
+    def predict_windows(self, windows: List[str]) -> List[List[NERSpan]]:
+        if self._pipeline is None:
+            with self._lock:
+                if self._pipeline is None:
+                    self._pipeline = self._load()
+
+        outputs = self._pipeline(windows, batch_size=self.batch_size)
+        results: List[List[NERSpan]] = []
+        for spans in outputs:
+            window_spans: List[NERSpan] = []
+            for span in spans:
+                tag = _TAG_ALIASES.get(str(span.get("entity_group", "")).upper())
+                if tag and float(span.get("score", 0.0)) >= self.min_score:
+                    window_spans.append((tag, str(span["word"]).strip()))
+            results.append(window_spans)
+        return results
+
+
+def split_windows(text: str, window_words: int = 128, stride: int = 32) -> List[str]:
+    """
+    🪟 Split text into overlapping windows of whitespace tokens.
+
+    Windows stay well under the model's max sequence length; the overlap
+    keeps entities on a boundary whole in at least one window.
+    """
+    words = text.split()
+    if len(words) <= window_words:
+        return [" ".join(words)] if words else []
+    step = max(1, window_words - stride)
+    return [" ".join(words[i:i + window_words])
+            for i in range(0, len(words) - stride, step)]
+
+
+class NERExtractor:
+    """
+    🏷️ Batch documents through a ``NERBackend`` with a result cache.
+
+    Windows of all uncached documents are pooled and sent to the backend in
+    ``batch_size`` chunks, so several short documents share one forward pass.
+
+    Args:
+        backend (NERBackend): Tagging backend.
+        batch_size (int): Windows per backend call.
+        window_words (int): Tokens per window.
+        stride (int): Overlapping tokens between consecutive windows.
+        cache_size (int): Cached documents (0 disables).
+    """
+
+    def __init__(self, backend: NERBackend, batch_size: int = 16,
+                 window_words: int = 128, stride: int = 32,
+                 cache_size: int = 1024) -> None:
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.window_words = window_words
+        self.stride = stride
+        self.cache: LRUCache[Dict[str, List[str]]] = LRUCache(cache_size)
+
+    def extract_batch(self, texts: Sequence[str]) -> List[Dict[str, List[str]]]:
+        """
+        🏷️ Tag many documents.
+
+        Returns:
+            list: For each text, raw tag -> unique entity strings (first-seen order).
+        """
+        results: List[Optional[Dict[str, List[str]]]] = [None] * len(texts)
+        keys = [text_hash(text) for text in texts]
+
+        windows: List[str] = []
+        owners: List[int] = []
+        uncached: List[int] = []
+        for i, (text, key) in enumerate(zip(texts, keys)):
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = cached
+                continue
+            results[i] = {}
+            uncached.append(i)
+            for window in split_windows(text, self.window_words, self.stride):
+                windows.append(window)
+                owners.append(i)
+
+        for start in range(0, len(windows), self.batch_size):
+            chunk = windows[start:start + self.batch_size]
+            for owner, spans in zip(owners[start:start + self.batch_size],
+                                    self.backend.predict_windows(chunk)):
+                found = results[owner]
+                assert found is not None
+                for tag, value in spans:
+                    values = found.setdefault(tag, [])
+                    if value and value not in values:
+                        values.append(value)
+
+        for i in uncached:
+            self.cache.put(keys[i], results[i] or {})
+
+        return [result or {} for result in results]
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        return self.extract_batch([text])[0]
+
+
+# 🔁 Process-wide extractor (created lazily from the environment)
+_ner_extractor: Optional[NERExtractor] = None
+_ner_configured = False
+_ner_lock = threading.Lock()
+
+
+def _build_backend(name: str) -> Optional[NERBackend]:
+    if name == "fake":
+        path = os.environ.get(NER_FAKE_ENTITIES_ENV)
+        entities: Dict[str, str] = {}
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                entities = json.load(f)
+        return FakeNERBackend(entities)
+    if name == "transformers":
+        return TransformersNERBackend(
+            model_name=os.environ.get(NER_MODEL_ENV, DEFAULT_NER_MODEL),
+            runtime=os.environ.get(NER_RUNTIME_ENV, "torch"),
+        )
+    logger.warning(f"⚠️ Unknown NER backend '{name}', NER disabled.")
+    return None
+
+
+def get_ner_extractor() -> Optional[NERExtractor]:
+    """
+    🤗 Return the configured NER extractor, or None when $NER_BACKEND is unset.
+
+    Creating the extractor is cheap; the model itself loads on the first
+    document that needs tagging.
+    """
+    global _ner_extractor, _ner_configured
+    if _ner_configured:
+        return _ner_extractor
+
+    with _ner_lock:
+        if not _ner_configured:
+            name = os.environ.get(NER_BACKEND_ENV, "").strip().lower()
+            backend = _build_backend(name) if name else None
+            _ner_extractor = NERExtractor(backend) if backend is not None else None
+            _ner_configured = True
+    return _ner_extractor
+
+
+def reset_ner_extractor() -> None:
+    """
+    🔄 Drop the configured extractor (re-read from the environment on next use).
+    """
+    global _ner_extractor, _ner_configured
+    with _ner_lock:
+        _ner_extractor = None
+        _ner_configured = False
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
 
 import pytesseract
 from PIL import Image, ImageEnhance, ImageFilter
@@ -15,6 +15,27 @@ logger = logging.getLogger(__name__)
 # 🖼️ OCR Text Extraction with Caching (Improved)
 
 
+class OCRResult(NamedTuple):
+    """
+    📄 Both forms of one OCR pass.
+
+    ``raw_text`` keeps Tesseract's casing and line breaks (entity patterns
+    rely on capitalization); ``text`` is ``clean_text(raw_text)`` for
+    classification, embedding and storage.
+    """
+    raw_text: str
+    text: str
+
+
+def _cache_paths(image_path: str, cache_dir: Optional[str]) -> Tuple[str, str]:
+    if cache_dir is None:
+        cache_dir = os.environ.get('OCR_CACHE_DIR', '/app/ocr-cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    filename = os.path.basename(image_path)
+    return (os.path.join(cache_dir, filename + ".txt"),
+            os.path.join(cache_dir, filename + ".raw.txt"))
+
+
 def extract_text_from_image(image_path: str, cache_dir: Optional[str] = None, debug_dir: Optional[str] = None) -> str:
     """
     🖼️ Extract text from an image using Tesseract OCR (with caching and enhanced preprocessing).
@@ -32,18 +53,50 @@ def extract_text_from_image(image_path: str, cache_dir: Optional[str] = None, de
         logger.error(f"❌ Image not found: {image_path}")
         raise FileNotFoundError(f"Image not found: {image_path}")
 
-    if cache_dir is None:
-        cache_dir = os.environ.get('OCR_CACHE_DIR', '/app/ocr-cache')
-    os.makedirs(cache_dir, exist_ok=True)
-    filename = os.path.basename(image_path)
-    cache_path = os.path.join(cache_dir, filename + ".txt")
+    cache_path, _ = _cache_paths(image_path, cache_dir)
 
-    # Return cached text if exists
+    # Return cached text if exists (older caches hold only the cleaned text)
     if os.path.exists(cache_path):
-        logger.info(f"⚡ OCR cache hit for: {filename}")
+        logger.info(f"⚡ OCR cache hit for: {os.path.basename(image_path)}")
         with open(cache_path, "r", encoding="utf-8") as f:
             return f.read()
 
+    return extract_ocr_result(image_path, cache_dir=cache_dir, debug_dir=debug_dir).text
+
+
+def extract_ocr_result(image_path: str, cache_dir: Optional[str] = None,
+                       debug_dir: Optional[str] = None) -> OCRResult:
+    """
+    🖼️ Run OCR once and return (and cache) both raw-case and cleaned text.
+
+    The cleaned text is cached as ``<image>.txt`` (as before) and the raw text
+    next to it as ``<image>.raw.txt``. Cache entries written before raw text
+    was kept are refreshed by one OCR run.
+
+    Args:
+        image_path (str): Full path to the image file.
+        cache_dir (str): Directory to store cached OCR results.
+        debug_dir (str|None): If provided, saves preprocessed images for debugging.
+
+    Returns:
+        OCRResult: ``raw_text`` for entity extraction, ``text`` for the rest.
+    """
+    # Validate Image Path
+    if not os.path.exists(image_path):
+        logger.error(f"❌ Image not found: {image_path}")
+        raise FileNotFoundError(f"Image not found: {image_path}")
+
+    filename = os.path.basename(image_path)
+    cache_path, raw_cache_path = _cache_paths(image_path, cache_dir)
+
+    # Return cached text if both forms exist
+    if os.path.exists(cache_path) and os.path.exists(raw_cache_path):
+        logger.info(f"⚡ OCR cache hit for: {filename}")
+        with open(raw_cache_path, "r", encoding="utf-8") as f:
+            raw_text = f.read()
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return OCRResult(raw_text=raw_text, text=f.read())
+
     logger.info(f"⏳ OCR cache miss. Processing image: {image_path}")
 
     # Read and preprocess image with Pillow
@@ -79,9 +132,12 @@ def extract_text_from_image(image_path: str, cache_dir: Optional[str] = None, de
     # Clean OCR text
     cleaned_text = clean_text(raw_text)
 
-    # Cache result
+    # Cache result (raw first: the cleaned file marks a complete entry for
+    # extract_text_from_image)
+    with open(raw_cache_path, "w", encoding="utf-8") as f:
+        f.write(raw_text)
     with open(cache_path, "w", encoding="utf-8") as f:
         f.write(cleaned_text)
 
     logger.info(f"✅ OCR completed and cached for: {filename}")
-    return cleaned_text
+    return OCRResult(raw_text=raw_text, text=cleaned_text)
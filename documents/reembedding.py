@@ -0,0 +1,213 @@
+# 🔁 Re-Embedding Migration
+# Builds a copy of the active collection (and its partitions) whose vectors
+# come from another embedding model, from the stored texts: nothing is OCR'd
+# again. Rows are read in windows, sorted by text length and embedded in
+# batches of similar lengths (little padding per batch), and progress is
+# checkpointed per window so an interrupted run resumes where it stopped.
+# When the copy is complete, the active collection pointer is switched.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from documents.chroma_client import (
+    COLLECTION_NAME,
+    PARTITION_SEPARATOR,
+    activate_collection,
+    active_collection,
+    build_embedding_function,
+    get_client,
+    get_embedding_function,
+    store_path,
+)
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Defaults
+DEFAULT_EMBED_BATCH_SIZE = 64
+DEFAULT_WINDOW_SIZE = 4096
+CHECKPOINT_PREFIX = "reembed-"
+
+ProgressCallback = Callable[[str, int], None]  # (source collection, rows done in it)
+
+
+def default_target_name(model_name: str) -> str:
+    """
+    🏷️ Collection name for a copy embedded by ``model_name`` (e.g.
+    ``documents_all-mpnet-base-v2``).
+    """
+    slug = re.sub(r"[^A-Za-z0-9.-]+", "-", model_name).strip(".-") or "model"
+    return f"{COLLECTION_NAME}_{slug}"[:200]
+
+
+def checkpoint_path(target: str) -> str:
+    """
+    📍 Checkpoint file of a migration into ``target`` (in the store directory).
+    """
+    return os.path.join(store_path(), f"{CHECKPOINT_PREFIX}{target}.json")
+
+
+def _load_checkpoint(path: str, source: str, target: str,
+                     model_name: str) -> Dict[str, Any]:
+    fresh = {"source": source, "target": target, "embedding_model": model_name,
+             "offsets": {}, "complete": False}
+    if not os.path.exists(path):
+        return fresh
+    with open(path, encoding="utf-8") as f:
+        checkpoint: Dict[str, Any] = json.load(f)
+    keys = ("source", "target", "embedding_model")
+    if any(checkpoint.get(k) != fresh[k] for k in keys):
+        raise ValueError(f"Checkpoint {path} is for {checkpoint.get('source')} -> "
+                         f"{checkpoint.get('target')} "
+                         f"({checkpoint.get('embedding_model')}); "
+                         "remove it to start over")
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path)
+
+
+def _source_names(base: str) -> List[str]:
+    """
+    📚 The collection ``base`` and its partitions, as they exist in the store.
+    """
+    prefix = base + PARTITION_SEPARATOR
+    return sorted(str(name) for name in get_client().list_collections()
+                  if str(name) == base or str(name).startswith(prefix))
+
+
+def embed_sorted(texts: List[str], embed: Callable[[List[str]], Any],
+                 batch_size: int) -> List[List[float]]:
+    """
+    📏 Embed ``texts`` in batches of similar length (shortest first), in input order.
+
+    Batches are padded to their longest text, so grouping by length wastes
+    far fewer tokens than embedding in storage order.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    vectors: List[List[float]] = [[] for _ in texts]
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        for i, vector in zip(chunk, embed([texts[i] for i in chunk])):
+            vectors[i] = [float(x) for x in vector]
+    return vectors
+
+
+def _copy_rows(source: Any, target: Any, ids: List[str],
+               embed: Callable[[List[str]], Any], batch_size: int) -> None:
+    page = source.get(ids=ids, include=["documents", "metadatas"])
+    texts = [text or "" for text in page["documents"]]
+    target.upsert(ids=page["ids"], documents=texts, metadatas=page["metadatas"],
+                  embeddings=embed_sorted(texts, embed, batch_size))
+
+
+def _all_ids(collection: Any, page_size: int) -> Set[str]:
+    ids: Set[str] = set()
+    offset = 0
+    while True:
+        page = collection.get(offset=offset, limit=page_size, include=[])
+        if not page.get("ids"):
+            return ids
+        ids.update(page["ids"])
+        offset += len(page["ids"])
+
+
+def reembed_collection(model_name: str, target: Optional[str] = None,
+                       batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+                       window: int = DEFAULT_WINDOW_SIZE, switch: bool = True,
+                       progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    🔁 Copy the active collection into ``target``, embedding the stored texts
+    with ``model_name``.
+
+    Each source collection (the active one and its partitions, mapped to
+    ``target`` and ``target__<partition>``) is read ``window`` rows at a
+    time; rows are embedded ``batch_size`` at a time in length order and
+    upserted, then the checkpoint records the offset. A final pass copies
+    rows stored since they were read and drops rows deleted since, so the
+    source can keep serving writes during the copy. Then, unless
+    ``switch`` is False, the active collection pointer moves to ``target``
+    (the source is kept, for rollback).
+
+    Args:
+        model_name (str): SentenceTransformer model for the new vectors.
+        target (str, optional): New collection name (default: from the model name).
+        batch_size (int): Texts per embedding call.
+        window (int): Rows read and sorted by length together.
+        switch (bool): Activate ``target`` when the copy is complete.
+        progress (callable, optional): Called with (source collection, rows
+            done) after each window.
+
+    Returns:
+        dict: ``source``, ``target``, ``embedding_model``, ``copied`` rows,
+        ``reconciled`` rows (copied or removed in the final pass), ``switched``.
+
+    Raises:
+        ValueError: ``target`` is the active collection or contains the
+            partition separator, or a checkpoint for a different migration exists.
+    """
+    source_base = active_collection()["collection"]
+    target = target or default_target_name(model_name)
+    if target == source_base or PARTITION_SEPARATOR in target:
+        raise ValueError(f"Invalid target collection: {target}")
+
+    path = checkpoint_path(target)
+    checkpoint = _load_checkpoint(path, source_base, target, model_name)
+    embed = build_embedding_function(model_name)
+    source_embedding = get_embedding_function()
+    client = get_client()
+
+    copied = 0
+    reconciled = 0
+    for name in _source_names(source_base):
+        source = client.get_or_create_collection(name=name,
+                                                 embedding_function=source_embedding)
+        destination = client.get_or_create_collection(
+            name=target + name[len(source_base):], embedding_function=embed
+        )
+        offset = checkpoint["offsets"].get(name, 0)
+        while not checkpoint["complete"]:
+            page = source.get(offset=offset, limit=window,
+                              include=["documents", "metadatas"])
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            texts = [text or "" for text in page["documents"]]
+            destination.upsert(ids=ids, documents=texts, metadatas=page["metadatas"],
+                               embeddings=embed_sorted(texts, embed, batch_size))
+            offset += len(ids)
+            copied += len(ids)
+            checkpoint["offsets"][name] = offset
+            _save_checkpoint(path, checkpoint)
+            if progress is not None:
+                progress(name, offset)
+
+        # Offsets shift when the source changes under us: settle the difference by id
+        source_ids = _all_ids(source, window)
+        target_ids = _all_ids(destination, window)
+        missing = sorted(source_ids - target_ids)
+        for start in range(0, len(missing), window):
+            _copy_rows(source, destination, missing[start:start + window], embed,
+                       batch_size)
+        stale = sorted(target_ids - source_ids)
+        if stale:
+            destination.delete(ids=stale)
+        reconciled += len(missing) + len(stale)
+
+    checkpoint["complete"] = True
+    _save_checkpoint(path, checkpoint)
+    if switch:
+        activate_collection(target, model_name)
+        os.remove(path)
+        logger.info(f"🔀 Switched from {source_base} to {target} ({model_name})")
+    return {"source": source_base, "target": target, "embedding_model": model_name,
+            "copied": copied, "reconciled": reconciled, "switched": switch}
@@ -0,0 +1,297 @@
+# 🔎 Similarity Search with Metadata Filters
+# Backs /api/search/: embeds the query, restricts the nearest-neighbour query
+# with a Chroma `where` filter and caches result lists for a short TTL.
+# With the BM25 index enabled ($LEXICAL_INDEX_PATH), vector and lexical
+# rankings are fused by reciprocal rank, and identifier-only queries skip
+# the embedding altogether.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from documents.cache import LRUCache
+from documents.chroma_client import (
+    embed_texts,
+    entity_metadata,
+    get_documents,
+    search_by_embedding,
+)
+from documents.entity_index import entity_index_enabled, find_documents
+from documents.extractor import CATEGORY_PATTERNS, ENTITY_MAPPING
+from documents.lexical_index import (
+    get_lexical_index,
+    is_identifier_query,
+    reciprocal_rank_fusion,
+)
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+SEARCH_CACHE_TTL_ENV = "SEARCH_CACHE_TTL"
+DEFAULT_SEARCH_CACHE_TTL = 30.0
+SEARCH_CACHE_SIZE = 1024
+MAX_TOP_K = 100
+MAX_SEARCH_RESULTS = 500  # top_k * page
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+
+SearchHit = Dict[str, Any]
+
+_results_cache: LRUCache[List[SearchHit]] = LRUCache(
+    SEARCH_CACHE_SIZE,
+    ttl=float(os.environ.get(SEARCH_CACHE_TTL_ENV, DEFAULT_SEARCH_CACHE_TTL))
+)
+
+
+def searchable_fields() -> Set[str]:
+    """
+    🗂️ Metadata keys that can be filtered on: ``document_type`` and every entity field.
+    """
+    fields = {"document_type", *CATEGORY_PATTERNS}
+    for mapping in ENTITY_MAPPING.values():
+        fields.update(mapping.values())
+    return fields
+
+
+def build_where(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    🧱 Translate ``{field: value | [values]}`` into a Chroma ``where`` filter.
+
+    Values match the stored (flattened) metadata exactly; a list matches any
+    of its values. Several fields are combined with ``$and``.
+
+    Raises:
+        ValueError: Unknown field or empty/invalid value.
+    """
+    allowed = searchable_fields()
+    clauses: List[Dict[str, Any]] = []
+    for field in sorted(filters):
+        if field not in allowed:
+            raise ValueError(f"Unknown filter field: {field}")
+        value = filters[field]
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        values = [str(v) for v in value]
+        if not values or any(not v for v in values):
+            raise ValueError(f"Empty filter value for: {field}")
+        clauses.append(
+            {field: values[0]} if len(values) == 1 else {field: {"$in": values}}
+        )
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def entity_document_ids(filters: Dict[str, Any]) -> Optional[Set[str]]:
+    """
+    🏷️ Ids of the documents whose entity fields match ``filters``, through the
+    entity index, so one value of a multi-valued (comma-joined) field matches.
+
+    Returns:
+        set|None: None when no entity field is filtered on or $ENTITY_INDEX
+        is off (the filters then match whole stored values in the ``where``).
+    """
+    entity_filters = {
+        field: value for field, value in filters.items() if field != "document_type"
+    }
+    if not entity_filters or not entity_index_enabled():
+        return None
+    found = find_documents(entity_filters, limit=MAX_SEARCH_RESULTS)
+    if found["total"] > len(found["document_ids"]):
+        found = find_documents(entity_filters, limit=found["total"])
+    return set(found["document_ids"])
+
+
+def embedding_key(embedding: List[float]) -> str:
+    """
+    🔑 Hash of the query embedding (as float32 bytes).
+    """
+    return hashlib.sha256(np.asarray(embedding, dtype=np.float32).tobytes()).hexdigest()
+
+
+def query_hits(results: Dict[str, Any]) -> List[SearchHit]:
+    """
+    📋 Flatten a single-query Chroma result into one dict per hit.
+    """
+    ids = (results.get("ids") or [[]])[0]
+    documents = (results.get("documents") or [[None] * len(ids)])[0]
+    metadatas = (results.get("metadatas") or [[{}] * len(ids)])[0]
+    distances = (results.get("distances") or [[None] * len(ids)])[0]
+
+    hits = []
+    for doc_id, text, metadata, distance in zip(ids, documents, metadatas, distances):
+        metadata = entity_metadata(metadata or {})
+        hits.append({
+            "document_id": doc_id,
+            "document_type": metadata.pop("document_type", None),
+            "distance": distance,
+            "entities": metadata,
+            "text": text or "",
+        })
+    return hits
+
+
+def nearest_documents(
+    embedding: List[float], top_k: int, where: Optional[Dict[str, Any]] = None
+) -> Tuple[List[SearchHit], bool]:
+    """
+    🧲 The ``top_k`` stored documents nearest to ``embedding``, through the result cache.
+
+    Returns:
+        tuple: (hits, whether they came from the cache). Hits are shared with
+        the cache; copy before modifying.
+    """
+    key = (embedding_key(embedding), json.dumps(where, sort_keys=True), top_k)
+    hits = _results_cache.get(key)
+    if hits is not None:
+        return hits, True
+    hits = query_hits(search_by_embedding(embedding, top_k=top_k, where=where))
+    _results_cache.put(key, hits)
+    return hits, False
+
+
+def lexical_documents(query: str, top_k: int,
+                      where: Optional[Dict[str, Any]] = None) -> List[SearchHit]:
+    """
+    🔤 The ``top_k`` best BM25 matches for ``query``, as search hits.
+
+    Hits carry ``score`` (BM25) and no ``distance``; texts come from the
+    vector store in one lookup, and ids it no longer holds are skipped.
+    """
+    index = get_lexical_index()
+    if index is None:
+        return []
+    ranked = index.search(query, top_k=top_k, where=where)
+    stored = get_documents([doc_id for doc_id, _ in ranked]) if ranked else {}
+    hits = []
+    for doc_id, score in ranked:
+        if doc_id not in stored:
+            continue
+        metadata = entity_metadata(stored[doc_id]["metadata"])
+        hits.append({
+            "document_id": doc_id,
+            "document_type": metadata.pop("document_type", None),
+            "distance": None,
+            "score": score,
+            "entities": metadata,
+            "text": stored[doc_id]["text"],
+        })
+    return hits
+
+
+def fuse_hits(vector_hits: List[SearchHit], lexical_hits: List[SearchHit],
+              limit: int) -> List[SearchHit]:
+    """
+    🔀 Merge the two rankings by reciprocal rank (``score``), keeping the
+    vector hit's fields (its ``distance``) for documents found by both.
+    """
+    by_id: Dict[str, SearchHit] = {hit["document_id"]: hit for hit in lexical_hits}
+    by_id.update({hit["document_id"]: hit for hit in vector_hits})
+    fused = reciprocal_rank_fusion([
+        [hit["document_id"] for hit in vector_hits],
+        [hit["document_id"] for hit in lexical_hits],
+    ])
+    return [{**by_id[doc_id], "score": score} for doc_id, score in fused[:limit]]
+
+
+def search_documents(query: str, filters: Optional[Dict[str, Any]] = None,
+                     top_k: int = 10, page: int = 1,
+                     mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    🔎 One page of documents similar to ``query``.
+
+    Chroma has no offset for nearest-neighbour queries, so page ``n`` asks
+    for ``top_k * n`` results and slices. The full vector result list is
+    cached by (query embedding hash, filter, result count) for
+    $SEARCH_CACHE_TTL seconds.
+
+    With $ENTITY_INDEX set, entity filters are resolved to document ids
+    through the entity index (see ``entity_document_ids``) and applied to
+    the nearest ``MAX_SEARCH_RESULTS`` documents of the ranking.
+
+    Modes:
+        - ``vector``: embedding similarity only.
+        - ``lexical``: BM25 over the lexical index only (no embedding call).
+        - ``hybrid``: both rankings fused by reciprocal rank; queries made
+          only of identifiers (``#1234-56``, ``INV-2024-001``) are answered
+          lexically. The default when $LEXICAL_INDEX_PATH is set, else ``vector``.
+
+    Args:
+        query (str): Free-text query.
+        filters (dict|None): ``{field: value | [values]}`` (see ``build_where``).
+        top_k (int): Results per page (1-100).
+        page (int): 1-based page number.
+        mode (str|None): ``hybrid``, ``vector`` or ``lexical``.
+
+    Returns:
+        dict: ``results`` (hits with document_id, document_type, distance,
+        entities, text, and ``score`` outside vector mode), ``page``,
+        ``top_k``, ``has_more``, ``cached``, ``mode``.
+
+    Raises:
+        ValueError: Invalid query, filter, paging arguments or mode.
+    """
+    if not query or not query.strip():
+        raise ValueError("Query text is required.")
+    if not 1 <= top_k <= MAX_TOP_K:
+        raise ValueError(f"top_k must be between 1 and {MAX_TOP_K}.")
+    if page < 1 or top_k * page > MAX_SEARCH_RESULTS:
+        raise ValueError(f"page must be >= 1 and top_k * page <= {MAX_SEARCH_RESULTS}.")
+    lexical_enabled = get_lexical_index() is not None
+    mode = mode or ("hybrid" if lexical_enabled else "vector")
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(SEARCH_MODES)}.")
+    if mode != "vector" and not lexical_enabled:
+        raise ValueError(
+            f"{mode} search needs the lexical index (set $LEXICAL_INDEX_PATH)."
+        )
+
+    filters = filters or {}
+    where = build_where(filters)
+    allowed = entity_document_ids(filters)
+    if allowed is not None:
+        where = build_where({
+            field: value for field, value in filters.items() if field == "document_type"
+        })
+    wanted = top_k * page
+    # Entity matches are kept among the nearest MAX_SEARCH_RESULTS documents
+    fetch = wanted if allowed is None else MAX_SEARCH_RESULTS
+    cached = False
+    if allowed is not None and not allowed:
+        hits = []
+    elif mode == "lexical" or (mode == "hybrid" and is_identifier_query(query)):
+        hits = lexical_documents(query, fetch, where)
+    else:
+        embedding = embed_texts([query])[0]
+        hits, cached = nearest_documents(embedding, fetch, where)
+        if mode == "hybrid":
+            hits = fuse_hits(hits, lexical_documents(query, fetch, where), fetch)
+    if allowed is not None:
+        hits = [hit for hit in hits if hit["document_id"] in allowed][:wanted]
+    logger.info(f"🔎 {mode} search page {page} (top_k={top_k}, filter={where}, "
+                f"cached={cached}): {len(hits)} hits")
+
+    start = (page - 1) * top_k
+    return {
+        # Callers may edit; the cache keeps its own
+        "results": [dict(hit) for hit in hits[start:start + top_k]],
+        "page": page,
+        "top_k": top_k,
+        "has_more": len(hits) == wanted,
+        "cached": cached,
+        "mode": mode,
+    }
+
+
+def clear_search_cache() -> None:
+    """
+    🧹 Drop cached search results.
+    """
+    _results_cache.clear()
@@ -0,0 +1,200 @@
+# 📦 Collection Snapshots
+# Exports the stored records (ids, float32 embeddings, texts, metadata) as
+# columnar .npz shards plus a manifest, so a new node can be bootstrapped by
+# bulk-adding them instead of re-running OCR and embedding, and without
+# copying a backend's opaque on-disk files. Shards hold plain arrays only
+# (strings as one UTF-8 buffer plus offsets), so loading never unpickles.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Snapshot format
+SNAPSHOT_FORMAT = "doc-processor-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SHARD_SIZE = 5000
+
+# ids, documents, metadatas (lists), embeddings (float32 rows x dim)
+SnapshotColumns = Dict[str, Any]
+
+
+def _encode_strings(values: List[str]) -> Dict[str, np.ndarray]:
+    """
+    🔡 Strings as one UTF-8 byte buffer and ``len + 1`` end offsets.
+    """
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return {"data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "offsets": offsets}
+
+
+def _decode_strings(data: np.ndarray, offsets: np.ndarray) -> List[str]:
+    buffer = data.tobytes()
+    return [buffer[start:end].decode("utf-8")
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def write_shard(path: str, columns: SnapshotColumns, compress: bool = False) -> None:
+    """
+    💾 Write one page of records as an .npz shard (atomically, via a temp file).
+
+    Args:
+        path (str): Shard file (``.npz``).
+        columns (dict): ``ids``, ``documents``, ``metadatas`` and ``embeddings``.
+        compress (bool): Deflate the arrays (smaller, slower to write and read).
+    """
+    arrays: Dict[str, Any] = {
+        "embeddings": np.asarray(columns["embeddings"], dtype=np.float32)
+    }
+    strings = {
+        "ids": [str(doc_id) for doc_id in columns["ids"]],
+        "documents": [document or "" for document in columns["documents"]],
+        "metadatas": [json.dumps(metadata or {}, ensure_ascii=False)
+                      for metadata in columns["metadatas"]],
+    }
+    for name, values in strings.items():
+        for part, array in _encode_strings(values).items():
+            arrays[f"{name}_{part}"] = array
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        if compress:
+            np.savez_compressed(f, **arrays)
+        else:
+            np.savez(f, **arrays)
+    os.replace(temp_path, path)
+
+
+def read_shard(path: str) -> SnapshotColumns:
+    """
+    📖 Load one .npz shard written by ``write_shard``.
+    """
+    with np.load(path, allow_pickle=False) as shard:
+        columns: SnapshotColumns = {
+            name: _decode_strings(shard[f"{name}_data"], shard[f"{name}_offsets"])
+            for name in ("ids", "documents", "metadatas")
+        }
+        columns["metadatas"] = [json.loads(metadata)
+                                for metadata in columns["metadatas"]]
+        columns["embeddings"] = shard["embeddings"]
+    return columns
+
+
+def export_snapshot(collections: List[Any], directory: str, embedding_model: str,
+                    shard_size: int = DEFAULT_SHARD_SIZE,
+                    compress: bool = False) -> Dict[str, Any]:
+    """
+    📤 Stream every record of ``collections`` into shards under ``directory``.
+
+    Each collection is read ``shard_size`` records at a time (one ``get``
+    per shard, so memory stays bounded). The manifest is written last: a
+    directory without one is an interrupted export.
+
+    Args:
+        collections (list): Collections to export (e.g. ``all_collections()``).
+        directory (str): Output directory (created if missing).
+        embedding_model (str): Name of the model the embeddings come from,
+            checked on import.
+        shard_size (int): Records per shard.
+        compress (bool): Deflate the shards.
+
+    Returns:
+        dict: The manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest: Dict[str, Any] = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "embedding_model": embedding_model,
+        "dimension": None,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "collections": {},
+    }
+    for collection in collections:
+        shards: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = collection.get(offset=offset, limit=shard_size,
+                                  include=["documents", "metadatas", "embeddings"])
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            offset += len(ids)
+
+            embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+            embeddings = embeddings.reshape(len(ids), -1)
+            if manifest["dimension"] is None:
+                manifest["dimension"] = int(embeddings.shape[1])
+            elif embeddings.shape[1] != manifest["dimension"]:
+                raise ValueError(f"Collection {collection.name} has "
+                                 f"{embeddings.shape[1]}-dimensional embeddings, "
+                                 f"expected {manifest['dimension']}")
+
+            name = f"{collection.name}-{len(shards):05d}.npz"
+            write_shard(os.path.join(directory, name), {
+                "ids": ids,
+                "documents": page.get("documents") or [None] * len(ids),
+                "metadatas": page.get("metadatas") or [None] * len(ids),
+                "embeddings": embeddings,
+            }, compress)
+            shards.append({"file": name, "count": len(ids)})
+            logger.info(f"📤 Exported {offset} records of {collection.name}")
+        manifest["collections"][collection.name] = {"count": offset, "shards": shards}
+
+    temp_path = os.path.join(directory, f"{MANIFEST_NAME}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, os.path.join(directory, MANIFEST_NAME))
+    return manifest
+
+
+def read_manifest(directory: str,
+                  embedding_model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    📋 Load and validate a snapshot's manifest.
+
+    Args:
+        directory (str): Snapshot directory.
+        embedding_model (str, optional): Expected embedding model name.
+
+    Raises:
+        ValueError: Missing manifest (not a snapshot, or an interrupted
+            export), unknown format or version, or embeddings from another model.
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise ValueError(f"No {MANIFEST_NAME} in {directory} "
+                         "(not a snapshot, or the export did not finish)")
+    with open(path, encoding="utf-8") as f:
+        manifest: Dict[str, Any] = json.load(f)
+    if (manifest.get("format") != SNAPSHOT_FORMAT
+            or manifest.get("version") != SNAPSHOT_VERSION):
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')} "
+                         f"v{manifest.get('version')}")
+    if (embedding_model is not None
+            and manifest.get("embedding_model") != embedding_model):
+        raise ValueError("Snapshot embeddings come from "
+                         f"{manifest.get('embedding_model')}, "
+                         f"this node uses {embedding_model}")
+    return manifest
+
+
+def iter_snapshot(directory: str,
+                  manifest: Dict[str, Any]) -> Iterator[SnapshotColumns]:
+    """
+    🔁 The snapshot's shards, one at a time, in export order.
+    """
+    for collection in manifest["collections"].values():
+        for shard in collection["shards"]:
+            yield read_shard(os.path.join(directory, shard["file"]))
@@ -0,0 +1,364 @@
+# 📮 Write-Behind Spool for Vector Storage
+# Requests append documents to a local SQLite spool and return; a background
+# flusher embeds and inserts spooled documents into Chroma in batches,
+# retrying with backoff. Disabled unless VECTOR_SPOOL_PATH is set.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+VECTOR_SPOOL_PATH_ENV = "VECTOR_SPOOL_PATH"
+VECTOR_SPOOL_MAX_DEPTH_ENV = "VECTOR_SPOOL_MAX_DEPTH"
+DEFAULT_MAX_DEPTH = 10000
+
+StoreFunc = Callable[[List[Dict[str, Any]], int], List[Tuple[str, str]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc_id TEXT NOT NULL,
+    record TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS spool_due ON spool (next_attempt, id);
+CREATE TABLE IF NOT EXISTS spool_dead (
+    id INTEGER PRIMARY KEY,
+    doc_id TEXT NOT NULL,
+    record TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT
+);
+"""
+
+
+class SpoolFullError(RuntimeError):
+    """
+    🚧 The spool holds ``max_depth`` documents; callers should back off.
+    """
+
+
+def _default_store(records: List[Dict[str, Any]],
+                   batch_size: int) -> List[Tuple[str, str]]:
+    from documents.chroma_client import store_documents_in_chromadb
+
+    return store_documents_in_chromadb(records, batch_size=batch_size)
+
+
+class VectorSpool:
+    """
+    📮 Durable write-behind queue in front of ``store_documents_in_chromadb``.
+
+    Every enqueued record is committed to SQLite before ``enqueue`` returns,
+    so a crash or a Chroma outage loses nothing. Flushing claims due rows
+    with a short lease (several processes may flush the same file), stores
+    them in one bulk call, deletes what was stored and reschedules the rest
+    with exponential backoff. Records that keep failing move to
+    ``spool_dead`` after ``max_attempts``.
+
+    Args:
+        path (str): SQLite file.
+        batch_size (int): Records per flush.
+        max_depth (int): Pending records before ``enqueue`` raises ``SpoolFullError``.
+        flush_interval (float): Idle seconds between flush attempts.
+        max_attempts (int): Attempts before a record is dead-lettered.
+        backoff (float): First retry delay in seconds (doubles per attempt,
+            capped at 300s).
+        lease (float): Seconds a claimed batch stays invisible to other flushers.
+        store (callable|None): ``(records, batch_size) -> [(doc_id, error)]``;
+            defaults to ``store_documents_in_chromadb``.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256,
+                 max_depth: int = DEFAULT_MAX_DEPTH, flush_interval: float = 1.0,
+                 max_attempts: int = 8, backoff: float = 2.0, lease: float = 300.0,
+                 store: Optional[StoreFunc] = None) -> None:
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.max_depth = max_depth
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self._store = store or _default_store
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metrics_lock = threading.Lock()
+        self._flushed = 0
+        self._failed_attempts = 0
+        self._dead_lettered = 0
+        self._flushes = 0
+        self._flush_seconds = 0.0
+        self._last_flush_ms = 0.0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    # 📥 Producer side
+
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """
+        📥 Durably append one record (the ``store_document_in_chromadb`` arguments).
+
+        Raises:
+            SpoolFullError: The spool already holds ``max_depth`` records.
+        """
+        payload = json.dumps(record)
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (depth,) = conn.execute("SELECT COUNT(*) FROM spool").fetchone()
+                if depth >= self.max_depth:
+                    raise SpoolFullError(
+                        f"Vector spool is full ({depth} pending documents)"
+                    )
+                conn.execute(
+                    "INSERT INTO spool (doc_id, record, created, next_attempt) "
+                    "VALUES (?, ?, ?, ?)",
+                    (str(record.get("doc_id", "")), payload, now, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._wakeup.set()
+
+    # 📤 Consumer side
+
+    def _claim(self) -> List[Tuple[int, int, Dict[str, Any]]]:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, attempts, record FROM spool "
+                    "WHERE next_attempt <= ? ORDER BY id LIMIT ?",
+                    (now, self.batch_size),
+                ).fetchall()
+                if rows:
+                    conn.executemany(
+                        "UPDATE spool SET next_attempt = ? WHERE id = ?",
+                        [(now + self.lease, row[0]) for row in rows],
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return [(row_id, attempts, json.loads(record))
+                for row_id, attempts, record in rows]
+
+    def flush_once(self) -> int:
+        """
+        📤 Store one batch of due records.
+
+        Returns:
+            int: Records claimed (0 when nothing was due).
+        """
+        claimed = self._claim()
+        if not claimed:
+            return 0
+
+        start = time.perf_counter()
+        records = [record for _, _, record in claimed]
+        try:
+            failures = dict(self._store(records, self.batch_size))
+        except Exception as e:
+            logger.error(f"❌ Vector spool flush failed: {e}", exc_info=True)
+            failures = {str(record.get("doc_id", "")): str(e) for record in records}
+        elapsed = time.perf_counter() - start
+
+        now = time.time()
+        done: List[Tuple[int]] = []
+        retry: List[Tuple[int, float, str, int]] = []
+        dead: List[Tuple[int, int, str]] = []
+        for row_id, attempts, record in claimed:
+            error = failures.get(str(record.get("doc_id", "")))
+            if error is None:
+                done.append((row_id,))
+            elif attempts + 1 >= self.max_attempts:
+                dead.append((row_id, attempts + 1, error))
+            else:
+                delay = min(self.backoff * (2 ** attempts), 300.0)
+                retry.append((attempts + 1, now + delay, error, row_id))
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("DELETE FROM spool WHERE id = ?", done)
+                conn.executemany(
+                    "UPDATE spool SET attempts = ?, next_attempt = ?, last_error = ? "
+                    "WHERE id = ?",
+                    retry
+                )
+                for row_id, attempts, error in dead:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO spool_dead "
+                        "(id, doc_id, record, created, attempts, last_error) "
+                        "SELECT id, doc_id, record, created, ?, ? "
+                        "FROM spool WHERE id = ?",
+                        (attempts, error, row_id),
+                    )
+                    conn.execute("DELETE FROM spool WHERE id = ?", (row_id,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        if dead:
+            logger.error(f"☠️ {len(dead)} spooled documents gave up after "
+                         f"{self.max_attempts} attempts.")
+        with self._metrics_lock:
+            self._flushes += 1
+            self._flush_seconds += elapsed
+            self._last_flush_ms = elapsed * 1000
+            self._flushed += len(done)
+            self._failed_attempts += len(retry) + len(dead)
+            self._dead_lettered += len(dead)
+        logger.info(f"📤 Flushed {len(done)}/{len(claimed)} spooled documents in "
+                    f"{elapsed * 1000:.0f} ms")
+        return len(claimed)
+
+    def drain(self, timeout: Optional[float] = None) -> int:
+        """
+        🚿 Flush until nothing is due (or ``timeout`` seconds pass).
+
+        Returns:
+            int: Records still pending (including ones waiting for a retry).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.flush_once():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        return self.depth()
+
+    # 🧵 Background flusher
+
+    def start(self) -> None:
+        """
+        🧵 Start the background flusher thread (idempotent).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vector-spool-flusher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                flushed = self.flush_once()
+            except Exception as e:
+                logger.error(f"❌ Vector spool flusher error: {e}", exc_info=True)
+                flushed = 0
+            if not flushed:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+
+    # 📊 Metrics
+
+    def depth(self) -> int:
+        with closing(self._connect()) as conn:
+            (depth,) = conn.execute("SELECT COUNT(*) FROM spool").fetchone()
+        return int(depth)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        📊 Spool depth and flush latency.
+
+        ``depth``/``dead``/``oldest_age_s`` are read from the spool file (all
+        processes); the counters and latencies cover this process's flushes.
+        """
+        with closing(self._connect()) as conn:
+            depth, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(created) FROM spool"
+            ).fetchone()
+            (dead,) = conn.execute("SELECT COUNT(*) FROM spool_dead").fetchone()
+        with self._metrics_lock:
+            return {
+                "depth": int(depth),
+                "max_depth": self.max_depth,
+                "dead": int(dead),
+                "oldest_age_s": (round(time.time() - oldest, 3)
+                                 if oldest is not None else 0.0),
+                "flushed": self._flushed,
+                "failed_attempts": self._failed_attempts,
+                "dead_lettered": self._dead_lettered,
+                "flushes": self._flushes,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "avg_flush_ms": (round(self._flush_seconds * 1000 / self._flushes, 3)
+                                 if self._flushes else 0.0),
+            }
+
+
+# 🔁 Process-wide spool (created lazily from the environment)
+_spool: Optional[VectorSpool] = None
+_spool_configured = False
+_spool_lock = threading.Lock()
+
+
+def get_vector_spool(start: bool = True) -> Optional[VectorSpool]:
+    """
+    📮 Return the configured spool, or None when $VECTOR_SPOOL_PATH is unset.
+
+    Args:
+        start (bool): Also start this process's background flusher.
+    """
+    global _spool, _spool_configured
+    if not _spool_configured:
+        with _spool_lock:
+            if not _spool_configured:
+                path = os.environ.get(VECTOR_SPOOL_PATH_ENV)
+                if path:
+                    _spool = VectorSpool(
+                        path,
+                        max_depth=int(os.environ.get(VECTOR_SPOOL_MAX_DEPTH_ENV,
+                                                     DEFAULT_MAX_DEPTH)),
+                    )
+                    logger.info(f"📮 Write-behind vector spool at {path}")
+                _spool_configured = True
+    if start and _spool is not None:
+        _spool.start()
+    return _spool
+
+
+def reset_vector_spool() -> None:
+    """
+    🔄 Stop and forget the configured spool (re-read from the environment on next use).
+    """
+    global _spool, _spool_configured
+    with _spool_lock:
+        if _spool is not None:
+            _spool.stop()
+        _spool = None
+        _spool_configured = False
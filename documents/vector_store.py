@@ -0,0 +1,614 @@
+# 🧱 Vector Store Backends
+# chroma_client talks to a VectorStore: ChromaDB by default, or a NumPy
+# engine (exact cosine search over a memory-mapped float32 matrix) selected
+# with VECTOR_STORE=numpy. Both expose the subset of Chroma's client and
+# collection API the app uses, so callers don't care which one is active.
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# 🛠️ Logger Setup
+logger = logging.getLogger(__name__)
+
+# ⚙️ Configuration (environment)
+VECTOR_STORE_ENV = "VECTOR_STORE"
+BACKENDS = ("chroma", "numpy")
+
+DEFAULT_INCLUDE_GET = ("documents", "metadatas")
+DEFAULT_INCLUDE_QUERY = ("documents", "metadatas", "distances")
+
+
+class VectorCollection(ABC):
+    """
+    🧩 Interface: one named set of (id, vector, document, metadata) records.
+
+    Mirrors Chroma's ``Collection`` (whose objects satisfy it as they are):
+    results are dicts of ``ids``/``documents``/``metadatas``/``embeddings``
+    (``query`` adds ``distances`` and nests each field once per query), and
+    ``where`` filters use Chroma's operators.
+    """
+
+    name: str
+
+    @abstractmethod
+    def add(self, ids: List[str], documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict[str, Any]]] = None,
+            embeddings: Optional[Sequence[Any]] = None) -> None:
+        """Insert records; ids that already exist are skipped."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert(self, ids: List[str], documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None,
+               embeddings: Optional[Sequence[Any]] = None) -> None:
+        """Insert records, replacing existing ids."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def query(self, query_embeddings: Optional[Sequence[Any]] = None,
+              query_texts: Optional[List[str]] = None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = DEFAULT_INCLUDE_QUERY) -> Dict[str, Any]:
+        """Nearest records to each query."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, ids: Optional[List[str]] = None,
+            where: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+            offset: Optional[int] = None,
+            include: Sequence[str] = DEFAULT_INCLUDE_GET) -> Dict[str, Any]:
+        """Records by id and/or filter, in storage order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, ids: List[str], metadatas: Optional[List[Dict[str, Any]]] = None,
+               documents: Optional[List[str]] = None,
+               embeddings: Optional[Sequence[Any]] = None) -> None:
+        """Merge metadata (``None`` removes a key) and/or replace documents/vectors."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None,
+               where: Optional[Dict[str, Any]] = None) -> None:
+        """Remove records by id and/or filter."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self) -> int:
+        raise NotImplementedError
+
+
+class VectorStore(ABC):
+    """
+    🧩 Interface: a set of named collections.
+    """
+
+    @abstractmethod
+    def get_or_create_collection(self, name: str,
+                                 embedding_function: Any = None) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_collections(self) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_collection(self, name: str) -> None:
+        raise NotImplementedError
+
+
+# 🟣 ChromaDB
+
+class ChromaVectorStore(VectorStore):
+    """
+    🟣 ChromaDB persistent client (HNSW, approximate). Collections are Chroma's own.
+
+    Args:
+        path (str): Chroma data directory.
+    """
+
+    def __init__(self, path: str) -> None:
+        import chromadb
+
+        self._client = chromadb.PersistentClient(path=path)
+
+    def get_or_create_collection(self, name: str,
+                                 embedding_function: Any = None) -> Any:
+        if embedding_function is None:
+            return self._client.get_or_create_collection(name=name)
+        return self._client.get_or_create_collection(
+            name=name, embedding_function=embedding_function
+        )
+
+    def list_collections(self) -> List[str]:
+        return [str(getattr(c, "name", c)) for c in self._client.list_collections()]
+
+    def delete_collection(self, name: str) -> None:
+        self._client.delete_collection(name=name)
+
+
+# 🔢 NumPy brute force
+
+def _compare(value: Any, operand: Any, op: Callable[[Any, Any], bool]) -> bool:
+    try:
+        return value is not None and bool(op(value, operand))
+    except TypeError:
+        return False
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+    "$gt": lambda value, operand: _compare(value, operand, lambda a, b: a > b),
+    "$gte": lambda value, operand: _compare(value, operand, lambda a, b: a >= b),
+    "$lt": lambda value, operand: _compare(value, operand, lambda a, b: a < b),
+    "$lte": lambda value, operand: _compare(value, operand, lambda a, b: a <= b),
+}
+
+
+def matches_where(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """
+    🔍 Whether ``metadata`` satisfies a Chroma-style ``where`` filter.
+
+    Supports ``$and``/``$or`` and ``$eq $ne $in $nin $gt $gte $lt $lte``;
+    a bare value means ``$eq``. A missing key never matches.
+
+    Raises:
+        ValueError: Unknown operator.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            if key not in metadata:
+                return False
+            value = metadata[key]
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, operand in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                if not _OPERATORS[op](value, operand):
+                    return False
+    return True
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    normalized: np.ndarray = (matrix / norms).astype(np.float32)
+    return normalized
+
+
+class NumpyCollection(VectorCollection):
+    """
+    🔢 Exact cosine search over a memory-mapped float32 matrix.
+
+    Layout under ``<directory>/``:
+
+    - ``vectors.f32``: unit-length rows of ``dim`` float32 values, append-only.
+    - ``log.jsonl``: append-only operations (``put`` a row, ``meta`` update,
+      ``del``), replayed on open; the id -> row map, documents and metadata
+      live in memory.
+    - ``meta.json``: ``{"dim": ...}``, fixed by the first vector stored.
+
+    Writers append under an exclusive ``flock``; every call first reads log
+    lines other processes appended. Replaced and deleted rows stay in the
+    file until the collection is rebuilt.
+
+    ``query`` scores every stored row with one matrix-vector product and
+    picks the top ``n_results`` with ``argpartition``; distances are cosine
+    distances (``1 - cos``). ``where`` filters are evaluated on per-key
+    metadata columns before ranking.
+
+    Args:
+        directory (str): Collection directory (created if missing).
+        name (str): Collection name.
+        embedding_function (callable|None): Embeds documents/query texts given
+            without vectors.
+    """
+
+    def __init__(self, directory: str, name: str,
+                 embedding_function: Any = None) -> None:
+        self.name = name
+        self.directory = directory
+        self.embedding_function = embedding_function
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._log_path = os.path.join(directory, "log.jsonl")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock_path = os.path.join(directory, ".lock")
+
+        self._lock = threading.RLock()
+        self._ids: List[str] = []  # row -> id
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}  # live id -> row
+        self._live: Optional[np.ndarray] = None
+        # metadata key -> value per row (None = missing)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._dim: Optional[int] = None
+        self._log_offset = 0
+
+        with self._lock:
+            self._refresh()
+
+    # 📖 State
+
+    def _refresh(self) -> None:
+        """
+        Replay log lines appended since the last refresh (by any process).
+        """
+        if self._dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._dim = int(json.load(f)["dim"])
+        if (not os.path.exists(self._log_path)
+                or os.path.getsize(self._log_path) == self._log_offset):
+            return
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            tail = f.read()
+        # Only consume complete lines; a concurrent writer may be mid-line
+        complete = tail[:tail.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            self._apply(json.loads(line))
+        self._log_offset += len(complete)
+        self._live = None
+        self._columns = {}
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        op, doc_id = entry["op"], entry["id"]
+        if op == "put":
+            row = int(entry["row"])
+            while len(self._ids) <= row:
+                self._ids.append("")
+                self._documents.append(None)
+                self._metadatas.append({})
+            self._ids[row] = doc_id
+            self._documents[row] = entry.get("document")
+            self._metadatas[row] = entry.get("metadata") or {}
+            self._rows[doc_id] = row
+        elif op == "meta" and doc_id in self._rows:
+            self._metadatas[self._rows[doc_id]] = entry["metadata"]
+        elif op == "del":
+            self._rows.pop(doc_id, None)
+
+    def _live_rows(self) -> np.ndarray:
+        if self._live is None:
+            self._live = np.sort(np.fromiter(self._rows.values(), dtype=np.int64,
+                                             count=len(self._rows)))
+        return self._live
+
+    def _column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(len(self._metadatas), dtype=object)
+            column[:] = [metadata.get(key) for metadata in self._metadatas]
+            self._columns[key] = column
+        return column
+
+    def _where_mask(self, rows: np.ndarray, where: Dict[str, Any]) -> np.ndarray:
+        """
+        Vectorized ``matches_where`` over ``rows``, using one value column per
+        metadata key (rebuilt after writes).
+        """
+        mask = np.ones(len(rows), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._where_mask(rows, clause)
+            elif key == "$or":
+                any_mask = np.zeros(len(rows), dtype=bool)
+                for clause in condition:
+                    any_mask |= self._where_mask(rows, clause)
+                mask &= any_mask
+            else:
+                values = self._column(key)[rows]
+                mask &= np.not_equal(values, np.array(None, dtype=object))
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for op, operand in condition.items():
+                    if op == "$eq":
+                        mask &= values == operand
+                    elif op == "$ne":
+                        mask &= values != operand
+                    elif op in ("$in", "$nin"):
+                        hits = np.zeros(len(rows), dtype=bool)
+                        for option in operand:
+                            hits |= values == option
+                        mask &= hits if op == "$in" else ~hits
+                    elif op in _OPERATORS:
+                        compare = _OPERATORS[op]
+                        mask &= np.fromiter((compare(v, operand) for v in values),
+                                            dtype=bool, count=len(values))
+                    else:
+                        raise ValueError(f"Unsupported where operator: {op}")
+        return mask
+
+    def _matrix_rows(self, rows_needed: int) -> np.ndarray:
+        assert self._dim is not None
+        if self._matrix is None or self._matrix.shape[0] < rows_needed:
+            rows = os.path.getsize(self._vectors_path) // (self._dim * 4)
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                     shape=(rows, self._dim))
+        return self._matrix
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._refresh()
+
+    def _embed(self, texts: List[Optional[str]]) -> np.ndarray:
+        if self.embedding_function is None:
+            raise ValueError(
+                f"Collection {self.name} has no embedding function; pass embeddings."
+            )
+        return np.asarray(self.embedding_function([t or "" for t in texts]),
+                          dtype=np.float32)
+
+    # ✍️ Writing
+
+    def _put(self, ids: List[str], documents: Optional[List[str]],
+             metadatas: Optional[List[Dict[str, Any]]],
+             embeddings: Optional[Sequence[Any]], replace: bool) -> None:
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate ids in one call.")
+        if not ids:
+            return
+        docs: List[Optional[str]] = (
+            list(documents) if documents is not None else [None] * len(ids)
+        )
+        metas = [dict(m or {}) for m in metadatas or [{} for _ in ids]]
+        if embeddings is not None:
+            matrix = np.asarray(embeddings, dtype=np.float32)
+        else:
+            matrix = self._embed(docs)
+        matrix = _normalize(matrix.reshape(len(ids), -1))
+
+        with self._write():
+            keep = [i for i, doc_id in enumerate(ids)
+                    if replace or doc_id not in self._rows]
+            if not keep:
+                return
+            if self._dim is None:
+                self._dim = int(matrix.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self._dim}, f)
+            if matrix.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} "
+                                 f"!= collection dimension {self._dim}")
+
+            size = 0
+            if os.path.exists(self._vectors_path):
+                size = os.path.getsize(self._vectors_path)
+            first_row = max(size // (self._dim * 4), len(self._ids))
+            with open(self._vectors_path, "ab") as f:
+                # Drop a torn row left by a crashed writer
+                f.truncate(first_row * self._dim * 4)
+                f.write(matrix[keep].tobytes())
+            self._append_log([
+                {"op": "put", "id": ids[i], "row": first_row + n,
+                 "document": docs[i], "metadata": metas[i]}
+                for n, i in enumerate(keep)
+            ])
+
+    def add(self, ids: List[str], documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict[str, Any]]] = None,
+            embeddings: Optional[Sequence[Any]] = None) -> None:
+        self._put(ids, documents, metadatas, embeddings, replace=False)
+
+    def upsert(self, ids: List[str], documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None,
+               embeddings: Optional[Sequence[Any]] = None) -> None:
+        self._put(ids, documents, metadatas, embeddings, replace=True)
+
+    def update(self, ids: List[str], metadatas: Optional[List[Dict[str, Any]]] = None,
+               documents: Optional[List[str]] = None,
+               embeddings: Optional[Sequence[Any]] = None) -> None:
+        with self._write():
+            present = [i for i, doc_id in enumerate(ids) if doc_id in self._rows]
+            merged = []
+            for i in present:
+                row = self._rows[ids[i]]
+                metadata = dict(self._metadatas[row])
+                changes = metadatas[i] if metadatas is not None else {}
+                for key, value in changes.items():
+                    if value is None:
+                        metadata.pop(key, None)
+                    else:
+                        metadata[key] = value
+                document = self._documents[row]
+                if documents is not None:
+                    document = documents[i]
+                merged.append((ids[i], metadata, document))
+            if documents is None and embeddings is None:
+                self._append_log([{"op": "meta", "id": doc_id, "metadata": meta}
+                                  for doc_id, meta, _ in merged])
+                return
+
+        # New text or vector: store a fresh row (re-embedding the text if no
+        # vector was given)
+        vectors = [embeddings[i] for i in present] if embeddings is not None else None
+        self.upsert([m[0] for m in merged], [m[2] or "" for m in merged],
+                    [m[1] for m in merged], vectors)
+
+    def delete(self, ids: Optional[List[str]] = None,
+               where: Optional[Dict[str, Any]] = None) -> None:
+        with self._write():
+            targets = self._select(ids, where)
+            self._append_log([{"op": "del", "id": self._ids[row]} for row in targets])
+
+    # 📖 Reading
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def _select(self, ids: Optional[List[str]],
+                where: Optional[Dict[str, Any]]) -> List[int]:
+        if ids is not None:
+            rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows]
+        else:
+            rows = [int(row) for row in self._live_rows()]
+        if where:
+            array = np.asarray(rows, dtype=np.int64)
+            rows = [int(row) for row in array[self._where_mask(array, where)]]
+        return rows
+
+    def get(self, ids: Optional[List[str]] = None,
+            where: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+            offset: Optional[int] = None,
+            include: Sequence[str] = DEFAULT_INCLUDE_GET) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            rows = self._select(ids, where)
+            start = offset or 0
+            rows = rows[start:None if limit is None else start + limit]
+            result: Dict[str, Any] = {
+                "ids": [self._ids[row] for row in rows],
+                "documents": None,
+                "metadatas": None,
+                "embeddings": None,
+            }
+            if "documents" in include:
+                result["documents"] = [self._documents[row] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [dict(self._metadatas[row]) for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = (
+                    np.array(self._matrix_rows(max(rows) + 1)[rows])
+                    if rows else np.zeros((0, 0))
+                )
+            return result
+
+    def query(self, query_embeddings: Optional[Sequence[Any]] = None,
+              query_texts: Optional[List[str]] = None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = DEFAULT_INCLUDE_QUERY) -> Dict[str, Any]:
+        if query_embeddings is not None:
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+        else:
+            queries = self._embed(list(query_texts or []))
+        queries = _normalize(queries.reshape(len(queries), -1))
+
+        # Snapshot under the lock, score outside it
+        with self._lock:
+            self._refresh()
+            candidates = self._live_rows()
+            if where:
+                candidates = candidates[self._where_mask(candidates, where)]
+            n_rows = len(self._ids)
+            matrix = self._matrix_rows(n_rows) if len(candidates) else None
+
+        results: Dict[str, Any] = {
+            field: [] for field in ("ids", "documents", "metadatas", "distances")
+        }
+        if matrix is not None:
+            similarities = np.asarray(matrix[:n_rows] @ queries.T)  # rows x queries
+        for q in range(len(queries)):
+            chosen: List[int] = []
+            distances: List[float] = []
+            k = min(n_results, len(candidates))
+            if matrix is not None and k > 0:
+                scores = similarities[candidates, q]
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+                chosen = [int(row) for row in candidates[top]]
+                distances = [float(1.0 - s) for s in scores[top]]
+            results["ids"].append([self._ids[row] for row in chosen])
+            results["documents"].append([self._documents[row] for row in chosen])
+            results["metadatas"].append([dict(self._metadatas[row]) for row in chosen])
+            results["distances"].append(distances)
+
+        for field in ("documents", "metadatas", "distances"):
+            if field not in include:
+                results[field] = None
+        return results
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    🔢 Directory of ``NumpyCollection`` s, one subdirectory per collection.
+
+    Args:
+        path (str): Root directory.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def _directory(self, name: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9_.-]*", name):
+            raise ValueError(f"Invalid collection name: {name}")
+        return os.path.join(self.path, name)
+
+    def get_or_create_collection(self, name: str,
+                                 embedding_function: Any = None) -> NumpyCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = NumpyCollection(self._directory(name), name,
+                                             embedding_function)
+                self._collections[name] = collection
+            elif embedding_function is not None:
+                collection.embedding_function = embedding_function
+            return collection
+
+    def list_collections(self) -> List[str]:
+        return sorted(
+            name for name in os.listdir(self.path)
+            if os.path.isdir(os.path.join(self.path, name)) and not name.startswith(".")
+        )
+
+    def delete_collection(self, name: str) -> None:
+        with self._lock:
+            self._collections.pop(name, None)
+            shutil.rmtree(self._directory(name), ignore_errors=True)
+
+
+def open_vector_store(backend: str, path: str) -> VectorStore:
+    """
+    🧱 Open the ``backend`` ("chroma" or "numpy") store rooted at ``path``.
+
+    Raises:
+        ValueError: Unknown backend.
+    """
+    if backend == "chroma":
+        return ChromaVectorStore(path)
+    if backend == "numpy":
+        return NumpyVectorStore(path)
+    raise ValueError(f"Unknown vector store backend: {backend} "
+                     f"(expected one of {', '.join(BACKENDS)})")
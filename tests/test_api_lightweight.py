@@ -7,12 +7,17 @@ from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from documents.ocr import OCRResult
+
 
 class TestLightweightAPI(TestCase):
     
     def setUp(self):
         self.client = APIClient()
         self.url = '/api/process-document/'
+        lookup = patch('api.views.get_document', return_value=None)
+        self.mock_lookup = lookup.start()
+        self.addCleanup(lookup.stop)
     
     def test_process_document_no_file(self):
         """Test API with no file uploaded"""
@@ -20,14 +25,14 @@ class TestLightweightAPI(TestCase):
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'error' in response.data
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     @patch('api.views.predict_document_type')
     @patch('api.views.extract_entities')
     @patch('api.views.store_document_in_chromadb')
     def test_process_document_success(self, mock_store, mock_extract, mock_predict, mock_ocr):
         """Test successful document processing"""
         # Setup mocks
-        mock_ocr.return_value = "extracted text"
+        mock_ocr.return_value = OCRResult("Extracted Text", "extracted text")
         mock_predict.return_value = "letter"
         mock_extract.return_value = {"recipient": ["John Doe"]}
         
@@ -48,10 +53,11 @@ class TestLightweightAPI(TestCase):
         # Verify all functions were called
         mock_ocr.assert_called_once()
         mock_predict.assert_called_once_with("extracted text")
-        mock_extract.assert_called_once_with("letter", "extracted text")
+        mock_extract.assert_called_once_with("letter", "Extracted Text")
         mock_store.assert_called_once()
+        assert mock_store.call_args.kwargs['text'] == "extracted text"
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     def test_process_document_ocr_error(self, mock_ocr):
         """Test API with OCR error"""
         mock_ocr.side_effect = Exception("OCR failed")
@@ -67,11 +73,11 @@ class TestLightweightAPI(TestCase):
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert 'error' in response.data
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     @patch('api.views.predict_document_type')
     def test_process_document_classifier_error(self, mock_predict, mock_ocr):
         """Test API with classifier error"""
-        mock_ocr.return_value = "text"
+        mock_ocr.return_value = OCRResult("text", "text")
         mock_predict.side_effect = Exception("Classification failed")
         
         test_file = SimpleUploadedFile(
@@ -84,12 +90,12 @@ class TestLightweightAPI(TestCase):
         
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     @patch('api.views.predict_document_type')
     @patch('api.views.extract_entities')
     def test_process_document_extractor_error(self, mock_extract, mock_predict, mock_ocr):
         """Test API with entity extraction error"""
-        mock_ocr.return_value = "text"
+        mock_ocr.return_value = OCRResult("text", "text")
         mock_predict.return_value = "letter"
         mock_extract.side_effect = Exception("Extraction failed")
         
@@ -103,13 +109,13 @@ class TestLightweightAPI(TestCase):
         
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     @patch('api.views.predict_document_type')
     @patch('api.views.extract_entities')
     @patch('api.views.store_document_in_chromadb')
     def test_process_document_storage_error(self, mock_store, mock_extract, mock_predict, mock_ocr):
         """Test API with storage error"""
-        mock_ocr.return_value = "text"
+        mock_ocr.return_value = OCRResult("text", "text")
         mock_predict.return_value = "letter"
         mock_extract.return_value = {}
         mock_store.side_effect = Exception("Storage failed")
@@ -124,13 +130,13 @@ class TestLightweightAPI(TestCase):
         
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     @patch('api.views.predict_document_type')
     @patch('api.views.extract_entities')
     @patch('api.views.store_document_in_chromadb')
     def test_process_document_different_types(self, mock_store, mock_extract, mock_predict, mock_ocr):
         """Test API with different document types"""
-        mock_ocr.return_value = "invoice text"
+        mock_ocr.return_value = OCRResult("invoice text", "invoice text")
         mock_predict.return_value = "invoice"
         mock_extract.return_value = {"vendor": ["ABC Corp"], "invoice_number": ["INV-123"]}
         
@@ -147,18 +153,91 @@ class TestLightweightAPI(TestCase):
         assert 'vendor' in response.data['entities']
         assert 'invoice_number' in response.data['entities']
     
+    @patch('api.views.extract_ocr_result')
+    @patch('api.views.get_classifier_backend', return_value="knn")
+    @patch('api.views.embed_texts')
+    @patch('api.views.predict_document_type_knn')
+    @patch('api.views.predict_document_type')
+    @patch('api.views.extract_entities')
+    @patch('api.views.store_document_in_chromadb')
+    def test_process_document_knn_backend(self, mock_store, mock_extract, mock_predict, mock_knn,
+                                          mock_embed, mock_backend, mock_ocr):
+        """Test kNN backend embeds once and reuses the vector for storage"""
+        mock_ocr.return_value = OCRResult("invoice text", "invoice text")
+        mock_embed.return_value = [[0.1, 0.2]]
+        mock_knn.return_value = "invoice"
+        mock_extract.return_value = {}
+
+        test_file = SimpleUploadedFile("invoice.jpg", b"fake image content", content_type="image/jpeg")
+        response = self.client.post(self.url, {'file': test_file})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['document_type'] == 'invoice'
+        mock_embed.assert_called_once_with(["invoice text"])
+        mock_predict.assert_not_called()
+        assert mock_store.call_args.kwargs['embedding'] == [0.1, 0.2]
+
+    @patch('api.views.extract_ocr_result')
+    @patch('api.views.predict_document_type')
+    @patch('api.views.extract_entities')
+    @patch('api.views.store_document_in_chromadb')
+    @patch('api.views.get_vector_spool')
+    def test_process_document_write_behind(self, mock_spool, mock_store, mock_extract, mock_predict, mock_ocr):
+        """With a spool configured the record is queued, not written synchronously"""
+        mock_ocr.return_value = OCRResult("Text", "text")
+        mock_predict.return_value = "memo"
+        mock_extract.return_value = {}
+
+        test_file = SimpleUploadedFile("memo.jpg", b"fake image content", content_type="image/jpeg")
+        response = self.client.post(self.url, {'file': test_file})
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_store.assert_not_called()
+        record = mock_spool.return_value.enqueue.call_args.args[0]
+        assert record["doc_id"] == response.data["document_id"]
+        assert record["text"] == "text"
+
+    @patch('api.views.extract_ocr_result')
+    @patch('api.views.predict_document_type')
+    @patch('api.views.extract_entities')
+    @patch('api.views.get_vector_spool')
+    def test_process_document_spool_full(self, mock_spool, mock_extract, mock_predict, mock_ocr):
+        """A full spool should push back with 503 + Retry-After"""
+        from documents.spool import SpoolFullError
+
+        mock_ocr.return_value = OCRResult("Text", "text")
+        mock_predict.return_value = "memo"
+        mock_extract.return_value = {}
+        mock_spool.return_value.enqueue.side_effect = SpoolFullError("full")
+
+        test_file = SimpleUploadedFile("memo.jpg", b"fake image content", content_type="image/jpeg")
+        response = self.client.post(self.url, {'file': test_file})
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '30'
+
+    @patch('api.views.get_vector_spool')
+    def test_storage_stats(self, mock_spool):
+        """Spool metrics are exposed when write-behind is enabled"""
+        mock_spool.return_value.stats.return_value = {"depth": 2, "last_flush_ms": 12.5}
+        response = self.client.get('/api/storage-stats/')
+        assert response.data == {"write_behind": True, "spool": {"depth": 2, "last_flush_ms": 12.5}}
+
+        mock_spool.return_value = None
+        assert self.client.get('/api/storage-stats/').data == {"write_behind": False}
+
     def test_process_document_invalid_method(self):
         """Test API with invalid HTTP method"""
         response = self.client.get(self.url)
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     @patch('api.views.predict_document_type')
     @patch('api.views.extract_entities')
     @patch('api.views.store_document_in_chromadb')
     def test_process_document_empty_entities(self, mock_store, mock_extract, mock_predict, mock_ocr):
         """Test API with empty entity extraction results"""
-        mock_ocr.return_value = "text with no entities"
+        mock_ocr.return_value = OCRResult("text with no entities", "text with no entities")
         mock_predict.return_value = "memo"
         mock_extract.return_value = {}
         
@@ -173,17 +252,18 @@ class TestLightweightAPI(TestCase):
         assert response.status_code == status.HTTP_200_OK
         assert response.data['entities'] == {}
     
-    @patch('api.views.extract_text_from_image')
+    @patch('api.views.extract_ocr_result')
     @patch('api.views.predict_document_type')
     @patch('api.views.extract_entities')
     @patch('api.views.store_document_in_chromadb')
+    @patch.dict('os.environ', {'DOCUMENT_ID_MODE': 'uuid'})
     @patch('uuid.uuid4')
     def test_process_document_uuid_generation(self, mock_uuid, mock_store, mock_extract, mock_predict, mock_ocr):
         """Test that UUID is properly generated for document ID"""
         mock_uuid.return_value = MagicMock()
         mock_uuid.return_value.__str__ = MagicMock(return_value="test-uuid-123")
         
-        mock_ocr.return_value = "text"
+        mock_ocr.return_value = OCRResult("text", "text")
         mock_predict.return_value = "letter"
         mock_extract.return_value = {}
         
@@ -199,6 +279,39 @@ class TestLightweightAPI(TestCase):
         assert response.data['document_id'] == "test-uuid-123"
         mock_uuid.assert_called_once()
     
+    @patch('api.views.extract_ocr_result', return_value=OCRResult("Dear John", "dear john"))
+    @patch('api.views.predict_document_type')
+    @patch('api.views.store_document_in_chromadb')
+    def test_process_document_returns_existing(self, mock_store, mock_predict, _ocr):
+        """Test that re-uploading stored text returns the stored record"""
+        from documents.chroma_client import content_document_id
+
+        doc_id = content_document_id("dear john")
+        self.mock_lookup.return_value = {
+            "document_id": doc_id, "text": "dear john",
+            "metadata": {"document_type": "letter", "recipient": "John Doe, Jane Doe"}
+        }
+
+        response = self.client.post(self.url, {'file': SimpleUploadedFile("a.jpg", b"x", content_type="image/jpeg")})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            "document_id": doc_id, "document_type": "letter",
+            "entities": {"recipient": ["John Doe", "Jane Doe"]}, "duplicate": True
+        }
+        self.mock_lookup.assert_called_once_with(doc_id)
+        mock_predict.assert_not_called()
+        mock_store.assert_not_called()
+
+        mock_predict.return_value = "letter"
+        with patch('api.views.extract_entities', return_value={}):
+            response = self.client.post(
+                self.url, {'file': SimpleUploadedFile("a.jpg", b"x", content_type="image/jpeg"), 'reprocess': 'true'}
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['document_id'] == doc_id
+        assert mock_store.call_args.kwargs['doc_id'] == doc_id
+
     def test_clean_text_preview_function(self):
         """Test the clean_text_preview utility function"""
         from api.views import clean_text_preview
@@ -222,4 +335,89 @@ class TestLightweightAPI(TestCase):
         # Test long text truncation
         long_text = " ".join(["word" for _ in range(100)])
         result = clean_text_preview(long_text, max_length=50)
-        assert len(result) <= 53  # 50 + "..."
\ No newline at end of file
+        assert len(result) <= 53  # 50 + "..."
+
+class TestLightweightFindSimilarAPI(TestCase):
+
+    def setUp(self):
+        from documents.search import clear_search_cache
+
+        clear_search_cache()
+        self.client = APIClient()
+        self.url = '/api/find-similar/'
+        self.results = {
+            "ids": [["a"]],
+            "documents": [["Invoice from Acme Inc for services"]],
+            "metadatas": [[{"document_type": "invoice", "vendor": "Acme Inc"}]],
+            "distances": [[0.2]],
+        }
+
+    def _upload(self, **data):
+        data['file'] = SimpleUploadedFile("scan.jpg", b"fake image content", content_type="image/jpeg")
+        return self.client.post(self.url, data)
+
+    @patch('api.views.store_document_in_chromadb')
+    @patch('api.views.predict_document_type')
+    @patch('documents.search.search_by_embedding')
+    @patch('api.views.embed_texts', return_value=[[0.1, 0.2]])
+    @patch('api.views.extract_ocr_result', return_value=OCRResult("Invoice Acme", "invoice acme"))
+    def test_probe_does_not_classify_or_store(self, _ocr, mock_embed, mock_search, mock_predict, mock_store):
+        mock_search.return_value = self.results
+
+        first = self._upload()
+        second = self._upload()
+
+        assert first.status_code == status.HTTP_200_OK
+        neighbor = first.data['neighbors'][0]
+        assert neighbor['document_id'] == "a"
+        assert neighbor['distance'] == 0.2
+        assert neighbor['entities'] == {"vendor": "Acme Inc"}
+        assert 'text' not in neighbor and neighbor['preview'].startswith("Invoice from Acme")
+        assert first.data['cached'] is False and second.data['cached'] is True
+        assert 'document_type' not in first.data
+        mock_embed.assert_called_with(["invoice acme"])
+        mock_search.assert_called_once()
+        mock_predict.assert_not_called()
+        mock_store.assert_not_called()
+
+    @patch('api.views.store_document_in_chromadb')
+    @patch('api.views.extract_entities', return_value={"vendor": ["Acme Inc"]})
+    @patch('api.views.predict_document_type', return_value="invoice")
+    @patch('documents.search.search_by_embedding')
+    @patch('api.views.embed_texts', return_value=[[0.1, 0.2]])
+    @patch('api.views.extract_ocr_result', return_value=OCRResult("Invoice Acme", "invoice acme"))
+    def test_store_reuses_embedding(self, _ocr, mock_embed, mock_search, _predict, _extract, mock_store):
+        mock_search.return_value = self.results
+
+        response = self._upload(store='true')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['document_type'] == "invoice"
+        assert response.data['entities'] == {"vendor": ["Acme Inc"]}
+        mock_embed.assert_called_once()
+        assert mock_store.call_args.kwargs['embedding'] == [0.1, 0.2]
+        assert mock_store.call_args.kwargs['doc_id'] == response.data['document_id']
+
+    def test_bad_requests(self):
+        assert self.client.post(self.url).status_code == status.HTTP_400_BAD_REQUEST
+        assert self._upload(top_k='lots').status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_uploads_named_by_content_hash(self):
+        import os
+
+        from api.views import discard_upload, save_upload
+
+        def upload(content):
+            return save_upload(SimpleUploadedFile("same-name.JPG", content, content_type="image/jpeg"))
+
+        first, again, other = upload(b"one"), upload(b"one"), upload(b"two")
+        try:
+            assert os.path.basename(first) == os.path.basename(again)
+            assert os.path.basename(first) != os.path.basename(other)
+            assert first.endswith(".jpg") and first != again
+            with open(first, 'rb') as f:
+                assert f.read() == b"one"
+        finally:
+            for path in (first, again, other):
+                discard_upload(path)
+        assert not os.path.exists(os.path.dirname(first))
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from documents.cache import LRUCache, text_hash
+
+
+class TestLightweightCache:
+
+    def test_lru_eviction_and_stats(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "a" becomes most recent
+        cache.put("c", 3)           # evicts "b"
+
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 1, "size": 2, "max_size": 2}
+
+    def test_zero_size_disables(self):
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_clear_resets(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert cache.stats()["hits"] == 0
+        assert len(cache) == 0
+
+    def test_text_hash_stable(self):
+        assert text_hash("abc") == text_hash("abc")
+        assert text_hash("abc") != text_hash("abd")
+
+    def test_ttl_expires_entries(self):
+        cache = LRUCache(2, ttl=10)
+        with patch('documents.cache.time.monotonic', return_value=100.0):
+            cache.put("a", 1)
+        with patch('documents.cache.time.monotonic', return_value=109.0):
+            assert cache.get("a") == 1
+        with patch('documents.cache.time.monotonic', return_value=110.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
@@ -7,7 +7,7 @@ from documents.chroma_client import query_similar_documents, store_document_in_c
 
 class TestChromaClient:
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     @patch('documents.chroma_client.logger')
     def test_store_document_success(self, mock_logger, mock_collection):
         """Test successful document storage in ChromaDB"""
@@ -18,7 +18,7 @@ class TestChromaClient:
         
         store_document_in_chromadb(doc_id, text, document_type, entities)
         
-        mock_collection.add.assert_called_once_with(
+        mock_collection.upsert.assert_called_once_with(
             ids=[doc_id],
             documents=[text],
             metadatas=[{
@@ -29,7 +29,7 @@ class TestChromaClient:
         )
         mock_logger.info.assert_called()
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     @patch('documents.chroma_client.logger')
     def test_store_document_with_complex_entities(self, mock_logger, mock_collection):
         """Test document storage with complex entity structures"""
@@ -51,17 +51,17 @@ class TestChromaClient:
             "date": "2024-01-15"
         }
         
-        mock_collection.add.assert_called_once_with(
+        mock_collection.upsert.assert_called_once_with(
             ids=[doc_id],
             documents=[text],
             metadatas=[expected_metadata]
         )
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     @patch('documents.chroma_client.logger')
     def test_store_document_error(self, mock_logger, mock_collection):
         """Test document storage with error"""
-        mock_collection.add.side_effect = Exception("ChromaDB error")
+        mock_collection.upsert.side_effect = Exception("ChromaDB error")
         
         doc_id = "test-doc-error"
         text = "Test text"
@@ -72,7 +72,7 @@ class TestChromaClient:
         
         mock_logger.error.assert_called()
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     @patch('documents.chroma_client.logger')
     def test_query_similar_documents_success(self, mock_logger, mock_collection):
         """Test successful document query"""
@@ -93,7 +93,7 @@ class TestChromaClient:
         assert results == mock_results
         mock_logger.info.assert_called()
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     @patch('documents.chroma_client.logger')
     def test_query_similar_documents_error(self, mock_logger, mock_collection):
         """Test document query with error"""
@@ -105,7 +105,7 @@ class TestChromaClient:
         assert results == {}
         mock_logger.error.assert_called()
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     def test_query_similar_documents_default_params(self, mock_collection):
         """Test query with default parameters"""
         mock_collection.query.return_value = {"results": []}
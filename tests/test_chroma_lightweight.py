@@ -17,15 +17,381 @@ from documents.chroma_client import query_similar_documents, store_document_in_c
 
 class TestLightweightChroma:
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     def test_store_document_in_chromadb(self, mock_collection):
         store_document_in_chromadb("test-id", "test text", "letter", {"name": ["John"]})
-        mock_collection.add.assert_called_once()
+        mock_collection.upsert.assert_called_once()
     
-    @patch('documents.chroma_client.collection')
+    @patch('documents.chroma_client._collection')
     def test_query_similar_documents(self, mock_collection):
         mock_collection.query.return_value = {"documents": [["test"]], "metadatas": [[{"type": "letter"}]]}
         
         results = query_similar_documents("query text", top_k=5)
         assert "documents" in results
-        mock_collection.query.assert_called_once()
\ No newline at end of file
+        mock_collection.query.assert_called_once()
+    @patch('documents.chroma_client._collection')
+    def test_store_document_with_precomputed_embedding(self, mock_collection):
+        store_document_in_chromadb("test-id", "test text", "letter", {}, embedding=[0.1, 0.2])
+        assert mock_collection.upsert.call_args.kwargs["embeddings"] == [[0.1, 0.2]]
+
+    @patch('documents.chroma_client._embedding_func')
+    def test_embed_texts(self, mock_embed):
+        from documents.chroma_client import embed_texts
+
+        mock_embed.return_value = [[1, 2], [3, 4]]
+        assert embed_texts(["a", "b"]) == [[1.0, 2.0], [3.0, 4.0]]
+
+    @patch('documents.chroma_client._collection')
+    def test_query_by_embedding(self, mock_collection):
+        from documents.chroma_client import query_by_embedding
+
+        mock_collection.query.return_value = {"ids": [["a"]]}
+        assert query_by_embedding([0.1], top_k=3) == {"ids": [["a"]]}
+        assert mock_collection.query.call_args.kwargs["query_embeddings"] == [[0.1]]
+
+        mock_collection.query.side_effect = Exception("down")
+        assert query_by_embedding([0.1]) == {}
+
+    def test_flatten_metadata(self):
+        from documents.chroma_client import flatten_metadata
+
+        assert flatten_metadata("invoice", {"vendor": ["A", "B"], "division": 3}) == {
+            "document_type": "invoice", "vendor": "A, B", "division": "3"
+        }
+
+    @patch('documents.chroma_client._collection')
+    def test_page_and_update_metadata(self, mock_collection):
+        from documents.chroma_client import get_documents_page, update_document_metadata
+
+        get_documents_page(100, 50)
+        assert mock_collection.get.call_args.kwargs == {
+            "offset": 100, "limit": 50, "include": ["documents", "metadatas"]
+        }
+
+        update_document_metadata([], [])
+        mock_collection.update.assert_not_called()
+        update_document_metadata(["a"], [{"vendor": None}])
+        mock_collection.update.assert_called_once_with(ids=["a"], metadatas=[{"vendor": None}])
+
+    def test_client_and_collection_created_lazily_once(self):
+        import threading
+
+        import documents.chroma_client as chroma_client
+
+        chromadb = sys.modules['chromadb']
+        chromadb.PersistentClient.reset_mock()
+        with patch.multiple(chroma_client, _client=None, _collection=None, _embedding_func=None):
+            assert not chromadb.PersistentClient.called
+
+            threads = [threading.Thread(target=chroma_client.get_collection) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            chromadb.PersistentClient.assert_called_once_with(path=chroma_client.CHROMA_PATH)
+            create = chromadb.PersistentClient.return_value.get_or_create_collection
+            create.assert_called_once()
+            assert chroma_client.get_collection() is create.return_value
+
+    @patch('documents.chroma_client._embedding_func')
+    @patch('documents.chroma_client._collection')
+    def test_warmup_loads_collection_and_model(self, mock_collection, mock_embed):
+        from documents.chroma_client import warmup
+
+        warmup()
+        mock_embed.assert_called_once_with(["warmup"])
+
+    @patch('documents.chroma_client._embedding_func')
+    @patch('documents.chroma_client._collection')
+    def test_store_documents_in_batches(self, mock_collection, mock_embed):
+        from documents.chroma_client import store_documents_in_chromadb
+
+        mock_embed.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        records = [
+            {"doc_id": f"d{i}", "text": "x" * i, "document_type": "memo", "entities": {"author": ["A"]}}
+            for i in range(5)
+        ]
+        records[1]["embedding"] = [9.0]
+
+        assert store_documents_in_chromadb(records, batch_size=3) == []
+
+        assert mock_collection.upsert.call_count == 2
+        first = mock_collection.upsert.call_args_list[0].kwargs
+        assert first["ids"] == ["d0", "d1", "d2"]
+        assert first["embeddings"] == [[0.0], [9.0], [2.0]]
+        assert first["metadatas"][0] == {"document_type": "memo", "author": "A"}
+        # One embedding call per batch, precomputed vectors skipped
+        assert [c.args[0] for c in mock_embed.call_args_list] == [["", "xx"], ["xxx", "xxxx"]]
+
+    @patch('documents.chroma_client._embedding_func')
+    @patch('documents.chroma_client._collection')
+    def test_store_documents_reports_failures_per_record(self, mock_collection, mock_embed):
+        from documents.chroma_client import store_documents_in_chromadb
+
+        mock_embed.side_effect = lambda texts: [[1.0] for _ in texts]
+
+        def add(ids, **kwargs):
+            if "bad" in ids:
+                raise ValueError("duplicate id")
+        mock_collection.upsert.side_effect = add
+
+        records = [{"doc_id": i, "text": i, "document_type": "memo", "entities": {}} for i in ("a", "bad", "c")]
+        records.append({"doc_id": "no-text", "document_type": "memo"})
+
+        failures = store_documents_in_chromadb(records, batch_size=10)
+
+        assert failures[0][0] == "no-text"
+        assert failures[1] == ("bad", "duplicate id")
+        stored = [c.kwargs["ids"] for c in mock_collection.upsert.call_args_list[1:] if "bad" not in c.kwargs["ids"]]
+        assert stored == [["a"], ["c"]]
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection (distance = squared L2)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = {}
+        self.queries = 0
+
+    def add(self, ids, documents, metadatas, embeddings=None):
+        for i, doc_id in enumerate(ids):
+            self.rows[doc_id] = (documents[i], dict(metadatas[i]), list(embeddings[i]) if embeddings else [0.0])
+
+    upsert = add
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, ids=None, offset=0, limit=None, include=()):
+        keys = [k for k in self.rows if ids is None or k in ids][offset:None if limit is None else offset + limit]
+        return {
+            "ids": keys,
+            "documents": [self.rows[k][0] for k in keys],
+            "metadatas": [self.rows[k][1] for k in keys],
+            "embeddings": [self.rows[k][2] for k in keys],
+        }
+
+    def query(self, query_embeddings, n_results, include=(), where=None):
+        self.queries += 1
+        query = query_embeddings[0]
+        scored = sorted(
+            (sum((a - b) ** 2 for a, b in zip(query, row[2])), k) for k, row in self.rows.items()
+        )[:n_results]
+        return {
+            "ids": [[k for _, k in scored]],
+            "documents": [[self.rows[k][0] for _, k in scored]],
+            "metadatas": [[self.rows[k][1] for _, k in scored]],
+            "distances": [[d for d, _ in scored]],
+        }
+
+    def update(self, ids, metadatas):
+        for doc_id, metadata in zip(ids, metadatas):
+            merged = {**self.rows[doc_id][1], **metadata}
+            self.rows[doc_id] = (self.rows[doc_id][0], {k: v for k, v in merged.items() if v is not None},
+                                 self.rows[doc_id][2])
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id)
+
+
+class FakeClient:
+    def __init__(self):
+        self.collections = {}
+
+    def get_or_create_collection(self, name, embedding_function=None):
+        return self.collections.setdefault(name, FakeCollection(name))
+
+    def list_collections(self):
+        return list(self.collections)
+
+
+@pytest.fixture
+def partitioned(monkeypatch):
+    import documents.chroma_client as chroma_client
+
+    client = FakeClient()
+    monkeypatch.setenv("CHROMA_PARTITION_KEY", "document_type")
+    monkeypatch.setattr(chroma_client, "_client", client)
+    monkeypatch.setattr(chroma_client, "_collection", None)
+    monkeypatch.setattr(chroma_client, "_partitions", {})
+    monkeypatch.setattr(chroma_client, "_embedding_func", lambda texts: [[float(len(t))] for t in texts])
+    return client
+
+
+def _record(doc_id, document_type, vector):
+    return {"doc_id": doc_id, "text": doc_id, "document_type": document_type, "entities": {}, "embedding": [vector]}
+
+
+class TestLightweightPartitionedChroma:
+
+    def test_partition_collection_name(self):
+        from documents.chroma_client import partition_collection_name
+
+        assert partition_collection_name("news_article") == "documents__news_article"
+        assert partition_collection_name("a b/c") == "documents__a_b_c"
+        assert partition_collection_name(None) == "documents__other"
+
+    def test_writes_routed_by_partition_key(self, partitioned):
+        from documents.chroma_client import list_partitions, store_document_in_chromadb, store_documents_in_chromadb
+
+        assert store_documents_in_chromadb([_record("i1", "invoice", 1.0), _record("m1", "memo", 2.0)]) == []
+        store_document_in_chromadb("i2", "i2", "invoice", {}, embedding=[3.0])
+
+        assert list_partitions() == ["documents__invoice", "documents__memo"]
+        assert set(partitioned.collections["documents__invoice"].rows) == {"i1", "i2"}
+        assert "documents" not in partitioned.collections
+
+    def test_queries_routed_or_fanned_out(self, partitioned):
+        from documents.chroma_client import query_by_embedding, search_by_embedding, store_documents_in_chromadb
+
+        store_documents_in_chromadb([_record("i1", "invoice", 1.0), _record("m1", "memo", 2.0),
+                                     _record("l1", "letter", 5.0)])
+
+        merged = search_by_embedding([1.8], top_k=2)
+        assert merged["ids"] == [["m1", "i1"]]
+        assert merged["metadatas"][0][0]["document_type"] == "memo"
+
+        routed = search_by_embedding([1.8], top_k=2, where={"$and": [
+            {"document_type": {"$in": ["invoice", "unknown"]}}, {"vendor": "Acme"}
+        ]})
+        assert routed["ids"] == [["i1"]]
+        assert partitioned.collections["documents__memo"].queries == 1
+        assert "documents__unknown" not in partitioned.collections
+
+        assert query_by_embedding([4.0], top_k=1)["ids"] == [["l1"]]
+
+    def test_paging_and_updates_span_partitions(self, partitioned):
+        from documents.chroma_client import get_documents_page, store_documents_in_chromadb, update_document_metadata
+
+        store_documents_in_chromadb([_record("i1", "invoice", 1.0), _record("i2", "invoice", 1.0),
+                                     _record("m1", "memo", 2.0)])
+
+        assert get_documents_page(0, 2)["ids"] == ["i1", "i2"]
+        assert get_documents_page(1, 2)["ids"] == ["i2", "m1"]
+        assert get_documents_page(3, 2)["ids"] == []
+
+        update_document_metadata(["m1", "i1"], [{"author": "A"}, {"vendor": "V"}])
+        assert partitioned.collections["documents__memo"].rows["m1"][1]["author"] == "A"
+        assert partitioned.collections["documents__invoice"].rows["i1"][1]["vendor"] == "V"
+
+    def test_repartition_moves_documents(self, partitioned, capsys):
+        from django.core.management import call_command
+
+        legacy = partitioned.get_or_create_collection("documents")
+        legacy.add(["i1", "m1"], ["i1", "m1"], [{"document_type": "invoice"}, {"document_type": "memo"}], [[1.0], [2.0]])
+        misplaced = partitioned.get_or_create_collection("documents__invoice")
+        misplaced.add(["m2"], ["m2"], [{"document_type": "memo"}], [[3.0]])
+
+        call_command('repartition_collection', '--batch-size', '1')
+
+        assert legacy.rows == {}
+        assert set(partitioned.collections["documents__invoice"].rows) == {"i1"}
+        assert set(partitioned.collections["documents__memo"].rows) == {"m1", "m2"}
+        assert "Moved 3 documents" in capsys.readouterr().out
+
+
+class TestLightweightContentIds:
+
+    def test_content_document_id(self, monkeypatch):
+        from documents.chroma_client import content_document_id, new_document_id
+
+        monkeypatch.delenv("DOCUMENT_ID_MODE", raising=False)
+        assert new_document_id("same text") == new_document_id("same text") == content_document_id("same text")
+        assert new_document_id("same text") != new_document_id("other text")
+
+        monkeypatch.setenv("DOCUMENT_ID_MODE", "uuid")
+        assert new_document_id("same text") != new_document_id("same text")
+
+    def test_unflatten_metadata(self):
+        from documents.chroma_client import flatten_metadata, unflatten_metadata
+
+        metadata = flatten_metadata("invoice", {"vendor": ["A", "B"], "invoice_number": ["42"]})
+        assert unflatten_metadata(metadata) == ("invoice", {"vendor": ["A", "B"], "invoice_number": ["42"]})
+
+    @patch('documents.chroma_client._embedding_func')
+    @patch('documents.chroma_client._collection')
+    def test_repeated_ids_in_one_batch_collapse(self, mock_collection, mock_embed):
+        from documents.chroma_client import store_documents_in_chromadb
+
+        mock_embed.side_effect = lambda texts: [[1.0] for _ in texts]
+        records = [{"doc_id": "same", "text": t, "document_type": "memo", "entities": {}} for t in ("old", "new")]
+
+        assert store_documents_in_chromadb(records) == []
+        assert mock_collection.upsert.call_args.kwargs["ids"] == ["same"]
+        assert mock_collection.upsert.call_args.kwargs["documents"] == ["new"]
+
+    def test_get_document(self, partitioned):
+        from documents.chroma_client import get_document, store_document_in_chromadb
+
+        store_document_in_chromadb("m1", "memo text", "memo", {"author": ["A"]}, embedding=[1.0])
+
+        assert get_document("m1") == {
+            "document_id": "m1", "text": "memo text", "metadata": {"document_type": "memo", "author": "A"}
+        }
+        assert get_document("missing") is None
+
+    def test_dedupe_collection(self, partitioned, monkeypatch, capsys):
+        from django.core.management import call_command
+
+        from documents.chroma_client import content_document_id
+
+        monkeypatch.delenv("CHROMA_PARTITION_KEY")
+        collection = partitioned.get_or_create_collection("documents")
+        collection.add(["a", "b", "c", "d"], ["same", "same", "other", "same"],
+                       [{"document_type": "memo"}] * 4, [[1.0], [1.0], [2.0], [1.0]])
+
+        call_command('dedupe_collection', '--batch-size', '2', '--dry-run')
+        assert len(collection.rows) == 4
+        assert "Would remove 2 duplicates of 4 documents" in capsys.readouterr().out
+
+        call_command('dedupe_collection', '--batch-size', '2')
+        assert set(collection.rows) == {content_document_id("same"), content_document_id("other")}
+        assert "Removed 2 duplicates" in capsys.readouterr().out
+
+    def test_dedupe_collection_keeps_ids_in_uuid_mode(self, partitioned, monkeypatch):
+        from django.core.management import call_command
+
+        monkeypatch.delenv("CHROMA_PARTITION_KEY")
+        monkeypatch.setenv("DOCUMENT_ID_MODE", "uuid")
+        collection = partitioned.get_or_create_collection("documents")
+        collection.add(["a", "b"], ["same", "same"], [{"document_type": "memo"}] * 2, [[1.0], [1.0]])
+
+        call_command('dedupe_collection')
+        assert set(collection.rows) == {"a"}
+
+
+class TestLightweightPassages:
+
+    def test_long_documents_stored_and_queried_as_passages(self, partitioned, monkeypatch):
+        from documents.chroma_client import query_by_embedding, search_by_embedding, store_documents_in_chromadb
+
+        monkeypatch.delenv("CHROMA_PARTITION_KEY")
+        monkeypatch.setenv("PASSAGE_MAX_WORDS", "4")
+        monkeypatch.setenv("PASSAGE_OVERLAP_WORDS", "0")
+        embed_calls = []
+
+        def embed(texts):
+            embed_calls.append(list(texts))
+            return [[float(len(t))] for t in texts]
+        monkeypatch.setattr("documents.chroma_client._embedding_func", embed)
+
+        records = [
+            {"doc_id": "long", "text": "one two three four. five six.", "document_type": "report", "entities": {}},
+            {"doc_id": "short", "text": "tiny", "document_type": "memo", "entities": {}},
+        ]
+        assert store_documents_in_chromadb(records) == []
+
+        rows = partitioned.collections["documents"].rows
+        assert set(rows) == {"long", "long#1", "short"}
+        assert rows["long#1"][1] == {"document_type": "report", "parent_id": "long", "passage": 1}
+        assert len(embed_calls) == 1 and len(embed_calls[0]) == 3
+
+        # "five six." (9 chars) is the closest passage; its document is returned once
+        result = search_by_embedding([9.0], top_k=2)
+        assert result["ids"] == [["long", "short"]]
+        assert result["documents"][0][0] == "five six."
+        assert result["metadatas"][0][0] == {"document_type": "report"}
+        assert query_by_embedding([9.0], top_k=1)["ids"] == [["long"]]
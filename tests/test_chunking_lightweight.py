@@ -0,0 +1,42 @@
+from documents.chunking import aggregate_hits, passage_id, split_passages
+
+
+def _sentence(n, words=10):
+    return " ".join(f"s{n}w{i}" for i in range(words - 1)) + f" end{n}."
+
+
+class TestLightweightChunking:
+
+    def test_short_text_is_one_passage(self):
+        assert split_passages("A short text.", max_words=50) == ["A short text."]
+
+    def test_sentences_packed_with_overlap(self):
+        text = " ".join(_sentence(n) for n in range(5))
+
+        passages = split_passages(text, max_words=25, overlap=5)
+
+        assert all(len(p.split()) <= 25 for p in passages)
+        assert passages[0].endswith("end1.")
+        # Next passage repeats the tail of the previous one
+        assert passages[1].split()[:5] == passages[0].split()[-5:]
+        assert "end4." in passages[-1]
+        assert set(text.split()) <= set(" ".join(passages).split())
+
+    def test_long_sentence_cut_into_windows(self):
+        text = " ".join(f"w{i}" for i in range(25))
+
+        passages = split_passages(text, max_words=10, overlap=0)
+
+        assert [len(p.split()) for p in passages] == [10, 10, 5]
+
+    def test_passage_id(self):
+        assert passage_id("doc", 0) == "doc"
+        assert passage_id("doc", 2) == "doc#2"
+
+    def test_aggregate_hits(self):
+        ids = ["a", "a#1", "b", "b#1", "b#2", "c"]
+        metadatas = [{}, {"parent_id": "a"}, {"parent_id": "b"}, {"parent_id": "b"}, {"parent_id": "b"}, {}]
+        distances = [0.5, 0.2, 0.3, 0.35, 0.4, 1.0]
+
+        assert aggregate_hits(ids, metadatas, distances, "max") == [1, 2, 5]
+        assert aggregate_hits(ids, metadatas, distances, "sum") == [2, 1, 5]
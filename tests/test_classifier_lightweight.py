@@ -85,4 +85,146 @@ class TestLightweightClassifier:
     @patch('documents.classifier.os.path.exists', return_value=False)
     def test_predict_no_model(self, mock_exists):
         with pytest.raises(FileNotFoundError):
-            predict_document_type("sample text")
\ No newline at end of file
+            predict_document_type("sample text")
+    def test_cascade_uses_fast_model_when_confident(self):
+        """Confident stage-1 predictions should skip the full model"""
+        import numpy as np
+
+        from documents.classifier import CascadeClassifier
+
+        fast = MagicMock()
+        fast.classes_ = np.array(["invoice", "letter"])
+        fast.predict_proba.return_value = np.array([[0.9, 0.1], [0.55, 0.45]])
+        full = MagicMock()
+        full.predict.return_value = ["letter"]
+
+        cascade = CascadeClassifier(fast, full, prefix_chars=5, margin=0.3)
+        labels, stages = cascade.predict_with_stages(["invoice total due", "dear sir"])
+
+        assert labels == ["invoice", "letter"]
+        assert stages == [True, False]
+        fast.predict_proba.assert_called_once_with(["invoi", "dear "])
+        full.predict.assert_called_once_with(["dear sir"])
+
+    def test_cascade_empty_input(self):
+        """The cascade should handle empty batches"""
+        from documents.classifier import CascadeClassifier
+
+        cascade = CascadeClassifier(MagicMock(), MagicMock())
+        assert cascade.predict([]) == []
+
+    @patch('documents.classifier.load_documents_from_folders')
+    @patch('documents.classifier.joblib.dump')
+    @patch('documents.classifier.Pipeline')
+    @patch('documents.classifier.train_test_split')
+    @patch('documents.classifier.build_cascade')
+    def test_train_model_cascade(self, mock_cascade, mock_split, mock_pipeline, mock_dump, mock_load):
+        mock_load.return_value = (["text1", "text2"], ["invoice", "letter"])
+        mock_split.return_value = (["text1"], ["text2"], ["invoice"], ["letter"])
+        mock_cascade.return_value.predict_with_stages.return_value = (["letter"], [True])
+
+        train_and_save_model("model.joblib", cascade=True)
+        mock_cascade.assert_called_once()
+        mock_dump.assert_called_once_with(mock_cascade.return_value, "model.joblib")
+
+    @patch('documents.classifier.load_documents_from_folders', return_value=([], []))
+    def test_search_no_data(self, mock_load):
+        from documents.classifier import search_and_save_model
+
+        assert search_and_save_model("model.joblib") == []
+
+    @patch('documents.classifier.load_documents_from_folders')
+    @patch('documents.classifier.train_test_split')
+    @patch('documents.classifier.GridSearchCV')
+    @patch('documents.classifier.StratifiedKFold')
+    @patch('documents.classifier.ParameterGrid', return_value=[{}, {}, {}])
+    @patch('documents.classifier._build_pipeline')
+    @patch('documents.classifier._measure_latency', side_effect=[0.004, 0.001, 0.0005])
+    @patch('documents.classifier._model_size', return_value=1024)
+    @patch('documents.classifier.joblib.dump')
+    def test_search_picks_fastest_within_tolerance(self, mock_dump, mock_size, mock_latency, mock_build,
+                                                   mock_grid, mock_kfold, mock_search, mock_split, mock_load):
+        """The fastest candidate within the accuracy tolerance should be saved"""
+        from documents.classifier import search_and_save_model
+
+        mock_load.return_value = (["a", "b", "c", "d"], ["x", "y", "x", "y"])
+        mock_split.return_value = (["a", "b", "c"], ["d"], ["x", "y", "x"], ["y"])
+        mock_search.return_value.cv_results_ = {
+            'params': [{'clf__C': 1}, {'clf__C': 2}, {'clf__C': 3}],
+            'mean_test_score': [0.95, 0.945, 0.80],
+        }
+        models = [MagicMock(name=f"model{i}") for i in range(3)]
+        mock_build.return_value.set_params.side_effect = models
+
+        candidates = search_and_save_model("model.joblib", tolerance=0.01)
+
+        selected = [c for c in candidates if c['selected']]
+        assert selected[0]['params'] == {'clf__C': 2}
+        mock_dump.assert_called_once_with(models[1], "model.joblib")
+        assert [c['accuracy'] for c in candidates] == [0.95, 0.945, 0.80]
+
+    @patch('documents.classifier.model_version', return_value="v1")
+    @patch('documents.classifier._predict_uncached', return_value="memo")
+    def test_prediction_cache_hits_on_normalized_text(self, mock_predict, mock_version):
+        """Re-uploads that clean to the same text should not be re-classified"""
+        from documents.classifier import clear_classification_cache, get_classification_cache_stats
+
+        clear_classification_cache()
+        assert predict_document_type("Quarterly   MEMO text") == "memo"
+        assert predict_document_type("quarterly memo text") == "memo"
+
+        mock_predict.assert_called_once()
+        stats = get_classification_cache_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    @patch('documents.classifier.model_version')
+    @patch('documents.classifier._predict_uncached')
+    def test_prediction_cache_invalidated_by_model_change(self, mock_predict, mock_version):
+        """A new model version should bypass previously cached labels"""
+        from documents.classifier import clear_classification_cache
+
+        clear_classification_cache()
+        mock_version.return_value = "v1"
+        mock_predict.return_value = "memo"
+        predict_document_type("cache invalidation text")
+
+        mock_version.return_value = "v2"
+        mock_predict.return_value = "letter"
+        assert predict_document_type("cache invalidation text") == "letter"
+        assert mock_predict.call_count == 2
+
+    @patch('documents.classifier.model_version', return_value="v1")
+    @patch('documents.classifier.request_inference')
+    def test_server_predictions_bypass_local_cache(self, mock_request, mock_version):
+        """Labels from the inference server must not be cached under the local file's version"""
+        from documents.classifier import clear_classification_cache, predict_cached
+
+        clear_classification_cache()
+        mock_request.return_value = ["memo"]
+        assert predict_document_type("swapped model text") == "memo"
+        mock_request.return_value = ["letter"]  # the server loaded another model
+        assert predict_document_type("swapped model text") == "letter"
+
+        model = MagicMock()
+        model.predict.side_effect = lambda texts: ["invoice"] * len(texts)
+        assert predict_cached(model, ["a", "b"], "s1") == ["invoice", "invoice"]
+        assert predict_cached(model, ["b", "c"], "s1") == ["invoice", "invoice"]
+        assert [c.args[0] for c in model.predict.call_args_list] == [["a", "b"], ["c"]]
+
+    def test_classification_cache_disk_layer(self, tmp_path):
+        """Disk entries should survive a fresh cache and old versions get pruned"""
+        from documents.classifier import ClassificationCache
+
+        ClassificationCache(10, disk_dir=str(tmp_path)).put("abcd", "v1", "invoice")
+
+        fresh = ClassificationCache(10, disk_dir=str(tmp_path))
+        assert fresh.get("abcd", "v1") == "invoice"
+        assert fresh.stats()["disk_hits"] == 1
+
+        fresh.put("abcd", "v2", "letter")
+        assert not (tmp_path / "v1").exists()
+
+    def test_model_version_missing_file(self):
+        from documents.classifier import model_version
+
+        assert model_version("/nonexistent/model.joblib") is None
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from documents.embedding_cache import EmbeddingCache, get_embedding_cache
+from documents.inference import RemoteFirstEmbeddingFunction
+
+
+class TestLightweightEmbeddingCache:
+
+    def test_roundtrip_float32(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), namespace="all-MiniLM-L6-v2")
+        cache.put_many(["a", "b"], [[0.1, 0.2, 0.3], np.array([1.0, 2.0, 3.0])])
+
+        a, missing, b = cache.get_many(["a", "zzz", "b"])
+        assert missing is None
+        assert a.dtype == np.float32
+        np.testing.assert_allclose(a, [0.1, 0.2, 0.3], rtol=1e-6)
+        np.testing.assert_allclose(b, [1.0, 2.0, 3.0])
+        assert cache.stats() == {"hits": 2, "misses": 1, "size": 2}
+
+    def test_shared_between_instances_and_restarts(self, tmp_path):
+        writer = EmbeddingCache(str(tmp_path), namespace="m")
+        reader = EmbeddingCache(str(tmp_path), namespace="m")
+
+        writer.put_many(["x"], [[1.0, 2.0]])
+        np.testing.assert_allclose(reader.get_many(["x"])[0], [1.0, 2.0])
+
+        writer.put_many(["y", "x"], [[3.0, 4.0], [9.0, 9.0]])  # "x" already cached, kept
+        np.testing.assert_allclose(EmbeddingCache(str(tmp_path), namespace="m").get_many(["x", "y"]),
+                                   [[1.0, 2.0], [3.0, 4.0]])
+        assert writer.stats()["size"] == 2
+
+    def test_namespaces_are_separate(self, tmp_path):
+        EmbeddingCache(str(tmp_path), namespace="model-a").put_many(["x"], [[1.0]])
+        assert EmbeddingCache(str(tmp_path), namespace="model-b").get_many(["x"]) == [None]
+
+    def test_wrong_dimension_not_cached(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path))
+        cache.put_many(["x"], [[1.0, 2.0]])
+        cache.put_many(["y"], [[1.0, 2.0, 3.0]])
+        assert cache.get_many(["y"]) == [None]
+
+    def test_torn_row_is_dropped(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path))
+        cache.put_many(["x"], [[1.0, 2.0]])
+        with open(cache._vectors_path, "ab") as f:
+            f.write(b"\x00\x01")  # partial row from a crashed writer
+        cache.put_many(["y"], [[3.0, 4.0]])
+        np.testing.assert_allclose(EmbeddingCache(str(tmp_path)).get_many(["y"])[0], [3.0, 4.0])
+
+    @patch('documents.inference.request_inference', return_value=None)
+    def test_embedding_function_only_embeds_misses(self, mock_request, tmp_path):
+        model = MagicMock(side_effect=lambda texts: [[float(len(t)), 0.0] for t in texts])
+        func = RemoteFirstEmbeddingFunction(lambda: model, cache=EmbeddingCache(str(tmp_path)))
+
+        first = func(["aa", "bbb", "aa"])
+        second = func(["bbb", "c"])
+
+        assert [list(map(float, v)) for v in first] == [[2.0, 0.0], [3.0, 0.0], [2.0, 0.0]]
+        assert [list(map(float, v)) for v in second] == [[3.0, 0.0], [1.0, 0.0]]
+        assert [c.args[0] for c in model.call_args_list] == [["aa", "bbb"], ["c"]]
+
+    def test_get_embedding_cache_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("EMBEDDING_CACHE_DIR", raising=False)
+        assert get_embedding_cache("m") is None
+
+        monkeypatch.setenv("EMBEDDING_CACHE_DIR", str(tmp_path))
+        assert get_embedding_cache("sentence/model").directory == str(tmp_path / "sentence_model")
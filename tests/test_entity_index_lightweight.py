@@ -0,0 +1,125 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from documents.entity_index import (entity_facets, find_documents, index_entities, mirror_entities,
+                                    normalize_entity, remove_documents)
+from documents.models import EntityCount, EntityValue, IndexedDocument
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def indexed():
+    index_entities([
+        ("d1", "invoice", {"vendor": ["Acme Inc"], "PER": ["John Smith", "Jane Doe"]}),
+        ("d2", "invoice", {"vendor": ["ACME  inc."], "PER": ["Jane Doe"]}),
+        ("d3", "invoice", {"vendor": ["Globex"]}),
+        ("d4", "email", {"vendor": ["Acme Inc"], "PER": ["Jane Doe"]}),
+    ])
+
+
+class TestLightweightEntityIndex:
+
+    def test_normalize_entity(self):
+        assert normalize_entity("  ACME\n Inc. ") == "acme inc"
+
+    def test_find_documents(self, indexed):
+        assert find_documents({"vendor": "acme inc"}) == {"document_ids": ["d1", "d2", "d4"], "total": 3}
+        assert find_documents({"document_type": "invoice", "vendor": "Acme Inc"})["document_ids"] == ["d1", "d2"]
+        assert find_documents({"vendor": ["Globex", "Acme Inc"], "PER": "jane doe"})["document_ids"] == \
+            ["d1", "d2", "d4"]
+        assert find_documents({"document_type": "invoice"}, limit=1, offset=1) == {"document_ids": ["d2"],
+                                                                                    "total": 3}
+        with pytest.raises(ValueError):
+            find_documents({})
+        with pytest.raises(ValueError, match="Empty filter value"):
+            find_documents({"vendor": []})
+
+    def test_facets(self, indexed):
+        assert entity_facets("vendor") == [{"value": "Acme Inc", "count": 3}, {"value": "Globex", "count": 1}]
+        assert entity_facets("vendor", {"document_type": "invoice"})[0]["count"] == 2
+        assert entity_facets("vendor", {"document_type": ["invoice", "email"]})[0]["count"] == 3
+        assert entity_facets("PER", {"vendor": "Acme Inc", "document_type": "invoice"}) == [
+            {"value": "Jane Doe", "count": 2}, {"value": "John Smith", "count": 1}
+        ]
+        assert entity_facets("document_type") == [{"value": "invoice", "count": 3}, {"value": "email", "count": 1}]
+        assert entity_facets("vendor", limit=1) == [{"value": "Acme Inc", "count": 3}]
+
+    def test_reindex_and_remove_keep_counts_exact(self, indexed):
+        index_entities([("d1", "memo", {"vendor": ["Globex"]}), ("d1", "memo", {"vendor": ["Initech"]})])
+        assert IndexedDocument.objects.get(id="d1").document_type == "memo"
+        assert find_documents({"vendor": "Initech"})["document_ids"] == ["d1"]
+        assert entity_facets("document_type") == [{"value": "invoice", "count": 2}, {"value": "email", "count": 1},
+                                                  {"value": "memo", "count": 1}]
+        assert {row["value"]: row["count"] for row in entity_facets("PER")} == {"Jane Doe": 2}
+
+        remove_documents(["d2", "d4", "unknown"])
+        assert entity_facets("vendor") == [{"value": "Globex", "count": 1}, {"value": "Initech", "count": 1}]
+        assert not EntityValue.objects.filter(document_id="d2").exists()
+        for row in EntityCount.objects.filter(count__gt=0):
+            assert row.count == EntityValue.objects.filter(field=row.field, normalized=row.normalized, **(
+                {"document__document_type": row.document_type} if row.document_type else {})).count()
+
+    def test_mirror_only_when_enabled(self, monkeypatch):
+        mirror_entities([("d1", "memo", {"vendor": ["Acme"]})])
+        assert not IndexedDocument.objects.exists()
+
+        monkeypatch.setenv("ENTITY_INDEX", "1")
+        mirror_entities(iter([("d1", "memo", {"vendor": ["Acme"]})]))
+        assert find_documents({"vendor": "acme"})["document_ids"] == ["d1"]
+        with patch("documents.entity_index.index_entities", side_effect=RuntimeError("locked")):
+            mirror_entities([("d2", "memo", {})])  # logged, not raised
+
+    @patch("documents.chroma_client._store_batch", return_value=[("bad", "rejected")])
+    def test_bulk_store_mirrors_stored_records(self, _store, monkeypatch):
+        from documents.chroma_client import store_documents_in_chromadb
+
+        monkeypatch.setenv("ENTITY_INDEX", "1")
+        store_documents_in_chromadb([
+            {"doc_id": "good", "text": "t", "document_type": "invoice", "entities": {"vendor": ["Acme"]}},
+            {"doc_id": "bad", "text": "t", "document_type": "invoice", "entities": {"vendor": ["Acme"]}},
+        ])
+        assert find_documents({"vendor": "Acme"})["document_ids"] == ["good"]
+
+    def test_api(self, indexed, monkeypatch):
+        client = APIClient()
+        assert client.get('/api/entities/', {'vendor': 'Acme Inc'}).status_code == status.HTTP_400_BAD_REQUEST
+
+        monkeypatch.setenv("ENTITY_INDEX", "1")
+        response = client.get('/api/entities/', {'vendor': 'acme inc', 'document_type': 'invoice'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"document_ids": ["d1", "d2"], "total": 2}
+        assert client.get('/api/entities/', {'password': 'x'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get('/api/entities/', {'vendor': 'x', 'limit': 0}).status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.get('/api/entities/facets/', {'field': 'vendor', 'document_type': 'invoice'})
+        assert response.json() == {"field": "vendor", "values": [{"value": "Acme Inc", "count": 2},
+                                                                 {"value": "Globex", "count": 1}]}
+        assert client.get('/api/entities/facets/', {'field': 'nope'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_build_command_from_vector_store(self, tmp_path, monkeypatch):
+        import documents.chroma_client as chroma_client
+
+        monkeypatch.setenv("VECTOR_STORE", "numpy")
+        monkeypatch.setenv("PASSAGE_MAX_WORDS", "3")
+        monkeypatch.setattr(chroma_client, "NUMPY_STORE_PATH", str(tmp_path))
+        monkeypatch.setattr(chroma_client, "_client", None)
+        monkeypatch.setattr(chroma_client, "_collection", None)
+        monkeypatch.setattr(chroma_client, "_partitions", {})
+        monkeypatch.setattr(chroma_client, "_embedding_func", lambda texts: [[float(len(t)), 1.0] for t in texts])
+        chroma_client.store_document_in_chromadb("d1", "Invoice from Acme. Total due today.", "invoice",
+                                                 {"vendor": ["Acme Inc"]})
+        chroma_client.store_document_in_chromadb("d2", "Short memo", "memo", {"PER": ["Jane Doe", "Bob"]})
+
+        index_entities([("stale", "memo", {"PER": ["Bob"]})])
+        out = StringIO()
+        call_command("build_entity_index", "--clear", "--batch-size", "2", stdout=out)
+
+        assert "2 documents" in out.getvalue()
+        assert find_documents({"vendor": "acme inc"})["document_ids"] == ["d1"]
+        assert entity_facets("PER") == [{"value": "Bob", "count": 1}, {"value": "Jane Doe", "count": 1}]
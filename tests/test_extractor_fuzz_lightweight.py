@@ -0,0 +1,82 @@
+import logging
+import random
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from documents.extractor import ENTITY_MAPPING, _scan, extract_entities
+
+# Worst-case budget per KiB of text. The pre-`regex` ORG patterns needed
+# ~600-900 ms/KiB on these shapes; the bounded patterns stay around 2 ms/KiB.
+MAX_MS_PER_KB = 25.0
+
+ADVERSARIAL_INPUTS = {
+    "lowercase_words": "a " * 8192,
+    "capitalized_words": "Ab " * 5462,
+    "newline_words": "Ab\n" * 5462,
+    "single_long_word": "a" * 16384,
+    "digits": "1" * 16384,
+    "city_commas": "Ab, " * 4096,
+    "org_suffix_soup": "Acme Inc Corp " * 1170,
+    "initials": "A. " * 5462,
+    "percent_spaces": "1 " * 8192 + "x",
+    "date_fragments": "12/12/" * 2730,
+}
+
+
+def _ms_per_kb(content, document_type="unknown"):
+    start = time.perf_counter()
+    extract_entities(document_type, content, timeout=30)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms / (len(content) / 1024)
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+class TestLightweightExtractorFuzz:
+
+    @pytest.mark.parametrize("name", sorted(ADVERSARIAL_INPUTS))
+    def test_adversarial_inputs_bounded(self, name):
+        """Known catastrophic-backtracking shapes must stay linear"""
+        assert _ms_per_kb(ADVERSARIAL_INPUTS[name]) < MAX_MS_PER_KB
+
+    def test_random_ocr_garbage_bounded(self):
+        """Random OCR-like garbage across every document type stays within budget"""
+        rng = random.Random(1234)
+        alphabet = "aAbBzZ   \n\t,./%#-0123456789"
+        worst = 0.0
+        for document_type in list(ENTITY_MAPPING) + ["unknown"]:
+            content = "".join(rng.choice(alphabet) for _ in range(8192))
+            worst = max(worst, _ms_per_kb(content, document_type))
+        assert worst < MAX_MS_PER_KB
+
+    def test_cost_scales_linearly(self):
+        """Doubling the input should not quadruple the time"""
+        small = "Ab " * 4096
+        large = small * 4
+        assert _ms_per_kb(large) < _ms_per_kb(small) * 3 + 1.0
+
+    def test_timeout_keeps_partial_matches(self):
+        """A scan that exceeds its budget should return what it found so far"""
+        def finditer(content, timeout):
+            yield MagicMock(group=MagicMock(return_value="Acme Inc"))
+            raise TimeoutError("regex time out")
+
+        scanner = MagicMock(finditer=finditer)
+        matches, timed_out = _scan(scanner, "Acme Inc ...", timeout=0.1)
+
+        assert matches == ["Acme Inc"]
+        assert timed_out
+
+    def test_exhausted_budget_skips_scans(self):
+        """With no time left, extraction returns an empty result instead of hanging"""
+        with patch('documents.extractor.logger') as mock_logger:
+            result = extract_entities("letter", "John Smith at Acme Inc", timeout=0)
+        assert result == {}
+        mock_logger.warning.assert_called()
@@ -26,9 +26,10 @@ class TestLightweightExtractor:
     def test_extract_entities_misc(self):
         """Test miscellaneous extraction"""
         content = "Date: 12/25/2023 and project #1234-56"
-        result = extract_entities("letter", content)
+        result = extract_entities("invoice", content)
         # Should extract dates or project codes
         assert len(result) > 0
+        assert "12/25/2023" in result["invoice_number"]
     
     def test_extract_entities_empty_content(self):
         """Test extraction with empty content"""
@@ -109,4 +110,23 @@ class TestLightweightExtractor:
         # Should limit results to reasonable numbers
         for key, values in result.items():
             if values:
-                assert len(values) <= 10  # Based on limits in code
\ No newline at end of file
+                assert len(values) <= 10  # Based on limits in code
+
+    def test_extract_entities_skips_unmapped_categories(self):
+        """Categories without a slot for the document type should not be scanned"""
+        content = "John Smith from Acme Corp in Boston, MA paid invoice 123456"
+        result = extract_entities("budget", content)
+        assert set(result) <= {"budget_owner", "budget_code"}
+        assert "123456" in result["budget_code"]
+
+    def test_extract_entities_unknown_type_scans_all(self):
+        """Unknown document types keep raw tags for every category"""
+        content = "John Smith from Acme Corp in Boston, MA paid invoice 123456"
+        result = extract_entities("unknown_type", content)
+        assert {"PER", "ORG", "LOC", "MISC"} <= set(result)
+
+    def test_extract_entities_preserves_first_seen_order(self):
+        """Duplicates are dropped while keeping the order of first appearance"""
+        content = "Ann Lee met Bob Ray, then Ann Lee left"
+        result = extract_entities("letter", content)
+        assert result["recipient"][:2] == ["Ann Lee", "Bob Ray"]
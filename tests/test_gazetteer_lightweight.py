@@ -0,0 +1,100 @@
+import os
+import time
+from unittest.mock import patch
+
+from documents.gazetteer import (
+    GazetteerAutomaton,
+    get_gazetteer,
+    read_gazetteer_sources,
+    reset_gazetteer,
+)
+
+ENTRIES = [
+    ("Acme Corp", "ORG"),
+    ("New York", "LOC"),
+    ("New York City", "LOC"),
+    ("York", "LOC"),
+    ("Ann Lee", "PER"),
+    ("Lee", "PER"),
+]
+
+
+class TestLightweightGazetteer:
+
+    def test_find_case_insensitive_with_canonical_names(self):
+        automaton = GazetteerAutomaton(ENTRIES)
+        found = automaton.find("invoice from acme corp, new york city office. attn: ann lee")
+        assert found == {"ORG": ["Acme Corp"], "LOC": ["New York City"], "PER": ["Ann Lee"]}
+
+    def test_word_boundaries_required(self):
+        automaton = GazetteerAutomaton(ENTRIES)
+        assert automaton.find("yorkshire and newyork and leeward") == {}
+
+    def test_tag_filter(self):
+        automaton = GazetteerAutomaton(ENTRIES)
+        assert automaton.find("Acme Corp in York", tags=["LOC"]) == {"LOC": ["York"]}
+
+    def test_suffix_matches_via_failure_links(self):
+        """Entries that are suffixes of partially matched entries must still be found"""
+        automaton = GazetteerAutomaton([("New York Times", "ORG"), ("York City", "LOC"), ("Times", "ORG")])
+        assert automaton.find("new york city") == {"LOC": ["York City"]}
+        assert automaton.find("new york timesheet, the times") == {"ORG": ["Times"]}
+
+    def test_name_under_several_tags(self):
+        automaton = GazetteerAutomaton([("Washington", "LOC"), ("Washington", "ORG"), ("Acme", "ORG")])
+        assert automaton.find("Acme of Washington") == {"LOC": ["Washington"], "ORG": ["Acme", "Washington"]}
+        assert automaton.find("Washington", tags=["ORG"]) == {"ORG": ["Washington"]}
+
+    def test_match_time_independent_of_gazetteer_size(self):
+        text = "lorem ipsum acme corp dolor " * 400
+        small = GazetteerAutomaton(ENTRIES)
+        large = GazetteerAutomaton(ENTRIES + [(f"Vendor {i} Holdings", "ORG") for i in range(20000)])
+
+        def best(automaton):
+            times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                automaton.find(text)
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        assert best(large) < best(small) * 3 + 0.01
+
+    def test_save_load_round_trip(self, tmp_path):
+        path = str(tmp_path / "gazetteer.pkl")
+        GazetteerAutomaton(ENTRIES).save(path)
+        assert GazetteerAutomaton.load(path).find("acme corp") == {"ORG": ["Acme Corp"]}
+
+    def test_read_sources(self, tmp_path):
+        (tmp_path / "organizations.txt").write_text("# vendors\nAcme Corp\n\nGlobex\n")
+        entries = read_gazetteer_sources(str(tmp_path))
+        assert entries == [("Acme Corp", "ORG"), ("Globex", "ORG")]
+
+    def test_get_gazetteer_loads_once(self, tmp_path):
+        path = str(tmp_path / "gazetteer.pkl")
+        GazetteerAutomaton(ENTRIES).save(path)
+        reset_gazetteer()
+        try:
+            with patch.dict(os.environ, {"GAZETTEER_PATH": path}):
+                first = get_gazetteer()
+                assert first is not None
+                os.remove(path)
+                assert get_gazetteer() is first
+        finally:
+            reset_gazetteer()
+
+    def test_get_gazetteer_missing_file(self, tmp_path):
+        reset_gazetteer()
+        try:
+            with patch.dict(os.environ, {"GAZETTEER_PATH": str(tmp_path / "missing.pkl")}):
+                assert get_gazetteer() is None
+        finally:
+            reset_gazetteer()
+
+    def test_extractor_merges_gazetteer_hits(self):
+        from documents.extractor import extract_entities
+
+        with patch('documents.extractor.get_gazetteer', return_value=GazetteerAutomaton(ENTRIES)):
+            result = extract_entities("invoice", "payment to acme corp, billed in new york")
+        assert result["vendor"][0] == "Acme Corp"  # gazetteer hits come first
+        assert result["billing_location"] == ["New York"]
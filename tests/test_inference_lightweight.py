@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from documents.inference import (
+    InferenceServer,
+    MicroBatcher,
+    RemoteFirstEmbeddingFunction,
+    request_inference,
+)
+
+
+@pytest.fixture
+def socket_path():
+    directory = tempfile.mkdtemp()
+    yield os.path.join(directory, "inference.sock")
+
+
+class TestLightweightInference:
+
+    def test_micro_batcher_groups_concurrent_requests(self):
+        """Concurrent submissions should be answered by shared batches"""
+        batch_sizes = []
+
+        def handler(texts):
+            batch_sizes.append(len(texts))
+            return [t.upper() for t in texts]
+
+        batcher = MicroBatcher(handler, max_batch_size=8, max_wait_ms=50)
+        results = {}
+
+        def worker(i):
+            results[i] = batcher.submit([f"doc{i}"])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        assert results == {i: [f"DOC{i}"] for i in range(8)}
+        assert sum(batch_sizes) == 8
+        assert len(batch_sizes) < 8
+
+    def test_micro_batcher_propagates_errors(self):
+        """Handler failures should surface to every caller in the batch"""
+        batcher = MicroBatcher(MagicMock(side_effect=RuntimeError("boom")), max_wait_ms=1)
+        with pytest.raises(RuntimeError):
+            batcher.submit(["text"])
+        batcher.close()
+
+    def test_server_round_trip(self, socket_path):
+        """Client requests should be served over the Unix socket"""
+        server = InferenceServer(
+            socket_path,
+            {
+                "classify": lambda texts: ["invoice" for _ in texts],
+                "embed": lambda texts: [[float(len(t)), 0.0] for t in texts],
+            },
+            max_wait_ms=1,
+            embedding_model="mini",
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            assert request_inference("classify", ["a", "b"], socket_path=socket_path) == ["invoice", "invoice"]
+            assert request_inference("embed", ["abc"], socket_path=socket_path) == [[3.0, 0.0]]
+            assert request_inference("embed", ["abc"], socket_path=socket_path, model="mini") == [[3.0, 0.0]]
+            # Vectors from another model are refused, so callers embed in-process
+            assert request_inference("embed", ["abc"], socket_path=socket_path, model="mpnet") is None
+            # Unknown operations are reported as failures so callers fall back
+            assert request_inference("translate", ["abc"], socket_path=socket_path) is None
+        finally:
+            server.shutdown()
+            thread.join(timeout=5)
+        assert not os.path.exists(socket_path)
+
+    def test_request_inference_not_configured(self):
+        """Without a configured socket the client should signal fallback"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert request_inference("classify", ["text"]) is None
+
+    def test_request_inference_unreachable(self, socket_path, caplog):
+        """An unreachable server should signal fallback instead of raising"""
+        assert request_inference("classify", ["text"], socket_path=socket_path) is None
+        # Skipped (and not logged again) during the retry interval
+        with patch("documents.inference.socket.socket") as mock_socket:
+            assert request_inference("classify", ["text"], socket_path=socket_path) is None
+        mock_socket.assert_not_called()
+        with patch("documents.inference.INFERENCE_RETRY_INTERVAL", 0.0):
+            request_inference("classify", ["text"], socket_path=socket_path)
+            request_inference("classify", ["text"], socket_path=socket_path)
+        assert sum("unavailable" in r.getMessage() for r in caplog.records if r.levelname == "WARNING") == 1
+
+    def test_shutdown_answers_in_flight_requests(self, socket_path):
+        """Requests accepted before a shutdown are answered before the socket closes"""
+        started = threading.Event()
+
+        def slow(texts):
+            started.set()
+            time.sleep(0.3)
+            return [t.upper() for t in texts]
+
+        server = InferenceServer(socket_path, {"classify": slow}, max_wait_ms=1)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        results = {}
+        client = threading.Thread(
+            target=lambda: results.update(r=request_inference("classify", ["a"], socket_path=socket_path))
+        )
+        client.start()
+        assert started.wait(timeout=5)
+        server.shutdown()
+        client.join(timeout=5)
+        thread.join(timeout=5)
+
+        assert results["r"] == ["A"]
+        assert not os.path.exists(socket_path)
+
+    @patch('documents.inference.request_inference', return_value=None)
+    def test_embedding_function_falls_back_lazily(self, mock_request):
+        """The in-process model is only built once the server can't answer"""
+        factory = MagicMock(return_value=lambda texts: [[1.0] for _ in texts])
+        func = RemoteFirstEmbeddingFunction(factory)
+        factory.assert_not_called()
+
+        assert func(["a", "b"]) == [[1.0], [1.0]]
+        func(["c"])
+        factory.assert_called_once()
+
+    @patch('documents.inference.request_inference', return_value=[[0.5]])
+    def test_embedding_function_prefers_server(self, mock_request):
+        """Server results should be used without loading a local model"""
+        factory = MagicMock()
+        func = RemoteFirstEmbeddingFunction(factory)
+
+        assert func(["a"]) == [[0.5]]
+        factory.assert_not_called()
+
+    def test_embedding_function_describes_itself_to_chroma(self):
+        """Chroma's config checks must not build the model"""
+        factory = MagicMock()
+        func = RemoteFirstEmbeddingFunction(factory, name="sentence_transformer", config={"model_name": "m"})
+
+        assert func.name() == "sentence_transformer"
+        assert func.get_config() == {"model_name": "m"}
+        assert func.is_legacy()
+        assert "l2" in func.supported_spaces()
+        factory.assert_not_called()
+
+    @patch('documents.classifier.request_inference', return_value=["memo"])
+    @patch('documents.classifier.joblib.load')
+    def test_predict_document_type_uses_server(self, mock_load, mock_request):
+        """The classifier should use the shared server when it answers"""
+        from documents.classifier import predict_document_type
+
+        assert predict_document_type("some text") == "memo"
+        mock_load.assert_not_called()
@@ -0,0 +1,39 @@
+import os
+from unittest.mock import patch
+
+from documents.knn_classifier import get_classifier_backend, predict_document_type_knn
+
+
+class TestLightweightKNNClassifier:
+
+    @patch('documents.knn_classifier.query_by_embedding')
+    def test_weighted_vote(self, mock_query):
+        """Closer neighbours should outweigh a larger number of distant ones"""
+        mock_query.return_value = {
+            "metadatas": [[
+                {"document_type": "invoice"},
+                {"document_type": "letter"},
+                {"document_type": "letter"},
+            ]],
+            "distances": [[0.05, 0.9, 0.8]],
+        }
+
+        assert predict_document_type_knn([0.1, 0.2], top_k=3) == "invoice"
+        mock_query.assert_called_once_with([0.1, 0.2], top_k=3)
+
+    @patch('documents.knn_classifier.query_by_embedding', return_value={})
+    def test_no_neighbours_returns_none(self, mock_query):
+        """An empty collection should signal fallback to the TF-IDF model"""
+        assert predict_document_type_knn([0.1]) is None
+
+    @patch('documents.knn_classifier.query_by_embedding')
+    def test_unlabeled_neighbours_ignored(self, mock_query):
+        """Neighbours without a document_type should not vote"""
+        mock_query.return_value = {"metadatas": [[{}, None]], "distances": [[0.1, 0.2]]}
+        assert predict_document_type_knn([0.1]) is None
+
+    def test_backend_setting(self):
+        with patch.dict(os.environ, {"CLASSIFIER_BACKEND": "KNN"}):
+            assert get_classifier_backend() == "knn"
+        with patch.dict(os.environ, {}, clear=True):
+            assert get_classifier_backend() == "tfidf"
@@ -0,0 +1,151 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from documents.lexical_index import (LexicalIndex, get_lexical_index, is_identifier_query, reciprocal_rank_fusion,
+                                     tokenize)
+from documents.search import clear_search_cache, search_documents
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = LexicalIndex(str(tmp_path / "lexical"))
+    index.add(
+        ["a", "b", "c"],
+        ["Invoice #1234-56 from Acme Inc", "Invoice 1234 and 56 from Globex", "Memo about the team lunch"],
+        [{"document_type": "invoice"}, {"document_type": "invoice"}, {"document_type": "memo"}]
+    )
+    return index
+
+
+@pytest.fixture
+def enabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEXICAL_INDEX_PATH", str(tmp_path / "enabled"))
+    clear_search_cache()
+    yield get_lexical_index()
+    clear_search_cache()
+
+
+class TestLightweightLexicalIndex:
+
+    def test_tokenize_keeps_identifiers_whole(self):
+        terms = tokenize("Invoice #1234-56 dated 12/05/2024, total 15%. Ref INV-2024-001.")
+        assert {"invoice", "1234", "56", "#1234-56", "12/05/2024", "15%", "inv-2024-001"} <= set(terms)
+        assert "2024," not in terms
+
+    def test_is_identifier_query(self):
+        assert is_identifier_query("#1234-56")
+        assert is_identifier_query("INV-2024-001 100045")
+        assert not is_identifier_query("invoice #1234-56")
+        assert not is_identifier_query("   ")
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=60)
+        assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+        assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+    def test_exact_identifier_ranks_first(self, index):
+        hits = index.search("#1234-56")
+        assert [doc_id for doc_id, _ in hits] == ["a", "b"]
+        assert hits[0][1] > hits[1][1]
+        assert index.search("nothing matches") == []
+
+    def test_where_filter_and_metadata_update(self, index):
+        assert [d for d, _ in index.search("invoice memo", where={"document_type": "memo"})] == ["c"]
+        index.update_metadata(["c", "missing"], [{"document_type": "invoice", "vendor": None}, {}])
+        assert [d for d, _ in index.search("memo", where={"document_type": "invoice"})] == ["c"]
+
+    def test_replace_delete_and_compact_shared_between_instances(self, index, tmp_path):
+        other = LexicalIndex(index.directory)
+        index.add(["a"], ["Replaced text"])
+        index.delete(["b", "unknown"])
+        assert other.count() == 2
+        assert other.search("#1234-56") == []
+
+        index.compact()
+        assert other.search("replaced")[0][0] == "a"
+        index.add(["d"], ["Another lunch memo"])
+        reopened = LexicalIndex(index.directory)
+        assert reopened.count() == 3
+        assert [d for d, _ in reopened.search("lunch")] == ["d", "c"]  # shorter document first
+
+        index.clear()
+        assert other.count() == 0 and LexicalIndex(index.directory).count() == 0
+
+    def test_disabled_without_env(self, monkeypatch):
+        monkeypatch.delenv("LEXICAL_INDEX_PATH", raising=False)
+        assert get_lexical_index() is None
+        with pytest.raises(ValueError, match="lexical index"):
+            search_documents("acme", mode="lexical")
+
+
+class TestLightweightHybridSearch:
+
+    @patch('documents.search.get_documents')
+    @patch('documents.search.embed_texts')
+    def test_identifier_query_skips_embedding(self, mock_embed, mock_get, enabled):
+        enabled.add(["a", "b"], ["Invoice #1234-56", "Invoice #9999-00"], [{"document_type": "invoice"}] * 2)
+        mock_get.return_value = {"a": {"text": "Invoice #1234-56", "metadata": {"document_type": "invoice"}}}
+
+        result = search_documents("#1234-56")
+
+        mock_embed.assert_not_called()
+        assert result["mode"] == "hybrid"
+        assert [hit["document_id"] for hit in result["results"]] == ["a"]
+        assert result["results"][0]["distance"] is None and result["results"][0]["score"] > 0
+
+    @patch('documents.search.get_documents')
+    @patch('documents.search.search_by_embedding')
+    @patch('documents.search.embed_texts', return_value=[[0.1, 0.2]])
+    def test_hybrid_fuses_vector_and_lexical(self, _embed, mock_search, mock_get, enabled):
+        enabled.add(["lex", "both"], ["overdue payment reminder", "payment overdue notice"])
+        mock_search.return_value = {
+            "ids": [["vec", "both"]],
+            "documents": [["Late fee letter", "payment overdue notice"]],
+            "metadatas": [[{"document_type": "letter"}, {"document_type": "invoice"}]],
+            "distances": [[0.1, 0.2]],
+        }
+        mock_get.return_value = {
+            "lex": {"text": "overdue payment reminder", "metadata": {"document_type": "memo"}},
+            "both": {"text": "payment overdue notice", "metadata": {"document_type": "invoice"}},
+        }
+
+        result = search_documents("overdue payment", top_k=3)
+
+        ids = [hit["document_id"] for hit in result["results"]]
+        assert ids[0] == "both" and set(ids) == {"both", "vec", "lex"}
+        both = result["results"][0]
+        assert both["distance"] == 0.2 and both["document_type"] == "invoice"
+
+        vector_only = search_documents("overdue payment", top_k=3, mode="vector")
+        assert vector_only["mode"] == "vector" and "score" not in vector_only["results"][0]
+        with pytest.raises(ValueError, match="mode must be"):
+            search_documents("overdue payment", mode="fuzzy")
+
+    def test_store_updates_index_and_rebuild_command(self, tmp_path, monkeypatch, enabled):
+        import documents.chroma_client as chroma_client
+
+        monkeypatch.setenv("VECTOR_STORE", "numpy")
+        monkeypatch.setenv("PASSAGE_MAX_WORDS", "4")
+        monkeypatch.setenv("PASSAGE_OVERLAP_WORDS", "0")
+        monkeypatch.setattr(chroma_client, "NUMPY_STORE_PATH", str(tmp_path / "vectors"))
+        monkeypatch.setattr(chroma_client, "_client", None)
+        monkeypatch.setattr(chroma_client, "_collection", None)
+        monkeypatch.setattr(chroma_client, "_partitions", {})
+        monkeypatch.setattr(chroma_client, "_embedding_func", lambda texts: [[float(len(t)), 1.0] for t in texts])
+
+        chroma_client.store_document_in_chromadb("d1", "Project #1234-56 kickoff. Budget approved today.",
+                                                 "memo", {})
+        chroma_client.store_documents_in_chromadb([{"doc_id": "d2", "text": "Invoice INV-2024-001",
+                                                    "document_type": "invoice", "entities": {}}])
+        assert [d for d, _ in enabled.search("#1234-56")] == ["d1"]
+        assert chroma_client.get_documents(["d2", "missing"])["d2"]["text"] == "Invoice INV-2024-001"
+
+        enabled.clear()
+        out = StringIO()
+        call_command("rebuild_lexical_index", "--batch-size", "1", stdout=out)
+        assert "2 documents" in out.getvalue()
+        assert [d for d, _ in enabled.search("budget")] == ["d1"]
+        assert [d for d, _ in enabled.search("inv-2024-001")] == ["d2"]
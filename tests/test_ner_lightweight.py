@@ -0,0 +1,83 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from documents.extractor import extract_entities, extract_entities_batch
+from documents.ner import (
+    FakeNERBackend,
+    NERExtractor,
+    TransformersNERBackend,
+    get_ner_extractor,
+    reset_ner_extractor,
+    split_windows,
+)
+
+
+class TestLightweightNER:
+
+    def test_split_windows_overlap(self):
+        text = " ".join(f"w{i}" for i in range(10))
+        windows = split_windows(text, window_words=4, stride=1)
+        assert windows[0] == "w0 w1 w2 w3"
+        assert windows[1].startswith("w3")
+        assert windows[-1].endswith("w9")
+        assert split_windows("", 4, 1) == []
+
+    def test_windows_batched_across_documents(self):
+        backend = FakeNERBackend({"Acme Corp": "ORG", "Ann Lee": "PER"})
+        extractor = NERExtractor(backend, batch_size=8)
+
+        results = extractor.extract_batch(["Acme Corp invoice", "Dear Ann Lee", "nothing here"])
+
+        assert backend.calls == [3]
+        assert results == [{"ORG": ["Acme Corp"]}, {"PER": ["Ann Lee"]}, {}]
+
+    def test_results_cached_by_text(self):
+        backend = FakeNERBackend({"Acme Corp": "ORG"})
+        extractor = NERExtractor(backend)
+
+        extractor.extract("Acme Corp invoice")
+        assert extractor.extract("Acme Corp invoice") == {"ORG": ["Acme Corp"]}
+        assert backend.calls == [1]
+        assert extractor.cache.stats()["hits"] == 1
+
+    def test_transformers_backend_loads_lazily(self):
+        backend = TransformersNERBackend("some-model", runtime="int8")
+        with patch.object(TransformersNERBackend, "_load") as mock_load:
+            mock_load.return_value = MagicMock(return_value=[
+                [{"entity_group": "ORG", "score": 0.99, "word": " Acme Corp "},
+                 {"entity_group": "PER", "score": 0.2, "word": "Maybe"}],
+            ])
+            assert not mock_load.called
+            assert backend.predict_windows(["Acme Corp"]) == [[("ORG", "Acme Corp")]]
+            backend.predict_windows(["again"])
+        assert mock_load.call_count == 1
+
+    def test_get_ner_extractor_from_env(self, tmp_path, monkeypatch):
+        reset_ner_extractor()
+        monkeypatch.delenv("NER_BACKEND", raising=False)
+        assert get_ner_extractor() is None
+
+        entities = tmp_path / "entities.json"
+        entities.write_text(json.dumps({"Globex": "ORG"}))
+        monkeypatch.setenv("NER_BACKEND", "fake")
+        monkeypatch.setenv("NER_FAKE_ENTITIES", str(entities))
+        reset_ner_extractor()
+        try:
+            assert get_ner_extractor().extract("Globex memo") == {"ORG": ["Globex"]}
+        finally:
+            reset_ner_extractor()
+
+    def test_extractor_merges_ner_hits_first(self):
+        extractor = NERExtractor(FakeNERBackend({"globex": "ORG"}))
+        with patch('documents.extractor.get_ner_extractor', return_value=extractor):
+            result = extract_entities("invoice", "Vendor: globex. Acme Inc")
+        assert result["vendor"][0] == "globex"
+        assert "Acme Inc" in result["vendor"]
+
+    def test_batch_extraction_survives_backend_errors(self):
+        extractor = MagicMock()
+        extractor.extract_batch.side_effect = RuntimeError("model crashed")
+        with patch('documents.extractor.get_ner_extractor', return_value=extractor):
+            results = extract_entities_batch([("budget", "Acme Inc"), ("memo", "John Smith")])
+        assert results[0] == {"budget_owner": ["Acme Inc"]}
+        assert results[1] == {"author": ["John Smith"]}
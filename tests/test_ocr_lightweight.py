@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, mock_open, patch
 import pytest
 from PIL import Image
 
-from documents.ocr import extract_text_from_image
+from documents.ocr import OCRResult, extract_ocr_result, extract_text_from_image
 
 
 class TestLightweightOCR:
@@ -168,4 +168,33 @@ class TestLightweightOCR:
                                     # Verify cache file was written
                                     mock_file.assert_called()
                                     write_calls = [call for call in mock_file().write.call_args_list]
-                                    assert len(write_calls) > 0
\ No newline at end of file
+                                    assert len(write_calls) > 0
+
+    def test_ocr_result_keeps_raw_case_and_runs_tesseract_once(self, tmp_path):
+        """Raw and cleaned text come from one OCR pass and are both cached"""
+        image_path = tmp_path / "scan.png"
+        Image.new("RGB", (8, 8), "white").save(image_path)
+        cache_dir = tmp_path / "cache"
+
+        with patch("documents.ocr.pytesseract.image_to_string", return_value="Dear John Smith,\nAcme Inc ") as mock_tess:
+            first = extract_ocr_result(str(image_path), cache_dir=str(cache_dir))
+            second = extract_ocr_result(str(image_path), cache_dir=str(cache_dir))
+            cleaned = extract_text_from_image(str(image_path), cache_dir=str(cache_dir))
+
+        assert first == OCRResult(raw_text="Dear John Smith,\nAcme Inc", text="dear john smith, acme inc")
+        assert second == first
+        assert cleaned == first.text
+        mock_tess.assert_called_once()
+
+    def test_ocr_result_refreshes_cleaned_only_cache(self, tmp_path):
+        """Cache entries without raw text are re-OCR'd once"""
+        image_path = tmp_path / "scan.png"
+        Image.new("RGB", (8, 8), "white").save(image_path)
+        (tmp_path / "scan.png.txt").write_text("old cleaned text")
+
+        with patch("documents.ocr.pytesseract.image_to_string", return_value="New Text"):
+            assert extract_text_from_image(str(image_path), cache_dir=str(tmp_path)) == "old cleaned text"
+            result = extract_ocr_result(str(image_path), cache_dir=str(tmp_path))
+
+        assert result == OCRResult(raw_text="New Text", text="new text")
+        assert (tmp_path / "scan.png.raw.txt").read_text() == "New Text"
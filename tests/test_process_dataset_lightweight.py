@@ -0,0 +1,53 @@
+import importlib
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.management import call_command
+
+from documents.ocr import OCRResult
+
+COMMAND = 'documents.management.commands.process_dataset'
+
+
+@pytest.fixture(autouse=True)
+def command_module():
+    # Same chromadb stubs as test_chroma_lightweight, for running this file alone
+    chromadb_mock = sys.modules.get('chromadb') or MagicMock()
+    sys.modules.setdefault('chromadb.utils', chromadb_mock.utils)
+    sys.modules.setdefault('chromadb.utils.embedding_functions', chromadb_mock.utils.embedding_functions)
+    return importlib.import_module(COMMAND)
+
+
+class TestLightweightProcessDataset:
+
+    def test_documents_stored_in_batches(self, tmp_path, capsys):
+        for label, count in (("memo", 3), ("invoice", 2)):
+            (tmp_path / label).mkdir()
+            for i in range(count):
+                (tmp_path / label / f"{label}{i}.png").write_bytes(b"")
+
+        def store(records, batch_size):
+            records = list(records)
+            assert all(r["text"].startswith("raw text ") for r in records)
+            return [(r["doc_id"], "rejected") for r in records if r["source"] == "memo1.png"]
+
+        def ocr(path):
+            # Distinct texts: identical ones would share a content-hash id
+            name = os.path.basename(path)
+            return OCRResult(f"Raw Text {name}", f"raw text {name}")
+
+        with patch(f'{COMMAND}.extract_ocr_result', side_effect=ocr), \
+                patch(f'{COMMAND}.predict_document_type', return_value="memo") as mock_predict, \
+                patch(f'{COMMAND}.extract_entities', return_value={}) as mock_extract, \
+                patch(f'{COMMAND}.store_documents_in_chromadb', side_effect=store) as mock_store:
+            call_command('process_dataset', str(tmp_path), batch_size=2)
+
+        assert [len(c.args[0]) for c in mock_store.call_args_list] == [2, 2, 1]
+        assert mock_predict.call_args.args[0].startswith("raw text ")
+        assert mock_extract.call_args.args[0] == "memo"
+        assert mock_extract.call_args.args[1].startswith("Raw Text ")
+        out = capsys.readouterr().out
+        assert "Failed to store memo1.png: rejected" in out
+        assert "Total documents processed: 4" in out
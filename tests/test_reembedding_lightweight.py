@@ -0,0 +1,124 @@
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+import documents.chroma_client as chroma_client
+import documents.reembedding as reembedding
+from documents.reembedding import embed_sorted
+
+MODELS = {
+    "all-MiniLM-L6-v2": lambda texts: [[float(len(t)), 1.0] for t in texts],
+    "new-model": lambda texts: [[1.0, float(len(t))] for t in texts],
+}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    calls = []
+
+    def build(model_name):
+        def embed(texts):
+            calls.append((model_name, list(texts)))
+            return MODELS[model_name](texts)
+        return embed
+
+    monkeypatch.setenv("VECTOR_STORE", "numpy")
+    monkeypatch.setattr(chroma_client, "NUMPY_STORE_PATH", str(tmp_path))
+    for name, value in (("_client", None), ("_collection", None), ("_partitions", {}), ("_embedding_func", None),
+                        ("_active", None), ("_active_signature", None)):
+        monkeypatch.setattr(chroma_client, name, value)
+    monkeypatch.setattr(chroma_client, "build_embedding_function", build)
+    monkeypatch.setattr(reembedding, "build_embedding_function", build)
+    for i, text in enumerate(["a b", "a much longer text", "mid size", "x"]):
+        chroma_client.store_document_in_chromadb(f"d{i}", text, "invoice" if i % 2 else "memo", {})
+    calls.clear()
+    return calls
+
+
+class TestLightweightReembedding:
+
+    def test_embed_sorted_batches_by_length(self):
+        batches = []
+
+        def embed(texts):
+            batches.append(texts)
+            return [[float(len(t))] for t in texts]
+
+        assert embed_sorted(["ccc", "a", "bb", "dddd"], embed, 2) == [[3.0], [1.0], [2.0], [4.0]]
+        assert batches == [["a", "bb"], ["ccc", "dddd"]]
+
+    def test_migrates_and_switches(self, store, tmp_path):
+        out = StringIO()
+        call_command("reembed_collection", "new-model", "--batch-size", "2", "--window", "3", stdout=out)
+
+        assert "4 rows copied" in out.getvalue()
+        assert chroma_client.active_collection()["collection"] == "documents_new-model"
+        assert all(model == "new-model" for model, _ in store)
+        assert [len(texts) for _, texts in store] == [2, 1, 1]  # windows of 3, then 1
+        assert not os.path.exists(tmp_path / "reembed-documents_new-model.json")
+
+        collection = chroma_client.get_collection()
+        assert collection.name == "documents_new-model"
+        assert collection.count() == 4
+        assert chroma_client.query_by_embedding([1.0, 18.0], top_k=1)["ids"] == [["d1"]]
+        chroma_client.store_document_in_chromadb("d9", "new doc", "memo", {})
+        assert store[-1] == ("new-model", ["new doc"])
+        assert chroma_client.get_client().get_or_create_collection("documents").count() == 4  # kept for rollback
+
+    def test_resumes_from_checkpoint_and_reconciles(self, store, monkeypatch):
+        original = reembedding.embed_sorted
+        windows = []
+
+        def fail_second_window(texts, embed, batch_size):
+            windows.append(texts)
+            if len(windows) == 2:
+                raise RuntimeError("interrupted")
+            return original(texts, embed, batch_size)
+
+        monkeypatch.setattr(reembedding, "embed_sorted", fail_second_window)
+        with pytest.raises(RuntimeError):
+            call_command("reembed_collection", "new-model", "--window", "2", stdout=StringIO())
+        monkeypatch.setattr(reembedding, "embed_sorted", original)
+        checkpoint = chroma_client.store_path() + "/reembed-documents_new-model.json"
+        assert json.load(open(checkpoint))["offsets"] == {"documents": 2}
+
+        result = reembedding.reembed_collection("new-model", window=2, switch=False)
+        assert (result["copied"], result["reconciled"], result["switched"]) == (2, 0, False)
+        assert chroma_client.active_collection()["collection"] == "documents"
+
+        chroma_client.store_document_in_chromadb("late", "stored during the copy", "memo", {})
+        chroma_client.get_collection().delete(ids=["d0"])
+        out = StringIO()
+        call_command("reembed_collection", "new-model", "--window", "2", stdout=out)
+        assert "0 rows copied, 2 reconciled" in out.getvalue()
+        assert sorted(chroma_client.get_collection().get()["ids"]) == ["d1", "d2", "d3", "late"]
+
+    def test_partitions_and_invalid_targets(self, store, monkeypatch, tmp_path):
+        out = StringIO()
+        call_command("reembed_collection", "new-model", "--collection", "documents", stdout=out)
+        assert "Invalid target collection" in out.getvalue()
+
+        (tmp_path / "reembed-v2.json").write_text(json.dumps({"source": "documents", "target": "v2",
+                                                               "embedding_model": "other"}))
+        out = StringIO()
+        call_command("reembed_collection", "new-model", "--collection", "v2", stdout=out)
+        assert "remove it to start over" in out.getvalue()
+
+        monkeypatch.setenv("CHROMA_PARTITION_KEY", "document_type")
+        call_command("repartition_collection", stdout=StringIO())
+        call_command("reembed_collection", "new-model", "--collection", "v3", stdout=StringIO())
+        assert chroma_client.list_partitions() == ["v3__invoice", "v3__memo"]
+        assert chroma_client.get_partition("v3__memo").count() == 2
+
+    def test_other_processes_follow_the_pointer(self, store, monkeypatch, tmp_path):
+        assert chroma_client.get_collection().name == "documents"
+        (tmp_path / "active_collection.json").write_text(json.dumps({"collection": "elsewhere",
+                                                                     "embedding_model": "new-model"}))
+        assert chroma_client.get_collection().name == "documents"  # within the check interval
+
+        monkeypatch.setattr(chroma_client, "_active_checked_at", 0.0)
+        assert chroma_client.get_collection().name == "elsewhere"
+        assert chroma_client.embedding_model_name() == "new-model"
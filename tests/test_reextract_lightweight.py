@@ -0,0 +1,104 @@
+import importlib
+import json
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.management import call_command
+
+COMMAND = 'documents.management.commands.reextract_entities'
+
+STORED = {
+    "ids": ["a", "b", "c"],
+    "documents": ["Vendor: ACME Inc", "Memo by John Smith", "Letter to Jane Doe"],
+    "metadatas": [
+        {"document_type": "invoice", "vendor": "old vendor", "invoice_number": "0000"},
+        {"document_type": "memo", "division": "East"},
+        {"document_type": "letter"},
+    ],
+}
+
+
+def _page(offset, limit):
+    return {key: values[offset:offset + limit] for key, values in STORED.items()}
+
+
+@pytest.fixture(autouse=True)
+def command_module():
+    # Same chromadb stubs as test_chroma_lightweight, for running this file alone
+    chromadb_mock = sys.modules.get('chromadb') or MagicMock()
+    sys.modules.setdefault('chromadb.utils', chromadb_mock.utils)
+    sys.modules.setdefault('chromadb.utils.embedding_functions', chromadb_mock.utils.embedding_functions)
+    return importlib.import_module(COMMAND)
+
+
+class TestLightweightReextractEntities:
+
+    def test_pages_update_and_clear_stale_fields(self, tmp_path):
+        cursor = tmp_path / "cursor.json"
+        with patch(f'{COMMAND}.get_documents_page', side_effect=_page) as mock_get, \
+                patch(f'{COMMAND}.update_document_metadata') as mock_update:
+            call_command('reextract_entities', batch_size=2, workers=1, cursor_file=str(cursor))
+
+        assert [c.args for c in mock_get.call_args_list] == [(0, 2), (2, 2), (3, 2)]
+        assert mock_update.call_count == 2
+
+        ids, metadatas = mock_update.call_args_list[0].args
+        assert ids == ["a", "b"]
+        assert metadatas[0] == {"document_type": "invoice", "vendor": "ACME Inc", "invoice_number": None}
+        assert metadatas[1] == {"document_type": "memo", "author": "John Smith"}
+        assert not cursor.exists()
+
+    def test_resumes_from_cursor(self, tmp_path):
+        cursor = tmp_path / "cursor.json"
+        cursor.write_text(json.dumps({"offset": 2}))
+        with patch(f'{COMMAND}.get_documents_page', side_effect=_page) as mock_get, \
+                patch(f'{COMMAND}.update_document_metadata') as mock_update:
+            call_command('reextract_entities', batch_size=10, workers=1, cursor_file=str(cursor))
+
+        assert mock_get.call_args_list[0].args == (2, 10)
+        assert mock_update.call_args.args[0] == ["c"]
+
+    def test_cursor_saved_when_interrupted(self, tmp_path):
+        cursor = tmp_path / "cursor.json"
+        with patch(f'{COMMAND}.get_documents_page', side_effect=_page), \
+                patch(f'{COMMAND}.update_document_metadata', side_effect=[None, RuntimeError("db down")]):
+            try:
+                call_command('reextract_entities', batch_size=2, workers=1, cursor_file=str(cursor))
+            except RuntimeError:
+                pass
+
+        assert json.loads(cursor.read_text()) == {"offset": 2}
+
+    def test_chunks_split_evenly(self, command_module):
+        assert command_module._chunks(list(range(5)), 2) == [[0, 1, 2], [3, 4]]
+        assert command_module._chunks([], 4) == []
+
+    @pytest.mark.django_db
+    def test_passages_share_their_document_metadata(self, tmp_path, monkeypatch):
+        import documents.chroma_client as chroma_client
+        from documents.entity_index import find_documents
+        from documents.models import IndexedDocument
+
+        monkeypatch.setenv("VECTOR_STORE", "numpy")
+        monkeypatch.setenv("PASSAGE_MAX_WORDS", "4")
+        monkeypatch.setenv("PASSAGE_OVERLAP_WORDS", "2")
+        monkeypatch.setenv("ENTITY_INDEX", "1")
+        monkeypatch.setattr(chroma_client, "NUMPY_STORE_PATH", str(tmp_path))
+        for name, value in (("_client", None), ("_collection", None), ("_partitions", {}),
+                            ("_embedding_func", lambda texts: [[float(len(t)), 1.0] for t in texts])):
+            monkeypatch.setattr(chroma_client, name, value)
+        chroma_client.store_document_in_chromadb(
+            "inv", "Invoice from ACME Inc. Contact John Smith today. Invoice Number: INV-12345. Thanks again.",
+            "invoice", {})
+        chroma_client.store_document_in_chromadb("memo", "Short memo", "memo", {})
+
+        call_command('reextract_entities', batch_size=2, workers=1, cursor_file=str(tmp_path / "cursor.json"))
+
+        stored = chroma_client.get_collection().get(include=["metadatas"])
+        passages = [m for m in stored["metadatas"] if m.get("parent_id") == "inv"]
+        assert [m["passage"] for m in passages] == [0, 1, 2, 3]
+        assert {(m["vendor"], m["invoice_number"]) for m in passages} == {("Invoice from ACME Inc", "12345")}
+        assert len({tuple(sorted((k, v) for k, v in m.items() if k != "passage")) for m in passages}) == 1
+        assert sorted(IndexedDocument.objects.values_list("id", flat=True)) == ["inv", "memo"]
+        assert find_documents({"invoice_number": "12345"})["document_ids"] == ["inv"]
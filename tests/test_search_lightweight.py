@@ -0,0 +1,151 @@
+from unittest.mock import patch
+
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from documents.search import build_where, clear_search_cache, embedding_key, search_documents
+
+
+def _results(*ids):
+    return {
+        "ids": [list(ids)],
+        "documents": [[f"Invoice from Acme Inc number {i}" for i in ids]],
+        "metadatas": [[{"document_type": "invoice", "vendor": "Acme Inc"} for _ in ids]],
+        "distances": [[0.1 * n for n, _ in enumerate(ids)]],
+    }
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_search_cache()
+    yield
+    clear_search_cache()
+
+
+class TestLightweightSearch:
+
+    def test_build_where(self):
+        assert build_where({}) is None
+        assert build_where({"document_type": "invoice"}) == {"document_type": "invoice"}
+        assert build_where({"document_type": ["invoice", "memo"], "vendor": "Acme"}) == {
+            "$and": [{"document_type": {"$in": ["invoice", "memo"]}}, {"vendor": "Acme"}]
+        }
+
+    def test_build_where_rejects_unknown_or_empty(self):
+        with pytest.raises(ValueError, match="Unknown filter field"):
+            build_where({"password": "x"})
+        with pytest.raises(ValueError, match="Empty filter value"):
+            build_where({"vendor": []})
+
+    @pytest.mark.django_db
+    def test_filter_matches_one_of_several_values(self, tmp_path, monkeypatch):
+        import documents.chroma_client as chroma_client
+
+        monkeypatch.setenv("VECTOR_STORE", "numpy")
+        monkeypatch.setenv("ENTITY_INDEX", "1")
+        monkeypatch.setattr(chroma_client, "NUMPY_STORE_PATH", str(tmp_path))
+        for name, value in (("_client", None), ("_collection", None), ("_partitions", {}),
+                            ("_embedding_func", lambda texts: [[float(len(t)), 1.0] for t in texts])):
+            monkeypatch.setattr(chroma_client, name, value)
+        chroma_client.store_document_in_chromadb("both", "two vendors", "invoice", {"vendor": ["Acme Corp", "Globex"]})
+        chroma_client.store_document_in_chromadb("longer", "similar name", "invoice", {"vendor": ["Acme Corporation"]})
+        chroma_client.store_document_in_chromadb("memo", "old", "memo", {"vendor": ["acme corp"]})
+
+        def found(filters):
+            result = search_documents("acme", filters, top_k=10, mode="vector")
+            return sorted(hit["document_id"] for hit in result["results"])
+
+        assert found({"vendor": "Acme Corp"}) == ["both", "memo"]
+        assert found({"vendor": "Acme Corp", "document_type": "invoice"}) == ["both"]
+        assert found({"vendor": ["Globex", "Acme Corporation"]}) == ["both", "longer"]
+        assert found({"vendor": "Initech"}) == []
+        hit = search_documents("acme", {"vendor": "Globex"}, top_k=1, mode="vector")["results"][0]
+        assert hit["entities"] == {"vendor": "Acme Corp, Globex"}
+
+        monkeypatch.setenv("ENTITY_INDEX", "0")
+        clear_search_cache()
+        # Without the index only the whole stored value matches
+        assert found({"vendor": "Acme Corp"}) == []
+        assert found({"vendor": "Acme Corp, Globex"}) == ["both"]
+
+    def test_embedding_key_depends_on_vector(self):
+        assert embedding_key([0.1, 0.2]) == embedding_key([0.1, 0.2])
+        assert embedding_key([0.1, 0.2]) != embedding_key([0.1, 0.3])
+
+    @patch('documents.search.search_by_embedding')
+    @patch('documents.search.embed_texts', return_value=[[0.1, 0.2]])
+    def test_results_cached_by_embedding_and_filter(self, _embed, mock_search):
+        mock_search.return_value = _results("a", "b")
+
+        first = search_documents("acme", {"document_type": "invoice"}, top_k=2)
+        second = search_documents("acme", {"document_type": "invoice"}, top_k=2)
+        search_documents("acme", {"document_type": "memo"}, top_k=2)
+
+        assert first["cached"] is False and second["cached"] is True
+        assert mock_search.call_count == 2
+        assert mock_search.call_args_list[0].kwargs["where"] == {"document_type": "invoice"}
+        hit = first["results"][0]
+        assert hit["document_id"] == "a"
+        assert hit["document_type"] == "invoice"
+        assert hit["entities"] == {"vendor": "Acme Inc"}
+
+    @patch('documents.search.search_by_embedding')
+    @patch('documents.search.embed_texts', return_value=[[0.1, 0.2]])
+    def test_pagination(self, _embed, mock_search):
+        mock_search.return_value = _results("a", "b", "c")
+
+        result = search_documents("acme", top_k=2, page=2)
+
+        assert mock_search.call_args.kwargs["top_k"] == 4
+        assert [hit["document_id"] for hit in result["results"]] == ["c"]
+        assert result["has_more"] is False
+
+    def test_invalid_paging(self):
+        with pytest.raises(ValueError):
+            search_documents("acme", top_k=0)
+        with pytest.raises(ValueError):
+            search_documents("acme", top_k=100, page=6)
+        with pytest.raises(ValueError):
+            search_documents("   ")
+
+
+@pytest.mark.django_db
+class TestLightweightSearchAPI:
+
+    @patch('documents.search.search_by_embedding')
+    @patch('documents.search.embed_texts', return_value=[[0.1, 0.2]])
+    def test_get_with_filters(self, _embed, mock_search):
+        mock_search.return_value = _results("a")
+
+        response = APIClient().get('/api/search/', {'q': 'acme', 'document_type': ['invoice', 'memo'], 'top_k': 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_search.call_args.kwargs["where"] == {"document_type": {"$in": ["invoice", "memo"]}}
+        hit = response.data["results"][0]
+        assert hit["preview"].startswith("Invoice from Acme Inc")
+        assert "text" not in hit
+
+    @patch('documents.search.search_by_embedding')
+    @patch('documents.search.embed_texts', return_value=[[0.1, 0.2]])
+    def test_post_json(self, _embed, mock_search):
+        mock_search.return_value = _results("a")
+
+        response = APIClient().post(
+            '/api/search/', {'query': 'acme', 'where': {'vendor': 'Acme Inc'}, 'top_k': 3}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_search.call_args.kwargs == {"top_k": 3, "where": {"vendor": "Acme Inc"}}
+
+    def test_bad_requests(self):
+        client = APIClient()
+        assert client.get('/api/search/', {'q': 'x', 'secret': '1'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get('/api/search/').status_code == status.HTTP_400_BAD_REQUEST
+        assert client.post('/api/search/', {'query': 'x', 'where': []}, format='json').status_code == 400
+
+    @patch('documents.search.search_by_embedding', side_effect=ConnectionError("down"))
+    @patch('documents.search.embed_texts', return_value=[[0.1, 0.2]])
+    def test_backend_error(self, _embed, _search):
+        response = APIClient().get('/api/search/', {'q': 'acme'})
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
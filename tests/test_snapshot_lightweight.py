@@ -0,0 +1,101 @@
+import json
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+import documents.chroma_client as chroma_client
+from documents.snapshot import MANIFEST_NAME, read_manifest, read_shard, write_shard
+
+
+def _use_store(monkeypatch, path, embed=lambda texts: [[float(len(t)), 1.0] for t in texts]):
+    monkeypatch.setattr(chroma_client, "NUMPY_STORE_PATH", str(path))
+    monkeypatch.setattr(chroma_client, "_client", None)
+    monkeypatch.setattr(chroma_client, "_collection", None)
+    monkeypatch.setattr(chroma_client, "_partitions", {})
+    monkeypatch.setattr(chroma_client, "_embedding_func", embed)
+
+
+def _no_embedding(texts):
+    raise AssertionError("import must not embed")
+
+
+@pytest.fixture
+def stored(tmp_path, monkeypatch):
+    monkeypatch.setenv("VECTOR_STORE", "numpy")
+    monkeypatch.setenv("PASSAGE_MAX_WORDS", "3")
+    _use_store(monkeypatch, tmp_path / "source")
+    chroma_client.store_document_in_chromadb("d1", "Invoice from Acme. Total due today.", "invoice",
+                                             {"vendor": ["Acme Inc"]})
+    chroma_client.store_document_in_chromadb("d2", "Memo für Zoë", "memo", {"PER": ["Zoë"]})
+    return tmp_path
+
+
+class TestLightweightSnapshot:
+
+    def test_shard_round_trip(self, tmp_path):
+        path = str(tmp_path / "shard.npz")
+        write_shard(path, {"ids": ["a", "é"], "documents": ["text ✓", None],
+                           "metadatas": [{"k": "v", "n": 2}, None], "embeddings": [[1, 2], [3, 4]]}, compress=True)
+
+        columns = read_shard(path)
+        assert columns["ids"] == ["a", "é"]
+        assert columns["documents"] == ["text ✓", ""]
+        assert columns["metadatas"] == [{"k": "v", "n": 2}, {}]
+        assert columns["embeddings"].dtype == np.float32
+        assert columns["embeddings"].tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+    def test_export_then_import_without_embedding(self, stored, monkeypatch):
+        source = chroma_client.get_collection().get(include=["documents", "metadatas", "embeddings"])
+        assert len(source["ids"]) > 2  # d1 is stored as passages
+        out = StringIO()
+        call_command("export_collection", str(stored / "snap"), "--shard-size", "2", stdout=out)
+        assert f"Exported {len(source['ids'])} records in {(len(source['ids']) + 1) // 2} shards" in out.getvalue()
+
+        _use_store(monkeypatch, stored / "target", embed=_no_embedding)
+        call_command("import_collection", str(stored / "snap"), "--batch-size", "2", stdout=StringIO())
+        call_command("import_collection", str(stored / "snap"), stdout=StringIO())  # repeatable
+
+        target = chroma_client.get_collection().get(include=["documents", "metadatas", "embeddings"])
+        assert target["ids"] == source["ids"]
+        assert target["documents"] == source["documents"]
+        assert target["metadatas"] == source["metadatas"]
+        np.testing.assert_allclose(target["embeddings"], source["embeddings"])
+        assert chroma_client.get_document("d1")["metadata"]["vendor"] == "Acme Inc"
+
+    def test_import_routes_to_partitions_and_rebuilds_indexes(self, stored, monkeypatch):
+        call_command("export_collection", str(stored / "snap"), stdout=StringIO())
+
+        monkeypatch.setenv("CHROMA_PARTITION_KEY", "document_type")
+        monkeypatch.setenv("LEXICAL_INDEX_PATH", str(stored / "lexical"))
+        _use_store(monkeypatch, stored / "target", embed=_no_embedding)
+        out = StringIO()
+        call_command("import_collection", str(stored / "snap"), stdout=out)
+
+        assert chroma_client.list_partitions() == ["documents__invoice", "documents__memo"]
+        assert chroma_client.get_partition("documents__memo").get()["ids"] == ["d2"]
+        assert "Lexical index rebuilt: 2 documents" in out.getvalue()
+
+    def test_import_rejects_bad_snapshots(self, stored, monkeypatch):
+        out = StringIO()
+        call_command("import_collection", str(stored / "missing"), stdout=out)
+        assert "No manifest.json" in out.getvalue()
+
+        call_command("export_collection", str(stored / "snap"), stdout=StringIO())
+        manifest_path = stored / "snap" / MANIFEST_NAME
+        manifest = json.loads(manifest_path.read_text())
+        manifest_path.write_text(json.dumps({**manifest, "embedding_model": "other-model"}))
+        with pytest.raises(ValueError, match="other-model"):
+            read_manifest(str(stored / "snap"), "all-MiniLM-L6-v2")
+
+        _use_store(monkeypatch, stored / "target", embed=_no_embedding)
+        out = StringIO()
+        call_command("import_collection", str(stored / "snap"), stdout=out)
+        assert "other-model" in out.getvalue()
+        call_command("import_collection", str(stored / "snap"), "--allow-model-mismatch", stdout=StringIO())
+        assert chroma_client.get_collection().count() == manifest["collections"]["documents"]["count"]
+
+        manifest_path.write_text(json.dumps({**manifest, "version": 99}))
+        with pytest.raises(ValueError, match="Unsupported"):
+            read_manifest(str(stored / "snap"))
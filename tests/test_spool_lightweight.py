@@ -0,0 +1,136 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from documents.spool import SpoolFullError, VectorSpool, get_vector_spool, reset_vector_spool
+
+
+def _record(doc_id):
+    return {"doc_id": doc_id, "text": f"text {doc_id}", "document_type": "memo", "entities": {}, "embedding": None}
+
+
+class RecordingStore:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def __call__(self, records, batch_size):
+        self.calls.append([r["doc_id"] for r in records])
+        return [(r["doc_id"], "chroma down") for r in records if r["doc_id"] in self.failing]
+
+
+class TestLightweightVectorSpool:
+
+    def test_enqueue_and_flush_in_batches(self, tmp_path):
+        store = RecordingStore()
+        spool = VectorSpool(str(tmp_path / "spool.db"), batch_size=2, store=store)
+        for i in range(3):
+            spool.enqueue(_record(f"d{i}"))
+        assert spool.depth() == 3
+
+        assert spool.drain() == 0
+        assert store.calls == [["d0", "d1"], ["d2"]]
+        stats = spool.stats()
+        assert stats["flushed"] == 3
+        assert stats["flushes"] == 2
+        assert stats["depth"] == 0
+
+    def test_records_survive_restart(self, tmp_path):
+        path = str(tmp_path / "spool.db")
+        VectorSpool(path, store=RecordingStore()).enqueue(_record("kept"))
+
+        store = RecordingStore()
+        assert VectorSpool(path, store=store).drain() == 0
+        assert store.calls == [["kept"]]
+
+    def test_failures_retried_with_backoff_then_dead_lettered(self, tmp_path):
+        store = RecordingStore(failing={"bad"})
+        spool = VectorSpool(str(tmp_path / "spool.db"), store=store, max_attempts=2, backoff=60)
+        spool.enqueue(_record("ok"))
+        spool.enqueue(_record("bad"))
+
+        spool.flush_once()
+        assert spool.depth() == 1
+        assert spool.flush_once() == 0  # not due yet
+
+        spool.backoff = 0
+        with spool._connect() as conn:
+            conn.execute("UPDATE spool SET next_attempt = 0")
+        spool.flush_once()
+
+        stats = spool.stats()
+        assert stats["depth"] == 0
+        assert stats["dead"] == 1
+        assert stats["failed_attempts"] == 2
+
+    def test_store_exception_reschedules_whole_batch(self, tmp_path):
+        def broken(records, batch_size):
+            raise ConnectionError("chroma unreachable")
+
+        spool = VectorSpool(str(tmp_path / "spool.db"), store=broken, backoff=60)
+        spool.enqueue(_record("a"))
+        spool.enqueue(_record("b"))
+
+        assert spool.flush_once() == 2
+        assert spool.depth() == 2
+        assert spool.stats()["failed_attempts"] == 2
+
+    def test_backpressure_when_full(self, tmp_path):
+        spool = VectorSpool(str(tmp_path / "spool.db"), max_depth=1, store=RecordingStore())
+        spool.enqueue(_record("a"))
+        with pytest.raises(SpoolFullError):
+            spool.enqueue(_record("b"))
+        assert spool.depth() == 1
+
+    def test_claimed_rows_hidden_from_other_flushers(self, tmp_path):
+        path = str(tmp_path / "spool.db")
+        first = VectorSpool(path, store=RecordingStore())
+        second = VectorSpool(path, store=RecordingStore())
+        first.enqueue(_record("a"))
+
+        assert len(first._claim()) == 1
+        assert second._claim() == []
+
+    def test_background_flusher(self, tmp_path):
+        store = RecordingStore()
+        spool = VectorSpool(str(tmp_path / "spool.db"), store=store, flush_interval=0.05)
+        spool.start()
+        try:
+            spool.enqueue(_record("a"))
+            deadline = time.monotonic() + 5
+            while spool.depth() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            spool.stop()
+        assert store.calls == [["a"]]
+
+    def test_get_vector_spool_from_env(self, tmp_path, monkeypatch):
+        reset_vector_spool()
+        monkeypatch.delenv("VECTOR_SPOOL_PATH", raising=False)
+        assert get_vector_spool() is None
+
+        monkeypatch.setenv("VECTOR_SPOOL_PATH", str(tmp_path / "spool.db"))
+        monkeypatch.setenv("VECTOR_SPOOL_MAX_DEPTH", "5")
+        reset_vector_spool()
+        try:
+            spool = get_vector_spool(start=False)
+            assert spool is not None and spool.max_depth == 5
+        finally:
+            reset_vector_spool()
+
+    def test_flush_command_drains(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setenv("VECTOR_SPOOL_PATH", str(tmp_path / "spool.db"))
+        reset_vector_spool()
+        store = RecordingStore()
+        try:
+            with patch('documents.spool._default_store', store):
+                spool = get_vector_spool(start=False)
+                spool.enqueue(_record("a"))
+                call_command('flush_vector_spool')
+        finally:
+            reset_vector_spool()
+
+        assert store.calls == [["a"]]
+        assert "Flushed 1 documents" in capsys.readouterr().out
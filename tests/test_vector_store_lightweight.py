@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from documents.vector_store import NumpyVectorStore, matches_where, open_vector_store
+
+
+@pytest.fixture
+def collection(tmp_path):
+    collection = NumpyVectorStore(str(tmp_path)).get_or_create_collection("docs")
+    collection.add(
+        ids=["a", "b", "c"],
+        documents=["doc a", "doc b", "doc c"],
+        metadatas=[{"document_type": "memo", "pages": 1}, {"document_type": "invoice", "pages": 3},
+                   {"document_type": "memo", "pages": 5}],
+        embeddings=[[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]
+    )
+    return collection
+
+
+class TestLightweightNumpyVectorStore:
+
+    def test_matches_where(self):
+        metadata = {"document_type": "memo", "pages": 3}
+        assert matches_where(metadata, {"document_type": "memo"})
+        assert matches_where(metadata, {"$and": [{"pages": {"$gte": 3}}, {"document_type": {"$in": ["memo"]}}]})
+        assert matches_where(metadata, {"$or": [{"pages": {"$lt": 2}}, {"document_type": {"$ne": "invoice"}}]})
+        assert not matches_where(metadata, {"vendor": "Acme"})
+        assert not matches_where(metadata, {"document_type": {"$nin": ["memo"]}})
+        with pytest.raises(ValueError):
+            matches_where(metadata, {"pages": {"$regex": "3"}})
+
+    def test_query_exact_cosine_top_k(self, collection):
+        result = collection.query(query_embeddings=[[2.0, 0.1], [0.0, 1.0]], n_results=2)
+
+        assert result["ids"] == [["a", "c"], ["b", "c"]]
+        assert result["distances"][1][0] == pytest.approx(0.0, abs=1e-6)
+        assert result["distances"][1][1] == pytest.approx(1 - np.sqrt(0.5), abs=1e-6)
+        assert result["documents"][0] == ["doc a", "doc c"]
+
+    def test_query_with_filter_and_include(self, collection):
+        result = collection.query(query_embeddings=[[0.0, 1.0]], n_results=5,
+                                  where={"document_type": "memo"}, include=["distances"])
+
+        assert result["ids"] == [["c", "a"]]
+        assert result["documents"] is None and result["metadatas"] is None
+
+    def test_add_skips_existing_and_upsert_replaces(self, collection):
+        collection.add(ids=["a"], documents=["ignored"], embeddings=[[0.0, 1.0]])
+        assert collection.get(ids=["a"])["documents"] == ["doc a"]
+
+        collection.upsert(ids=["a"], documents=["new a"], metadatas=[{"document_type": "letter"}],
+                          embeddings=[[0.1, 1.0]])
+        assert collection.count() == 3
+        assert collection.query(query_embeddings=[[0.1, 1.0]], n_results=2)["ids"] == [["a", "b"]]
+        with pytest.raises(ValueError):
+            collection.upsert(ids=["x", "x"], embeddings=[[1.0, 0.0], [1.0, 0.0]])
+
+    def test_get_update_delete(self, collection):
+        assert collection.get(offset=1, limit=1)["ids"] == ["b"]
+        assert collection.get(where={"pages": {"$gt": 2}})["ids"] == ["b", "c"]
+
+        collection.update(ids=["b", "missing"], metadatas=[{"pages": None, "vendor": "Acme"}, {}])
+        assert collection.get(ids=["b"])["metadatas"] == [{"document_type": "invoice", "vendor": "Acme"}]
+
+        collection.delete(where={"document_type": "memo"})
+        assert collection.count() == 1
+        assert collection.query(query_embeddings=[[1.0, 0.0]], n_results=3)["ids"] == [["b"]]
+
+        embeddings = collection.get(ids=["b"], include=["embeddings"])["embeddings"]
+        assert np.allclose(embeddings, [[0.0, 1.0]])
+
+    def test_embedding_function_used_without_vectors(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        collection = store.get_or_create_collection("docs", embedding_function=lambda texts: [[len(t), 1.0] for t in texts])
+        collection.add(ids=["short", "long"], documents=["ab", "abcdefgh"])
+
+        assert collection.query(query_texts=["abcdefg"], n_results=1)["ids"] == [["long"]]
+        collection.update(ids=["short"], documents=["abcdefghijkl"])
+        assert collection.get(ids=["short"])["documents"] == ["abcdefghijkl"]
+
+    def test_state_persists_and_is_shared(self, tmp_path, collection):
+        other = NumpyVectorStore(str(tmp_path)).get_or_create_collection("docs")
+        assert other.count() == 3
+
+        collection.delete(ids=["a"])
+        other.upsert(ids=["d"], documents=["doc d"], embeddings=[[1.0, 0.0]])
+
+        assert sorted(collection.get()["ids"]) == ["b", "c", "d"]
+        reopened = NumpyVectorStore(str(tmp_path)).get_or_create_collection("docs")
+        assert reopened.query(query_embeddings=[[1.0, 0.0]], n_results=1)["ids"] == [["d"]]
+
+    def test_store_lists_and_deletes_collections(self, tmp_path, collection):
+        store = open_vector_store("numpy", str(tmp_path))
+        store.get_or_create_collection("other")
+        assert store.list_collections() == ["docs", "other"]
+
+        store.delete_collection("other")
+        assert store.list_collections() == ["docs"]
+        with pytest.raises(ValueError):
+            store.get_or_create_collection("../escape")
+        with pytest.raises(ValueError):
+            open_vector_store("faiss", str(tmp_path))
+
+    def test_chroma_client_on_numpy_backend(self, tmp_path, monkeypatch):
+        import documents.chroma_client as chroma_client
+
+        monkeypatch.setenv("VECTOR_STORE", "numpy")
+        monkeypatch.setattr(chroma_client, "NUMPY_STORE_PATH", str(tmp_path))
+        monkeypatch.setattr(chroma_client, "_client", None)
+        monkeypatch.setattr(chroma_client, "_collection", None)
+        monkeypatch.setattr(chroma_client, "_partitions", {})
+        monkeypatch.setattr(chroma_client, "_embedding_func", lambda texts: [[float(len(t)), 1.0] for t in texts])
+
+        chroma_client.store_document_in_chromadb("d1", "short", "memo", {"author": ["A"]})
+        chroma_client.store_document_in_chromadb("d2", "a much longer text", "invoice", {})
+
+        assert chroma_client.query_similar_documents("a longer text!", top_k=1)["ids"] == [["d2"]]
+        assert chroma_client.search_by_embedding([5.0, 1.0], top_k=5, where={"author": "A"})["ids"] == [["d1"]]
+        assert chroma_client.get_document("d1")["metadata"] == {"document_type": "memo", "author": "A"}
+
+    def test_benchmark_command(self, capsys):
+        call_command('benchmark_vector_store', '--sizes', '300', '--backends', 'numpy',
+                     '--dim', '8', '--queries', '5', '--batch-size', '128')
+
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert lines[0].split()[:2] == ["backend", "vectors"]
+        assert lines[1].split()[:2] == ["numpy", "300"]